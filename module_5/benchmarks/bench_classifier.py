@@ -0,0 +1,124 @@
+"""Micro-benchmark for detail-row classification in the scraper.
+
+Feeds a synthetic corpus of detail and comment cells through
+``survey_rows.parse_detail_row`` — the innermost loop of a crawl — once with
+the compiled ``survey_rows._classify_part`` and once with the original
+uncompiled rules (kept below as ``legacy_classify_part``), and prints
+cells/sec for both.
+
+Usage::
+
+    python benchmarks/bench_classifier.py [--cells N] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+SOURCE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
+
+import survey_rows  # noqa: E402  pylint: disable=wrong-import-position
+from survey_parser import SurveyCell  # noqa: E402  pylint: disable=wrong-import-position
+
+_LEGACY_GRE_PREFIXES = [
+    ("gre v", "GRE V"),
+    ("gre aw", "GRE AW"),
+    ("gre q", "GRE Q"),
+    ("gre", "GRE"),
+]
+
+_FRAGMENTS = [
+    "Fall 2026", "Spring 2027", "International", "American", "GPA 3.{d}0",
+    "GRE 3{d}5", "GRE V 16{d}", "GRE Q 16{d}", "GRE AW {d}.5",
+    "Accepted on {d} Feb", "Wait listed", "Interview on {d} Jan",
+]
+
+_COMMENTS = [
+    "Got the email this morning, so excited!",
+    "Funding package not mentioned yet.",
+    "Anyone else hear back from this program?",
+]
+
+
+def legacy_classify_part(part):
+    """The pre-compiled classifier: ``re.match`` per call and keyword scans."""
+    part_lower = part.lower()
+
+    if re.match(r'^(fall|spring|summer|winter)\s+\d{4}$', part_lower):
+        return ("term", part)
+
+    if part_lower in survey_rows._NATIONALITY_MAP:  # pylint: disable=protected-access
+        return survey_rows._NATIONALITY_MAP[part_lower]  # pylint: disable=protected-access
+
+    if re.match(r'^gpa\s+\d+(\.\d+)?$', part_lower):
+        return ("GPA", part)
+
+    for prefix, field in _LEGACY_GRE_PREFIXES:
+        if part_lower.startswith(prefix):
+            return (field, part)
+
+    if (any(x in part_lower for x in
+            ["accepted", "rejected", "interview", "wait"])
+            and len(part) < 50):
+        return ("_status", part)
+    return None
+
+
+def build_cells(count, seed=0):
+    """Return *count* detail/comment cells, roughly 3:1 detail to comment."""
+    rng = random.Random(seed)
+    cells = []
+    for _ in range(count):
+        cell = SurveyCell()
+        if rng.random() < 0.75:
+            for fragment in rng.sample(_FRAGMENTS, 6):
+                cell.strings.append(fragment.format(d=rng.randint(0, 9)))
+        else:
+            cell.strings.append(rng.choice(_COMMENTS))
+        cells.append(cell)
+    return cells
+
+
+def bench(cells, repeat):
+    """Return cells/sec for running every cell through parse_detail_row."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cell in cells:
+            survey_rows.parse_detail_row(cell, {"status": "", "comments": []})
+    return len(cells) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    """Time the legacy and compiled classifiers and print cells/sec."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, default=20000,
+                        help="synthetic detail cells (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="passes over the corpus (default: 3)")
+    args = parser.parse_args()
+
+    cells = build_cells(args.cells)
+    compiled = survey_rows._classify_part  # pylint: disable=protected-access
+    for cell in cells:
+        for part in cell.get_text(" | ", strip=True).split(" | "):
+            assert compiled(part) == legacy_classify_part(part), part
+
+    survey_rows._classify_part = legacy_classify_part  # pylint: disable=protected-access
+    legacy_rate = bench(cells, args.repeat)
+    survey_rows._classify_part = compiled  # pylint: disable=protected-access
+    compiled_rate = bench(cells, args.repeat)
+
+    print(f"{'classifier':<10} {'cells/sec':>12} {'speedup':>8}")
+    print(f"{'legacy':<10} {legacy_rate:>12.0f} {1:>7.2f}x")
+    print(f"{'compiled':<10} {compiled_rate:>12.0f} "
+          f"{compiled_rate / legacy_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
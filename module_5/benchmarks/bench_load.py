@@ -0,0 +1,91 @@
+"""Insert-path benchmark for ``load_data.py``.
+
+Loads a synthetic batch of applicant rows into the configured database
+three ways -- one ``INSERT ... ON CONFLICT`` per row via ``executemany``
+(``--method insert``), and ``COPY`` into the staging table followed by one
+set-based merge, in text and binary format (``--method copy``) -- and
+prints rows/sec for each. Every run happens in a transaction that is
+rolled back, so the ``applicants`` table is left as it was.
+
+Usage::
+
+    python benchmarks/bench_load.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+SOURCE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
+
+import psycopg  # noqa: E402  pylint: disable=wrong-import-position
+
+from applicant_rows import (  # noqa: E402  pylint: disable=wrong-import-position
+    SCRAPED_PARAM_KEYS, build_insert_query, build_scraped_params)
+from staged_copy import copy_rows  # noqa: E402  pylint: disable=wrong-import-position
+from query_data import DB_CONFIG  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def build_rows(count):
+    """Return *count* insert-parameter dicts with unique URLs."""
+    return [build_scraped_params({
+        "program": f"Program {n % 290}, University {n % 1000}",
+        "comments": "Synthetic benchmark row",
+        "date_added": "Added on January 15, 2026",
+        "url": f"https://bench.example.com/result/{uuid.uuid4()}",
+        "status": ("Accepted", "Rejected", "Wait listed")[n % 3],
+        "term": "Fall 2026",
+        "US/International": ("American", "International")[n % 2],
+        "GPA": f"GPA 3.{n % 100:02d}",
+        "GRE": f"GRE {300 + n % 40}",
+        "GRE V": f"GRE V {140 + n % 30}",
+        "GRE AW": f"GRE AW {n % 6}.5",
+        "Degree": ("PhD", "Masters")[n % 2],
+    }) for n in range(count)]
+
+
+def _executemany(conn, params_list):
+    conn.cursor().executemany(
+        build_insert_query(param_keys=SCRAPED_PARAM_KEYS), params_list)
+
+
+METHODS = {
+    "insert": _executemany,
+    "copy (text)": lambda conn, params: copy_rows(conn, params),
+    "copy (binary)": lambda conn, params: copy_rows(conn, params, binary=True),
+}
+
+
+def bench(conn, load, params_list):
+    """Return rows/sec for *load*, rolling the load back afterwards."""
+    start = time.perf_counter()
+    with conn.transaction(force_rollback=True):
+        load(conn, params_list)
+        elapsed = time.perf_counter() - start
+    return len(params_list) / elapsed
+
+
+def main():
+    """Print a rows/sec table for each load method."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000,
+                        help="rows loaded per run (default: 20000)")
+    args = parser.parse_args()
+
+    params_list = build_rows(args.rows)
+    baseline = None
+    with psycopg.connect(**DB_CONFIG, autocommit=True) as conn:
+        print(f"{'method':<14} {'rows/sec':>10} {'speedup':>8}")
+        for name, load in METHODS.items():
+            rate = bench(conn, load, params_list)
+            baseline = baseline or rate
+            print(f"{name:<14} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Parse-stage throughput benchmark for ``CrawlOptions.parse_workers``.
+
+Feeds already-fetched synthetic survey pages (see ``bench_parsers``)
+through the scraper's parse stage — in-process, then with 1, 2, 4, ...
+worker processes up to the CPU count — and prints pages/sec for each, so
+the scaling across cores can be read off directly.
+
+Usage::
+
+    python benchmarks/bench_parse_workers.py [--pages N] [--rows N]
+        [--parser NAME] [--max_workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+SOURCE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
+
+from bench_parsers import build_page  # noqa: E402  pylint: disable=wrong-import-position
+import survey_parser  # noqa: E402  pylint: disable=wrong-import-position
+from scrape import CrawlOptions, _parse_remaining  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def worker_counts(max_workers):
+    """Return ``0`` (in-process) followed by powers of two up to the max."""
+    counts = [0]
+    count = 1
+    while count < max_workers:
+        counts.append(count)
+        count *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def bench(html, pages, parser, parse_workers):
+    """Return pages/sec for parsing *pages* copies of *html*."""
+    opts = CrawlOptions(parser=parser, parse_workers=parse_workers)
+    fetched = ((page_num, html) for page_num in range(2, pages + 2))
+    start = time.perf_counter()
+    parsed = sum(1 for _ in _parse_remaining(fetched, opts))
+    assert parsed == pages
+    return pages / (time.perf_counter() - start)
+
+
+def main():
+    """Print a pages/sec table for each parse worker count."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400,
+                        help="pages parsed per run (default: 400)")
+    parser.add_argument("--rows", type=int, default=20,
+                        help="applicants per page (default: 20)")
+    parser.add_argument("--parser", choices=survey_parser.BACKENDS,
+                        default=survey_parser.DEFAULT_BACKEND,
+                        help="parser backend (default: html.parser)")
+    parser.add_argument("--max_workers", type=int,
+                        default=os.cpu_count() or 1,
+                        help="largest worker count (default: CPU count)")
+    args = parser.parse_args()
+
+    html = build_page(args.rows)
+    baseline = None
+    print(f"{'parse_workers':<14} {'pages/sec':>10} {'speedup':>8}")
+    for parse_workers in worker_counts(max(1, args.max_workers)):
+        rate = bench(html, args.pages, args.parser, parse_workers)
+        baseline = baseline or rate
+        print(f"{parse_workers:<14} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Pages/sec benchmark for the scraper's HTML parser backends.
+
+Builds a synthetic GradCafe survey page (20 applicants, each with a main,
+detail and comment row, plus pagination links) and times ``parse_page``
+— the per-page parsing work of a crawl — for every backend in
+``survey_parser.BACKENDS``.
+
+Usage::
+
+    python benchmarks/bench_parsers.py [--pages N] [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+SOURCE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
+
+import survey_parser  # noqa: E402  pylint: disable=wrong-import-position
+from scrape import parse_page, parse_survey  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def build_page(rows):
+    """Return a survey page with *rows* applicants."""
+    body = []
+    for i in range(rows):
+        body.append(
+            f"<tr><td><div>University {i}</div></td>"
+            f"<td><div><span>Program {i}</span><span>PhD</span></div></td>"
+            f"<td>January {i % 28 + 1}, 2026</td>"
+            f"<td><div>Accepted on {i % 28 + 1} Jan</div></td>"
+            f"<td><a href=\"/result/{1000 + i}\">See More</a>"
+            f"<a href=\"#\">Report</a></td></tr>"
+            f"<tr><td><div><div>Fall 2026</div><div>International</div>"
+            f"<div>GPA 3.{i % 10}0</div><div>GRE 320</div>"
+            f"<div>GRE V 160</div><div>GRE AW 4.5</div></div></td></tr>"
+            f"<tr><td><p>Comment number {i} &mdash; thanks all!</p></td></tr>"
+        )
+    pager = "".join(f"<a href=\"?page={n}\">{n}</a>" for n in range(1, 11))
+    return ("<!DOCTYPE html><html><head><title>Survey</title>"
+            "<script>window.x = 1;</script></head><body><table><thead>"
+            "<tr><th>School</th><th>Program</th><th>Added On</th>"
+            "<th>Decision</th><th></th></tr></thead><tbody>"
+            + "".join(body)
+            + f"</tbody></table><nav>{pager}</nav></body></html>")
+
+
+def available_backends():
+    """Return the backends whose dependencies are installed."""
+    names = []
+    for name in survey_parser.BACKENDS:
+        try:
+            parse_survey("", name)
+        except Exception:  # pylint: disable=broad-exception-caught
+            continue   # e.g. bs4.FeatureNotFound when lxml is missing
+        names.append(name)
+    return names
+
+
+def bench(backend, html, pages):
+    """Return pages/sec for parsing *html* *pages* times with *backend*."""
+    start = time.perf_counter()
+    for _ in range(pages):
+        parse_page(html, backend)
+    return pages / (time.perf_counter() - start)
+
+
+def main():
+    """Run every available backend and print a pages/sec table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200,
+                        help="pages parsed per backend (default: 200)")
+    parser.add_argument("--rows", type=int, default=20,
+                        help="applicants per page (default: 20)")
+    args = parser.parse_args()
+
+    html = build_page(args.rows)
+    reference = parse_survey(html, survey_parser.DEFAULT_BACKEND)
+    baseline = None
+    print(f"{'backend':<12} {'pages/sec':>10} {'speedup':>8}")
+    for backend in available_backends():
+        assert parse_survey(html, backend) == reference, backend
+        rate = bench(backend, html, args.pages)
+        baseline = baseline or rate
+        print(f"{backend:<12} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
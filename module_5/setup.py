@@ -17,6 +17,21 @@ setup(
         "cleanup_data",
         "scrape",
         "robots_checker",
+        "rate_limiter",
+        "http_session",
+        "page_cache",
+        "survey_parser",
+        "crawl_output",
+        "survey_rows",
+        "fetch_retry",
+        "result_enricher",
+        "page_archive",
+        "reparse",
+        "applicant_record",
+        "url_filter",
+        "applicant_rows",
+        "staged_copy",
+        "table_swap",
     ],
     install_requires=[
         "Flask>=3.0",
@@ -7,33 +7,111 @@ scrape new data from thegradcafe.com and insert it into the database.
 """
 from __future__ import annotations
 
+import functools
+import http.client
 import logging
 import time
-from datetime import datetime
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
-from urllib.error import URLError, HTTPError
-
 from flask import Flask, render_template, jsonify, request, Response
 import psycopg
-from psycopg import OperationalError
+from psycopg import OperationalError, sql
 from psycopg.cursor import Cursor
 
-from scrape import fetch_page, parse_survey, get_max_pages
-
-from load_data import clean_text, build_score_params, build_insert_query
-from query_data import run_queries, DB_CONFIG
+from fetch_retry import CrawlReport, RetryPolicy
+from http_session import HttpSession
+from page_cache import cache_from_env
+from rate_limiter import AdaptiveRateLimiter, schedule_from_env
+from result_enricher import DEFAULT_BATCH_SIZE, allowed_urls, enrich_batches
+from robots_checker import DEFAULT_USER_AGENT, RobotsCache
+from scrape import fetch_page, parse_page
+from url_filter import UrlFilter
+
+from applicant_rows import (
+    SCRAPED_PARAM_KEYS, build_insert_query, build_scraped_params)
+from query_data import run_queries, DB_CONFIG, MAX_QUERY_LIMIT
 from cleanup_data import fix_gre_aw, fix_uc_universities
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-_INSERT_PARAM_KEYS = [
-    "program", "comments", "date_added", "url", "status", "term",
-    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
-    "llm_program", "llm_university",
-]
+# Survey pages fetched at once after a boundary search
+SEARCH_WORKERS = 4
+
+# Survey listing that /pull-data crawls
+SURVEY_URL = "https://www.thegradcafe.com/survey/"
+
+
+@dataclass
+class PullContext:
+    """State shared by the steps of one ``/pull-data`` request.
+
+    :ivar fetch: Callable taking a URL and returning the page body.
+    :ivar parse_page: Callable returning a ``scrape.ParsedPage``.
+    :ivar pacer: Books every request of the pull; its interval follows
+        the server's responses.
+    :vartype pacer: rate_limiter.AdaptiveRateLimiter
+    :ivar base_url: Survey listing URL; page *n* is ``?page=n``.
+    :vartype base_url: str
+    :ivar report: Records retried and failed URLs.
+    :vartype report: fetch_retry.CrawlReport
+    :ivar new_urls: Collects the result URLs of the inserted rows, or
+        ``None`` when nobody needs them.
+    :vartype new_urls: list[str] or None
+    :ivar url_filter: Optional filter of stored URLs; inserted URLs are
+        added to it.
+    :vartype url_filter: url_filter.UrlFilter or None
+    """
+    fetch: Callable[[str], Any]
+    parse_page: Callable[[Any], Any]
+    pacer: AdaptiveRateLimiter
+    base_url: str = SURVEY_URL
+    report: CrawlReport = field(default_factory=CrawlReport)
+    new_urls: list[str] | None = None
+    url_filter: UrlFilter | None = None
+
+    def paced_fetch(self):
+        """Wrap :attr:`fetch` with the pacer's feedback and jittered retries.
+
+        Retries wait for the later of their backoff and the next pacer
+        slot; failures that outlast the retries are recorded in
+        :attr:`report`.
+        """
+        pacer = self.pacer
+        return RetryPolicy().wrap(
+            pacer.observe(self.fetch), self.report,
+            lambda backoff: time.sleep(max(backoff, pacer.reserve())))
+
+    def page_url(self, page_num):
+        """Return the URL of survey page *page_num*.
+
+        :rtype: str
+        """
+        return self.base_url if page_num == 1 else (
+            f"{self.base_url}?page={page_num}")
+
+
+@dataclass
+class PullResources:
+    """Long-lived helpers that ``/pull-data`` reuses across requests.
+
+    :ivar http_session: Keep-alive session for the survey pages and
+        robots.txt, or ``None`` for one connection per request.
+    :vartype http_session: http_session.HttpSession or None
+    :ivar robots_cache: Shared robots.txt cache; when given, robots.txt
+        is checked through it and its ``Crawl-delay`` is honoured.
+    :vartype robots_cache: robots_checker.RobotsCache or None
+    :ivar url_filter: In-memory filter of stored URLs, warmed on the
+        first pull, so pages of new entries skip the duplicate lookup.
+    :vartype url_filter: url_filter.UrlFilter or None
+    """
+    http_session: HttpSession | None = None
+    robots_cache: RobotsCache | None = None
+    url_filter: UrlFilter | None = None
 
 
 def insert_row(cur: Cursor, row: dict[str, Any]) -> bool:
@@ -49,27 +127,8 @@ def insert_row(cur: Cursor, row: dict[str, Any]) -> bool:
     :returns: ``True`` if the row was inserted, ``False`` if it was a duplicate.
     :rtype: bool
     """
-    # Parse the "Added on January 15, 2026" date format
-    date_str = clean_text(row.get("date_added", "")).replace("Added on ", "")
-    try:
-        date_val = datetime.strptime(date_str, "%B %d, %Y").date()
-    except ValueError:
-        date_val = None
-
-    query = build_insert_query(param_keys=_INSERT_PARAM_KEYS)
-    params = {
-        "program": clean_text(row.get("program", "")),
-        "comments": clean_text(row.get("comments", "")),
-        "date_added": date_val,
-        "url": clean_text(row.get("url", "")),
-        "status": clean_text(row.get("status", "")),
-        "term": clean_text(row.get("term", "")),
-        "us_or_international": clean_text(row.get("US/International", "")),
-        **build_score_params(row),
-        "llm_program": clean_text(row.get("program_name", "")),
-        "llm_university": clean_text(row.get("school", "")),
-    }
-    cur.execute(query, params)
+    query = build_insert_query(param_keys=SCRAPED_PARAM_KEYS)
+    cur.execute(query, build_scraped_params(row, name_fallback=True))
     return cur.rowcount > 0
 
 
@@ -87,9 +146,76 @@ def _parse_max_pages(req):
         return 100
 
 
-def _scrape_pages(conn, _fetch, _parse, _maxpg, base_url, max_pages, delay):
+def _parse_enrich(req):
+    """Return whether the request body asks for ``"enrich": true``.
+
+    :rtype: bool
+    """
+    return bool(req.is_json and req.json.get("enrich") is True)
+
+
+def _parse_search(req):
+    """Return whether the request body asks for ``"search": true``.
+
+    :rtype: bool
+    """
+    return bool(req.is_json and req.json.get("search") is True)
+
+
+def _store_rows(cur, rows, ctx, prefilter=True):
+    """Insert one page's new rows, joining comment lists first.
+
+    With *prefilter*, the page's URLs are looked up in one query (see
+    :func:`_known_urls`) and rows already stored never reach the
+    ``INSERT``; rows without a URL always do. URLs ``ctx.url_filter``
+    rules out skip the lookup: one stored by another process since the
+    filter was warmed still meets ``ON CONFLICT (url) DO NOTHING``, so
+    the filter only decides which rows may cost a rejected ``INSERT``.
+    Inserted URLs are appended to ``ctx.new_urls``; inserted and
+    rejected URLs alike are added to ``ctx.url_filter``.
+
+    :type ctx: PullContext
+    :param prefilter: ``False`` when the page is known to hold no stored
+        URL, which skips the lookup.
+    :type prefilter: bool
+    :returns: The number of rows inserted.
+    :rtype: int
+    """
+    if prefilter:
+        urls = (row.get("url") for row in rows)
+        if ctx.url_filter is not None:
+            urls = (url for url in urls if url in ctx.url_filter)
+        known = _known_urls(cur, urls, ctx.url_filter)
+        rows = [row for row in rows if row.get("url") not in known]
+    inserted = 0
+    for row in rows:
+        if isinstance(row.get("comments"), list):
+            row["comments"] = " ".join(row["comments"]).strip()
+        stored = insert_row(cur, row)
+        if stored:
+            inserted += 1
+        if row.get("url"):
+            if stored and ctx.new_urls is not None:
+                ctx.new_urls.append(row["url"])
+            if ctx.url_filter is not None:
+                ctx.url_filter.add(row["url"])
+    return inserted
+
+
+def _scrape_pages(conn, ctx, max_pages):
     """Fetch and insert pages until caught up or limit reached.
 
+    Page 1 is parsed once for both its rows and the pagination links.
+    Every fetch reports to ``ctx.pacer``, which schedules each request
+    one interval after the previous one started; parse and insert time
+    is absorbed into that wait rather than added to it. Transient fetch
+    errors are retried with a jittered backoff and recorded in
+    ``ctx.report``; a page that still fails aborts the pull, since
+    skipping it could hide entries the "caught up" check relies on.
+
+    :type ctx: PullContext
+    :param max_pages: Highest page that may be fetched.
+    :type max_pages: int
     :returns: ``(pages_fetched, total_scraped, total_inserted)``
     :rtype: tuple[int, int, int]
     """
@@ -98,30 +224,23 @@ def _scrape_pages(conn, _fetch, _parse, _maxpg, base_url, max_pages, delay):
     total_inserted = 0
     pages_fetched = 0
 
-    html = _fetch(base_url)
-    pages_to_check = min(_maxpg(html), max_pages)
+    _fetch = ctx.paced_fetch()
+    time.sleep(ctx.pacer.reserve())
+    rows, max_page = ctx.parse_page(_fetch(ctx.base_url))
+    pages_to_check = min(max_page, max_pages)
 
     for page_num in range(1, pages_to_check + 1):
         if page_num > 1:
-            time.sleep(delay)
-            html = _fetch(f"{base_url}?page={page_num}")
+            time.sleep(ctx.pacer.reserve())
+            rows = ctx.parse_page(_fetch(ctx.page_url(page_num))).rows
 
-        rows = _parse(html)
         if not rows:
             break
 
-        for row in rows:
-            if isinstance(row.get("comments"), list):
-                row["comments"] = " ".join(row["comments"]).strip()
-
         pages_fetched += 1
-        page_inserted = 0
-
-        for row in rows:
-            total_scraped += 1
-            if insert_row(cur, row):
-                total_inserted += 1
-                page_inserted += 1
+        total_scraped += len(rows)
+        page_inserted = _store_rows(cur, rows, ctx)
+        total_inserted += page_inserted
 
         if page_inserted == 0:
             logger.info("Caught up after %d pages", pages_fetched)
@@ -130,6 +249,165 @@ def _scrape_pages(conn, _fetch, _parse, _maxpg, base_url, max_pages, delay):
     return pages_fetched, total_scraped, total_inserted
 
 
+def _known_urls(cur, urls, url_filter=None):
+    """Return the subset of *urls* already stored in ``applicants``.
+
+    One lookup on the unique ``url`` index, however many URLs are given;
+    no query runs when none is left. Every URL is checked against the
+    database, since a URL stored by another process may be missing from
+    any in-memory filter. The URLs found are added to *url_filter*, so
+    the filter catches up with such rows on a best-effort basis.
+
+    :param cur: An open database cursor.
+    :type cur: psycopg.cursor.Cursor
+    :param urls: Candidate result URLs; empty ones are ignored.
+    :type urls: collections.abc.Iterable[str]
+    :param url_filter: Optional filter of stored URLs to update.
+    :type url_filter: url_filter.UrlFilter or None
+    :rtype: set[str]
+    """
+    urls = sorted({url for url in urls if url})
+    if not urls:
+        return set()
+    query = sql.SQL("SELECT {} FROM {} WHERE {} = ANY(%s) LIMIT %s").format(
+        sql.Identifier("url"),
+        sql.Identifier("applicants"),
+        sql.Identifier("url"),
+    )
+    cur.execute(query, (urls, min(len(urls), MAX_QUERY_LIMIT)))
+    known = {row[0] for row in cur.fetchall()}
+    if url_filter is not None:
+        for url in known:
+            url_filter.add(url)
+    return known
+
+
+def _find_boundary(is_known, last_page):
+    """Return the first page for which *is_known* holds, or *last_page*.
+
+    Probes pages 1, 2, 4, 8, ... until one is known, then binary-searches
+    the gap since the previous probe, so ``n`` pages of new entries cost
+    about ``2 * log2(n)`` probes instead of ``n`` fetches. *is_known*
+    must be monotonic: GradCafe lists newest entries first, so once a
+    page holds stored entries every later page does too.
+
+    :param is_known: Callable taking a page number.
+    :param last_page: The highest page that may be fetched.
+    :type last_page: int
+    :rtype: int
+    """
+    if is_known(1):
+        return 1
+    low, high = 1, last_page
+    probe = 2
+    while probe < last_page:
+        if is_known(probe):
+            high = probe
+            break
+        low = probe
+        probe *= 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if is_known(middle):
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+def _fetch_to_boundary(cur, ctx, max_pages, workers):
+    """Find where stored entries begin and fetch every page before it.
+
+    A page counts as known when it is empty or lists a stored URL (see
+    :func:`_find_boundary`). Probed pages are kept, and the remaining
+    pages up to the boundary are fetched by *workers* threads that all
+    book their requests from ``ctx.pacer``.
+
+    :type ctx: PullContext
+    :returns: ``(pages, boundary)``, where *pages* maps page numbers to
+        their rows.
+    :rtype: tuple[dict[int, list[dict]], int]
+    """
+    _fetch = ctx.paced_fetch()
+    time.sleep(ctx.pacer.reserve())
+    rows, max_page = ctx.parse_page(_fetch(ctx.base_url))
+    pages = {1: rows}
+
+    def _page_rows(page_num):
+        time.sleep(ctx.pacer.reserve())
+        return ctx.parse_page(_fetch(ctx.page_url(page_num))).rows
+
+    def _is_known(page_num):
+        if page_num not in pages:
+            pages[page_num] = _page_rows(page_num)
+        page_rows = pages[page_num]
+        return not page_rows or bool(_known_urls(
+            cur, (row.get("url") for row in page_rows), ctx.url_filter))
+
+    boundary = _find_boundary(_is_known, min(max_page, max_pages))
+    missing = [n for n in range(2, boundary + 1) if n not in pages]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        try:
+            pages.update(zip(missing, pool.map(_page_rows, missing)))
+        finally:
+            # A failed page must not wait for the queued fetches
+            pool.shutdown(wait=False, cancel_futures=True)
+    logger.info("Stored entries begin on page %d; fetched %d pages",
+                boundary, len(pages))
+    return pages, boundary
+
+
+def _search_pages(conn, ctx, max_pages, workers=SEARCH_WORKERS):
+    """Find where stored entries begin, then fetch the new pages at once.
+
+    The pages are fetched by :func:`_fetch_to_boundary` and their rows
+    inserted in page order on this connection. Fetch failures abort the
+    pull as in :func:`_scrape_pages`. Only the boundary page can hold
+    stored rows, so it is the only one filtered before its ``INSERT``.
+
+    :type ctx: PullContext
+    :param max_pages: Highest page that may be fetched.
+    :type max_pages: int
+    :returns: ``(pages_fetched, total_scraped, total_inserted)``
+    :rtype: tuple[int, int, int]
+    """
+    cur = conn.cursor()
+    pages, boundary = _fetch_to_boundary(cur, ctx, max_pages, workers)
+    total_scraped = 0
+    total_inserted = 0
+    for page_num in range(1, boundary + 1):
+        rows = pages[page_num]
+        if not rows:
+            break
+        total_scraped += len(rows)
+        total_inserted += _store_rows(cur, rows, ctx,
+                                      prefilter=page_num == boundary)
+    return len(pages), total_scraped, total_inserted
+
+
+def _enrich_new_rows(conn, ctx, robots):
+    """Fill the new rows' missing fields from their ``/result/`` pages.
+
+    Runs inside the pull's transaction and books its requests from the
+    same ``ctx.pacer`` as the survey pages, so the detail pages share the
+    pull's request budget. Pages that still fail after their retries are
+    recorded in ``ctx.report`` and leave their rows as scraped.
+
+    :type ctx: PullContext
+    :param robots: A ``RobotsChecker``, or ``None`` to skip the check.
+    :returns: The number of rows updated.
+    :rtype: int
+    """
+    pacer = ctx.pacer
+    fetch = RetryPolicy().wrap(pacer.observe(ctx.fetch), ctx.report,
+                               pacer.acquire)
+    urls = allowed_urls(ctx.new_urls, robots, ctx.report)
+    batches = [urls[i:i + DEFAULT_BATCH_SIZE]
+               for i in range(0, len(urls), DEFAULT_BATCH_SIZE)]
+    return sum(batch.updated for batch in enrich_batches(
+        conn.cursor(), batches, fetch, pacer))
+
+
 def _run_cleanup(conn, total_inserted):
     """Run data-cleanup routines when new rows were inserted.
 
@@ -153,14 +431,74 @@ def _handle_index():
         return render_template("index.html", error="Database connection failed")
 
 
-def _handle_pull_data(_fetch, _parse, _maxpg):
+def _pull_delay(robots):
+    """Return the ``/pull-data`` request delay.
+
+    The delay is 0.5 s, or the robots.txt ``Crawl-delay`` when that is
+    longer and robots.txt is consulted.
+
+    :param robots: A ``RobotsChecker``, or ``None`` without a robots cache.
+    :rtype: float
+    """
+    delay = 0.5
+    if robots is None:
+        return delay
+    return max(delay, robots.get_crawl_delay(delay))
+
+
+def _robots_refusal(robots):
+    """Return the error response when robots.txt stops the pull, else ``None``.
+
+    A robots.txt that could not be read stops the pull as well, but with
+    ``503`` and its cause: the site may allow scraping once it answers.
+
+    :param robots: A ``RobotsChecker`` for :data:`SURVEY_URL`.
+    :rtype: tuple[flask.Response, int] or None
+    """
+    if robots.fetch_error is not None:
+        logger.error("Could not read robots.txt for %s: %s", SURVEY_URL,
+                     robots.fetch_error)
+        return jsonify({"error": "robots.txt unavailable",
+                        "cause": robots.fetch_error}), 503
+    if not robots.can_fetch(SURVEY_URL):
+        logger.error("robots.txt disallows access to %s", SURVEY_URL)
+        return jsonify({"error": "robots.txt disallows scraping"}), 403
+    return None
+
+
+def _handle_pull_data(_fetch, _parse_page, resources):
     """Core logic for the ``/pull-data`` route.
 
+    With ``"search": true`` in the request body, the pages holding new
+    entries are found by :func:`_search_pages` and fetched concurrently
+    instead of one by one. With ``"enrich": true``, the inserted rows are
+    completed from their ``/result/`` pages before cleanup runs.
+
+    :param resources: Helpers shared across pulls. With a
+        ``robots_cache``, robots.txt must allow the survey (``403``
+        otherwise, or ``503`` when it cannot be read) and its
+        ``Crawl-delay`` is honoured. A ``url_filter`` is warmed from the
+        database on the first pull.
+    :type resources: PullResources
     :returns: A Flask JSON response (possibly with a status code tuple).
     """
-    max_pages = _parse_max_pages(request)
-    base_url = "https://www.thegradcafe.com/survey/"
-    delay = 0.5
+    robots = None
+    if resources.robots_cache is not None:
+        robots = resources.robots_cache.get(SURVEY_URL, DEFAULT_USER_AGENT,
+                                            resources.http_session)
+        refusal = _robots_refusal(robots)
+        if refusal is not None:
+            return refusal
+    delay = _pull_delay(robots)
+    # The delay is the fastest pace; the limiter only slows down when the
+    # server struggles. With $SCRAPE_RATE_LOCK set, every worker books its
+    # requests from the same schedule.
+    ctx = PullContext(
+        _fetch, _parse_page,
+        AdaptiveRateLimiter(delay, min_interval=delay,
+                            schedule=schedule_from_env()),
+        new_urls=[] if _parse_enrich(request) else None,
+        url_filter=resources.url_filter)
 
     try:
         conn = psycopg.connect(**DB_CONFIG)
@@ -169,14 +507,14 @@ def _handle_pull_data(_fetch, _parse, _maxpg):
         return jsonify({"error": "Database connection failed"}), 500
 
     try:
-        pages_fetched, total_scraped, total_inserted = _scrape_pages(
-            conn, _fetch, _parse, _maxpg, base_url, max_pages, delay,
-        )
-    except (URLError, HTTPError) as e:
+        counts = _pull_into(conn, ctx, robots)
+    # URLError/HTTPError, timeouts, resets; HTTPException for a broken response
+    except (OSError, http.client.HTTPException) as e:
         logger.error("Network error during scrape: %s", e)
         conn.rollback()
         conn.close()
-        return jsonify({"error": "Network error during scrape"}), 500
+        return jsonify({"error": "Network error during scrape",
+                        "report": ctx.report.as_dict()}), 500
     except psycopg.Error as e:
         logger.error("Database error during scrape: %s", e)
         conn.rollback()
@@ -184,7 +522,7 @@ def _handle_pull_data(_fetch, _parse, _maxpg):
         return jsonify({"error": "Database error during scrape"}), 500
 
     try:
-        cleaned_gre, cleaned_uc = _run_cleanup(conn, total_inserted)
+        cleaned = _run_cleanup(conn, counts[2])
     except psycopg.Error as e:
         logger.error("Cleanup error: %s", e)
         conn.rollback()
@@ -193,7 +531,41 @@ def _handle_pull_data(_fetch, _parse, _maxpg):
 
     conn.commit()
     conn.close()
+    return _pull_response(ctx, counts, cleaned)
+
+
+def _pull_into(conn, ctx, robots):
+    """Scrape new entries into *conn* and optionally enrich them.
 
+    Runs inside the pull's transaction; the caller commits or rolls back.
+
+    :type ctx: PullContext
+    :param robots: A ``RobotsChecker``, or ``None`` to skip the check of
+        the result pages.
+    :returns: ``(pages_fetched, total_scraped, total_inserted, enriched)``
+    :rtype: tuple[int, int, int, int]
+    """
+    scrape_pages = _search_pages if _parse_search(request) else _scrape_pages
+    if ctx.url_filter is not None:
+        ctx.url_filter.warm(conn)
+    counts = scrape_pages(conn, ctx, _parse_max_pages(request))
+    enriched = 0
+    if ctx.new_urls:
+        enriched = _enrich_new_rows(conn, ctx, robots)
+    return (*counts, enriched)
+
+
+def _pull_response(ctx, counts, cleaned):
+    """Build the JSON response of a successful pull.
+
+    :type ctx: PullContext
+    :param counts: ``(pages_fetched, total_scraped, total_inserted,
+        enriched)`` from :func:`_pull_into`.
+    :param cleaned: ``(cleaned_gre, cleaned_uc)`` from :func:`_run_cleanup`.
+    :rtype: flask.Response
+    """
+    pages_fetched, total_scraped, total_inserted, enriched = counts
+    cleaned_gre, cleaned_uc = cleaned
     message = _build_pull_message(
         pages_fetched, total_scraped, total_inserted,
         cleaned_gre, cleaned_uc,
@@ -205,19 +577,26 @@ def _handle_pull_data(_fetch, _parse, _maxpg):
         "inserted": total_inserted,
         "cleaned_gre_aw": cleaned_gre,
         "cleaned_uc": cleaned_uc,
+        "enriched": enriched,
         "message": message,
+        "pacing": ctx.pacer.stats(),
+        "report": ctx.report.as_dict(),
     })
 
 
-def create_app(testing=False, fetch_page_fn=None,
-               parse_survey_fn=None, get_max_pages_fn=None):
+def create_app(testing=False, fetch_page_fn=None, parse_page_fn=None,
+               resources=None):
     """Application factory for the Flask dashboard.
 
     :param testing: If ``True``, enables Flask's TESTING config flag.
     :type testing: bool
     :param fetch_page_fn: Optional callable replacing ``scrape.fetch_page``.
-    :param parse_survey_fn: Optional callable replacing ``scrape.parse_survey``.
-    :param get_max_pages_fn: Optional callable replacing ``scrape.get_max_pages``.
+    :param parse_page_fn: Optional callable replacing ``scrape.parse_page``;
+        it must return a ``scrape.ParsedPage`` of ``(rows, max_page)``.
+    :param resources: Optional session, robots.txt cache and URL filter
+        kept for the life of the app and reused by every ``/pull-data``;
+        by default none of them is used.
+    :type resources: PullResources or None
     :returns: Configured Flask application with routes registered.
     :rtype: Flask
     """
@@ -226,6 +605,8 @@ def create_app(testing=False, fetch_page_fn=None,
                         static_folder="website/_static")
     if testing:
         application.config["TESTING"] = True
+    if resources is None:
+        resources = PullResources()
 
     @application.route("/")
     def index() -> str:
@@ -235,10 +616,10 @@ def create_app(testing=False, fetch_page_fn=None,
     @application.route("/pull-data", methods=["POST"])
     def pull_data() -> tuple[Response, int] | Response:
         """Scrape new data from thegradcafe.com until caught up."""
-        _fetch = fetch_page_fn or fetch_page
-        _parse = parse_survey_fn or parse_survey
-        _maxpg = get_max_pages_fn or get_max_pages
-        return _handle_pull_data(_fetch, _parse, _maxpg)
+        _fetch = fetch_page_fn or functools.partial(
+            fetch_page, session=resources.http_session)
+        _parse_page = parse_page_fn or parse_page
+        return _handle_pull_data(_fetch, _parse_page, resources)
 
     return application
 
@@ -258,7 +639,9 @@ def _build_pull_message(pages_fetched, total_scraped,
     return msg
 
 
-app = create_app()
+app = create_app(resources=PullResources(
+    http_session=HttpSession(cache=cache_from_env()),
+    robots_cache=RobotsCache(), url_filter=UrlFilter()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+"""
+Compact record type for one applicant entry.
+
+An applicant used to be a dict with about fifteen string keys, which
+costs several hundred bytes per row before any value is stored.
+:class:`ApplicantRecord` keeps the same fields in ``__slots__`` and still
+behaves as a mutable mapping keyed by the original JSON names
+(``"GRE V"``, ``"US/International"``, ...), so scraper output, NDJSON
+files and code that indexes rows by those names are unchanged. A field
+that the dict would not have had (no detail row, no result link) is
+stored as ``None`` and is absent from the mapping.
+
+GPA, GRE scores and the date stay the scraped strings (``"GPA 3.90"``,
+``"Added on January 2, 2026"``): storing them as ``float``/``date``
+would rewrite the JSON form (``"GPA 3.9"``) and lose text that does not
+parse. They are parsed exactly once per row, into typed insert
+parameters, by :func:`applicant_rows.build_scraped_params`.
+"""
+
+import json
+import logging
+from collections.abc import MutableMapping
+
+logger = logging.getLogger(__name__)
+
+#: ``(json_key, attribute)`` of every field, in output order.
+FIELDS = (
+    ("program", "program"),
+    ("school", "school"),
+    ("program_name", "program_name"),
+    ("Degree", "degree"),
+    ("date_added", "date_added"),
+    ("status", "status"),
+    ("url", "url"),
+    ("GPA", "gpa"),
+    ("GRE V", "gre_v"),
+    ("GRE AW", "gre_aw"),
+    ("GRE Q", "gre_q"),
+    ("GRE", "gre"),
+    ("comments", "comments"),
+    ("term", "term"),
+    ("US/International", "us_or_international"),
+    ("llm-generated-program", "llm_generated_program"),
+    ("llm-generated-university", "llm_generated_university"),
+)
+
+_ATTRIBUTE = dict(FIELDS)
+
+# Unknown input keys already warned about
+_DROPPED_KEYS = set()
+
+
+class ApplicantRecord(MutableMapping):
+    """One applicant entry, stored in slots and read like a dict.
+
+    Attributes use Python names (``record.gre_v``); item access uses the
+    JSON keys (``record["GRE V"]``). Names outside :data:`FIELDS` are
+    rejected by the constructor and every setter; :meth:`from_dict`
+    drops them from input instead.
+    """
+
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+    def __init__(self, **attributes):
+        """Create a record from attribute-name keyword arguments.
+
+        :param attributes: Field values by attribute name; fields not
+            given are absent.
+        :raises TypeError: For an unknown attribute name.
+        """
+        for _, attribute in FIELDS:
+            setattr(self, attribute, attributes.pop(attribute, None))
+        if attributes:
+            raise TypeError(f"Unknown applicant fields: {sorted(attributes)}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a dict keyed by JSON names.
+
+        Usable as a ``json.loads`` ``object_hook``. Keys outside
+        :data:`FIELDS` are dropped, so an export with extra columns still
+        loads; each such key is logged once per process.
+
+        :param data: A parsed applicant row.
+        :type data: dict
+        :rtype: ApplicantRecord
+        """
+        unknown = data.keys() - _ATTRIBUTE.keys() - _DROPPED_KEYS
+        if unknown:
+            _DROPPED_KEYS.update(unknown)
+            logger.warning("Ignoring unknown applicant fields: %s",
+                           sorted(unknown))
+        record = cls.__new__(cls)
+        for key, attribute in FIELDS:
+            setattr(record, attribute, data.get(key))
+        return record
+
+    @classmethod
+    def from_json(cls, line):
+        """Build a record from one JSON object, e.g. an NDJSON line.
+
+        :type line: str or bytes
+        :rtype: ApplicantRecord
+        """
+        return cls.from_dict(json.loads(line))
+
+    def to_dict(self):
+        """Return the present fields as a dict keyed by JSON names.
+
+        :rtype: dict
+        """
+        return {key: getattr(self, attribute) for key, attribute in FIELDS
+                if getattr(self, attribute) is not None}
+
+    def to_json(self):
+        """Serialize the record as one line of JSON.
+
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __getitem__(self, key):
+        value = getattr(self, _ATTRIBUTE[key])
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        setattr(self, _ATTRIBUTE[key], value)
+
+    def __delitem__(self, key):
+        self[key]  # pylint: disable=pointless-statement
+        setattr(self, _ATTRIBUTE[key], None)
+
+    def __iter__(self):
+        for key, attribute in FIELDS:
+            if getattr(self, attribute) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"ApplicantRecord({self.to_dict()!r})"
+
+
+def json_default(obj):
+    """``json.dumps`` ``default`` hook that serializes records as dicts.
+
+    :raises TypeError: For any other object, as ``json`` expects.
+    """
+    if isinstance(obj, ApplicantRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} "
+                    "is not JSON serializable")
@@ -0,0 +1,381 @@
+"""
+Rows of the ``applicants`` table: its columns, input files and parameters.
+
+:func:`iter_rows` streams applicant records from the JSON array and
+NDJSON files that ``scrape.py`` writes, and :func:`build_scraped_params`
+turns each record into the parameters of :func:`build_insert_query`.
+The column list, the upsert rules and the ``CREATE TABLE`` column
+definitions are shared by :mod:`load_data`, :mod:`staged_copy` and
+:mod:`table_swap`.
+"""
+from __future__ import annotations
+
+import gzip
+import itertools
+import json
+import logging
+from datetime import datetime, date
+from typing import Any
+
+from psycopg import sql
+
+from applicant_record import ApplicantRecord
+
+logger = logging.getLogger(__name__)
+
+APPLICANT_COLUMNS = [
+    "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw",
+    "degree", "llm_generated_program", "llm_generated_university",
+]
+
+
+def build_insert_query(param_keys=None):
+    """Build an INSERT … ON CONFLICT (url) DO NOTHING query.
+
+    :param param_keys: Placeholder names for the VALUES clause.
+        Defaults to :data:`APPLICANT_COLUMNS` when ``None``.
+    :type param_keys: list[str] or None
+    :returns: A composed SQL query ready for ``cursor.execute``.
+    :rtype: psycopg.sql.Composed
+    """
+    keys = param_keys or APPLICANT_COLUMNS
+    return sql.SQL(
+        "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO NOTHING"
+    ).format(
+        sql.Identifier("applicants"),
+        sql.SQL(", ").join(sql.Identifier(c) for c in APPLICANT_COLUMNS),
+        sql.SQL(", ").join(sql.Placeholder(k) for k in keys),
+        sql.Identifier("url"),
+    )
+
+
+#: Placeholder names of :func:`build_scraped_params`, in
+#: :data:`APPLICANT_COLUMNS` order.
+SCRAPED_PARAM_KEYS = [
+    "program", "comments", "date_added", "url", "status", "term",
+    "us_or_international", "gpa", "gre", "gre_v", "gre_aw", "degree",
+    "llm_program", "llm_university",
+]
+
+# Columns an upsert never overwrites: the key and the LLM-derived names
+_UPSERT_KEPT = ("url", "llm_generated_program", "llm_generated_university")
+_NON_TEXT_COLUMNS = ("date_added", "gpa", "gre", "gre_v", "gre_aw")
+
+
+def build_upsert_query(param_keys=None):
+    """Build an INSERT … ON CONFLICT (url) DO UPDATE query.
+
+    A row whose ``url`` already exists takes every new non-empty value;
+    an empty or ``NULL`` value keeps what is stored, so a re-parse never
+    erases fields filled in by other means. The LLM-derived columns are
+    only set on insert.
+
+    :param param_keys: Placeholder names for the VALUES clause.
+        Defaults to :data:`APPLICANT_COLUMNS` when ``None``.
+    :type param_keys: list[str] or None
+    :returns: A composed SQL query ready for ``cursor.execute``.
+    :rtype: psycopg.sql.Composed
+    """
+    keys = param_keys or APPLICANT_COLUMNS
+    return sql.SQL(
+        "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {}"
+    ).format(
+        sql.Identifier("applicants"),
+        sql.SQL(", ").join(sql.Identifier(c) for c in APPLICANT_COLUMNS),
+        sql.SQL(", ").join(sql.Placeholder(k) for k in keys),
+        sql.Identifier("url"),
+        sql.SQL(", ").join(upsert_assignments()),
+    )
+
+
+def upsert_assignments():
+    """Return the ``DO UPDATE SET`` items of the upsert queries.
+
+    :rtype: list[psycopg.sql.Composed]
+    """
+    table = sql.Identifier("applicants")
+    updates = []
+    for column in APPLICANT_COLUMNS:
+        if column in _UPSERT_KEPT:
+            continue
+        new = sql.SQL("{}.{}").format(sql.Identifier("excluded"),
+                                      sql.Identifier(column))
+        if column not in _NON_TEXT_COLUMNS:
+            new = sql.SQL("NULLIF({}, '')").format(new)
+        updates.append(sql.SQL("{col} = COALESCE({new}, {table}.{col})").format(
+            col=sql.Identifier(column), new=new, table=table))
+    return updates
+
+
+def clean_text(value: Any) -> str:
+    """Strip NUL bytes that PostgreSQL text fields reject.
+
+    :param value: The input value to clean.
+    :type value: Any
+    :returns: The cleaned string with NUL bytes removed.
+    :rtype: str
+    """
+    return (value or "").replace("\x00", "")
+
+
+def parse_float(value: Any, prefix: str = "") -> float | None:
+    """Strip a prefix like 'GPA ' or 'GRE V ' and return a float, or None.
+
+    :param value: The raw value containing a numeric string.
+    :type value: Any
+    :param prefix: A prefix to strip before parsing (e.g., ``"GPA"``).
+    :type prefix: str
+    :returns: The parsed float value, or ``None`` if parsing fails.
+    :rtype: float or None
+    """
+    s = (value or "").replace(prefix, "", 1).strip()
+    try:
+        return float(s) if s else None
+    except ValueError:
+        return None
+
+
+def build_score_params(row: dict[str, Any]) -> dict[str, Any]:
+    """Build the GPA/GRE/degree portion of insert parameters.
+
+    :param row: A dictionary of scraped applicant data.
+    :type row: dict[str, Any]
+    :returns: A dict with ``gpa``, ``gre``, ``gre_v``, ``gre_aw``, and ``degree``.
+    :rtype: dict[str, Any]
+    """
+    return {
+        "gpa": parse_float(row.get("GPA", ""), "GPA"),
+        "gre": parse_float(row.get("GRE", ""), "GRE"),
+        "gre_v": parse_float(row.get("GRE V", ""), "GRE V"),
+        "gre_aw": parse_float(row.get("GRE AW", ""), "GRE AW"),
+        "degree": clean_text(row.get("Degree", "")),
+    }
+
+
+def parse_date(date_str: Any) -> date | None:
+    """Parse 'Added on January 15, 2026' date format, return ``None`` if invalid.
+
+    :param date_str: The raw date string from GradCafe.
+    :type date_str: Any
+    :returns: The parsed date, or ``None`` if the format is invalid.
+    :rtype: datetime.date or None
+    """
+    date_str = clean_text(date_str or "").replace("Added on ", "")
+    try:
+        return datetime.strptime(date_str, "%B %d, %Y").date()
+    except ValueError:
+        return None
+
+
+def build_scraped_params(
+        row: ApplicantRecord | dict[str, Any],
+        name_fallback: bool = False) -> dict[str, Any]:
+    """Build insert parameters for one applicant row.
+
+    The row is read once as an :class:`~applicant_record.ApplicantRecord`.
+    A missing LLM-generated program or university is stored as ``""``,
+    as the loader always has.
+
+    :param row: An applicant record, or a dict keyed by its JSON names.
+    :type row: applicant_record.ApplicantRecord or dict[str, Any]
+    :param name_fallback: Store the scraped program name and school in
+        place of missing LLM values, as ``/pull-data`` does for a fresh
+        scrape.
+    :type name_fallback: bool
+    :returns: A value for every key in :data:`SCRAPED_PARAM_KEYS`.
+    :rtype: dict[str, Any]
+    """
+    if not isinstance(row, ApplicantRecord):
+        row = ApplicantRecord.from_dict(row)
+    llm_program = row.llm_generated_program
+    llm_university = row.llm_generated_university
+    if name_fallback:
+        if llm_program is None:
+            llm_program = row.program_name
+        if llm_university is None:
+            llm_university = row.school
+    return {
+        "program": clean_text(row.program),
+        "comments": clean_text(row.comments),
+        "date_added": parse_date(row.date_added),
+        "url": clean_text(row.url),
+        "status": clean_text(row.status),
+        "term": clean_text(row.term),
+        "us_or_international": clean_text(row.us_or_international),
+        **build_score_params(row),
+        "llm_program": clean_text(llm_program),
+        "llm_university": clean_text(llm_university),
+    }
+
+
+#: Column holding an MD5 of each row's loaded values (see
+#: :func:`staged_copy.build_merge_query`).
+HASH_COLUMN = "content_hash"
+
+#: Column holding when :mod:`result_enricher` last fetched a row's result
+#: page, set whether or not the page filled anything.
+ENRICHED_COLUMN = "enriched_at"
+
+
+def column_defs(constraints=True):
+    """Return the column definitions of the ``applicants`` table.
+
+    :param constraints: Include the primary key and the unique ``url``
+        constraint; :func:`table_swap.swap_load` adds them after loading instead.
+    :type constraints: bool
+    :rtype: psycopg.sql.Composed
+    """
+    primary_key = " PRIMARY KEY" if constraints else ""
+    unique = " UNIQUE" if constraints else ""
+    return sql.SQL(", ").join([
+        sql.SQL("{} SERIAL" + primary_key).format(sql.Identifier("p_id")),
+        sql.SQL("{} TEXT").format(sql.Identifier("program")),
+        sql.SQL("{} TEXT").format(sql.Identifier("comments")),
+        sql.SQL("{} DATE").format(sql.Identifier("date_added")),
+        sql.SQL("{} TEXT" + unique).format(sql.Identifier("url")),
+        sql.SQL("{} TEXT").format(sql.Identifier("status")),
+        sql.SQL("{} TEXT").format(sql.Identifier("term")),
+        sql.SQL("{} TEXT").format(sql.Identifier("us_or_international")),
+        sql.SQL("{} REAL").format(sql.Identifier("gpa")),
+        sql.SQL("{} REAL").format(sql.Identifier("gre")),
+        sql.SQL("{} REAL").format(sql.Identifier("gre_v")),
+        sql.SQL("{} REAL").format(sql.Identifier("gre_aw")),
+        sql.SQL("{} TEXT").format(sql.Identifier("degree")),
+        sql.SQL("{} TEXT").format(sql.Identifier("llm_generated_program")),
+        sql.SQL("{} TEXT").format(sql.Identifier("llm_generated_university")),
+        sql.SQL("{} TEXT").format(sql.Identifier(HASH_COLUMN)),
+        sql.SQL("{} TIMESTAMPTZ").format(sql.Identifier(ENRICHED_COLUMN)),
+    ])
+
+
+def _open_text(path):
+    """Open *path* for reading text, transparently gunzipping it.
+
+    Gzip files are recognised by their magic bytes, not their name.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+#: Rows per batch of :func:`iter_batches`, ``executemany`` and progress
+#: log line.
+DEFAULT_BATCH_SIZE = 1000
+
+# Characters read from a JSON array file at a time
+_READ_SIZE = 64 * 1024
+
+
+def _iter_ndjson(f, path):
+    """Yield one record per non-blank line of *f*.
+
+    A gzip stream cut short by an interrupted crawl keeps every complete
+    line read before the break.
+    """
+    count = 0
+    try:
+        for line in f:
+            if line.strip():
+                yield ApplicantRecord.from_json(line)
+                count += 1
+    except EOFError:
+        logger.warning("Truncated file %s: loaded %d rows", path, count)
+
+
+def _iter_json_array(f):
+    """Yield the records of a JSON array whose ``[`` was already read.
+
+    The file is read in :data:`_READ_SIZE` pieces and each element is
+    decoded as soon as it is complete, so only one piece and the current
+    element are held in memory.
+
+    :raises json.JSONDecodeError: On malformed or unterminated input.
+    """
+    decoder = json.JSONDecoder(object_hook=ApplicantRecord.from_dict)
+    buffer = ""
+    pos = 0
+    eof = False
+    expect_value = True
+    first = True
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer) or (
+                not eof and len(buffer) - pos < _READ_SIZE // 2):
+            if eof and pos == len(buffer):
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            chunk = f.read(_READ_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        char = buffer[pos]
+        if char == "]" and (first or not expect_value):
+            return
+        if not expect_value:
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter",
+                                           buffer, pos)
+            pos += 1
+            expect_value = True
+            continue
+        try:
+            row, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The element may continue in the next piece
+            chunk = f.read(_READ_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield row
+        pos = end
+        expect_value = first = False
+
+
+def iter_rows(path):
+    """Stream the rows of a JSON array or NDJSON file, optionally gzipped.
+
+    A file whose first non-blank character is ``[`` is read as one JSON
+    array (the ``scrape.py --format json`` output); anything else is read
+    as NDJSON, one object per line (``--format ndjson``). Either way rows
+    are decoded as they are read, so memory does not grow with the file.
+
+    :param path: The input file.
+    :type path: str
+    :returns: Generator of records in file order.
+    :rtype: collections.abc.Iterator[applicant_record.ApplicantRecord]
+    :raises OSError: If the file cannot be opened or read.
+    :raises ValueError: On invalid JSON (``json.JSONDecodeError``).
+    """
+    with _open_text(path) as f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        if head == "[":
+            yield from _iter_json_array(f)
+        else:
+            f.seek(0)
+            yield from _iter_ndjson(f, path)
+
+
+def iter_batches(items, batch_size=DEFAULT_BATCH_SIZE):
+    """Group *items* into lists of at most *batch_size*.
+
+    :param items: Any iterable, consumed lazily.
+    :param batch_size: Items per batch, at least 1.
+    :type batch_size: int
+    :rtype: collections.abc.Iterator[list]
+    """
+    items = iter(items)
+    batch_size = max(1, batch_size)
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
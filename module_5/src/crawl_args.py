@@ -0,0 +1,134 @@
+"""
+Command-line options shared by the GradCafe crawling scripts.
+
+``scrape.py``, ``result_enricher.py`` and ``reparse.py`` add the same
+request and output options through these helpers and resolve the paths
+they name the same way: a file or directory given on the command line is
+always kept in the working directory.
+"""
+import os
+
+import robots_checker
+from http_session import DEFAULT_TIMEOUT
+from rate_limiter import RATE_LOCK_ENV
+
+
+def add_request_arguments(parser):
+    """Add the options every GradCafe crawler shares to *parser*.
+
+    They cover the User-Agent and robots.txt check, request timeouts,
+    retries and the shared rate-limit lock file, so ``scrape.py`` and
+    ``result_enricher.py`` take the same flags for them.
+
+    :type parser: argparse.ArgumentParser
+    """
+    parser.add_argument(
+        "--user_agent", "-u",
+        type=str,
+        default=robots_checker.DEFAULT_USER_AGENT,
+        help=("User agent string to use for requests "
+              f"(default: {robots_checker.DEFAULT_USER_AGENT})")
+    )
+    parser.add_argument(
+        "--ignore_robots",
+        action="store_true",
+        help="ignore robots.txt check (not recommended) (default: False)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT[1],
+        help=("seconds to wait for each read of a response before "
+              f"retrying (default: {DEFAULT_TIMEOUT[1]:g})")
+    )
+    parser.add_argument(
+        "--connect_timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT[0],
+        help=("seconds to wait for a connection before retrying "
+              f"(default: {DEFAULT_TIMEOUT[0]:g})")
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help=("retries per page after a timeout, connection error, 429 or "
+              "5xx, with jittered exponential backoff (default: 2)")
+    )
+    parser.add_argument(
+        "--rate_lock",
+        type=str,
+        help=("share request pacing through this lock file in the working "
+              "directory with other crawls and app workers using the same "
+              f"file (default: ${RATE_LOCK_ENV}, else unshared)")
+    )
+
+
+def add_output_arguments(parser):
+    """Add ``--output`` and ``--compress`` to *parser*.
+
+    Read them back with :func:`resolve_output`.
+
+    :type parser: argparse.ArgumentParser
+    """
+    parser.add_argument(
+        "--output", "-o",
+        type=str,
+        help="output file (default: stdout)"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=("none", "gzip"),
+        default="none",
+        help="compress the output file (requires --output) (default: none)"
+    )
+
+
+def cwd_path(name):
+    """Resolve *name* to a file in the current directory, or ``None``.
+
+    Only the final path component is kept so user input can never point
+    outside the working directory.
+    """
+    filename = os.path.basename(name)
+    if not filename:
+        return None
+    return os.path.join(os.getcwd(), filename)
+
+
+def resolve_output(args):
+    """Return the ``--output`` file in the current directory, or ``None``.
+
+    :param args: Parsed arguments of a parser given
+        :func:`add_output_arguments`.
+    :returns: The output path, or ``None`` for stdout.
+    :rtype: str or None
+    :raises ValueError: If the filename is invalid, or ``--compress`` is
+        given without ``--output``.
+    """
+    output_path = cwd_path(args.output) if args.output else None
+    if args.output and output_path is None:
+        raise ValueError("Invalid output filename")
+    if args.compress != "none" and output_path is None:
+        raise ValueError(f"--compress {args.compress} requires --output")
+    return output_path
+
+
+def resolve_rate_lock(args):
+    """Return the pacing lock file shared by CLI crawls, or ``None``.
+
+    ``--rate_lock`` is kept in the working directory like ``--output``.
+    Without it ``$SCRAPE_RATE_LOCK`` is used as is, since it names the
+    file the app workers share.
+
+    :param args: Parsed arguments of a parser given
+        :func:`add_request_arguments`.
+    :rtype: str or None
+    :raises ValueError: If the ``--rate_lock`` filename is invalid.
+    """
+    if not args.rate_lock:
+        return os.environ.get(RATE_LOCK_ENV)
+    path = cwd_path(args.rate_lock)
+    if path is None:
+        raise ValueError("Invalid rate lock filename")
+    return path
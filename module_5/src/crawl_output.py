@@ -0,0 +1,181 @@
+"""
+Incremental crawl output and resumable checkpoints for the scraper.
+
+:func:`write_ndjson` appends each page's rows to the output as soon as the
+page is parsed. With ``gzip`` every page becomes its own complete gzip
+member, so the file is valid after every page and can be truncated back
+to a page boundary and appended to. :class:`CrawlCheckpoint` records the
+page count fixed at crawl start, the completed pages, and the output size
+after the last completed page, so ``scrape.py --resume`` can continue an
+interrupted crawl without refetching or duplicating rows.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+from applicant_record import json_default
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+def encode_rows(rows, compress):
+    """Serialize *rows* as NDJSON bytes, one gzip member if requested.
+
+    :param rows: Applicant records or dicts.
+    :type rows: list[applicant_record.ApplicantRecord] or list[dict]
+    :param compress: ``"gzip"`` or ``"none"``.
+    :type compress: str
+    :rtype: bytes
+    """
+    data = "".join(
+        json.dumps(row, ensure_ascii=False, default=json_default) + "\n"
+        for row in rows).encode("utf-8")
+    if compress == "gzip" and data:
+        return gzip.compress(data)
+    return data
+
+
+def write_ndjson(pages, out, compress="none", checkpoint=None):
+    """Write each page's rows as JSON lines, flushing after every page.
+
+    Rows reach the output as soon as their page is parsed, so an
+    interrupted crawl still leaves every completed page on disk.
+
+    :param pages: Iterable of ``(page_num, rows)``, e.g. ``scrape.iter_pages``.
+    :param out: Writable binary stream.
+    :param compress: ``"gzip"`` to write each page as a gzip member.
+    :type compress: str
+    :param checkpoint: Optional checkpoint that drops rows already written
+        and records each page once it is flushed.
+    :type checkpoint: CrawlCheckpoint or None
+    :returns: The number of rows written.
+    :rtype: int
+    """
+    count = 0
+    for page_num, rows in pages:
+        if checkpoint is not None:
+            rows = checkpoint.new_rows(rows)
+        out.write(encode_rows(rows, compress))
+        out.flush()
+        count += len(rows)
+        if checkpoint is not None:
+            checkpoint.record_page(page_num, out.tell())
+    return count
+
+
+class CrawlCheckpoint:
+    """Progress of an NDJSON crawl, saved as JSON next to its output.
+
+    :ivar pages_to_fetch: Last page of the crawl, fixed when it started,
+        or ``None`` before page 1 has been fetched.
+    :ivar completed: Page numbers whose rows are safely in the output.
+    :ivar output_bytes: Output size after the last completed page.
+    :ivar seen_urls: Result URLs already in the output (not saved; rebuilt
+        from the output on resume).
+    """
+
+    def __init__(self, path):
+        """Create an empty checkpoint stored at *path*.
+
+        :param path: Checkpoint file path.
+        :type path: str
+        """
+        self.path = path
+        self.pages_to_fetch = None
+        self.completed = set()
+        self.output_bytes = 0
+        self.seen_urls = set()
+
+    def save(self):
+        """Atomically write the checkpoint file."""
+        state = {
+            "pages_to_fetch": self.pages_to_fetch,
+            "completed_pages": sorted(self.completed),
+            "output_bytes": self.output_bytes,
+        }
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def resume(self, output_path, compress):
+        """Load the checkpoint and roll *output_path* back to it.
+
+        Output written after the last completed page (a page cut off
+        mid-write) is truncated away, and the URLs of the rows that
+        remain are remembered so a resumed crawl never repeats them.
+
+        :param output_path: The crawl's NDJSON output file.
+        :type output_path: str
+        :param compress: ``"gzip"`` or ``"none"``, as for the output.
+        :type compress: str
+        :returns: ``True`` if there was a usable checkpoint; otherwise the
+            checkpoint is left empty and the crawl should start over.
+        :rtype: bool
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            with open(output_path, "r+b") as f:
+                f.truncate(state["output_bytes"])
+            opener = gzip.open if compress == "gzip" else open
+            with opener(output_path, "rt", encoding="utf-8") as f:
+                seen = {json.loads(line).get("url")
+                        for line in f if line.strip()}
+        except (OSError, ValueError, KeyError, EOFError):
+            return False
+        self.pages_to_fetch = state["pages_to_fetch"]
+        self.completed = set(state["completed_pages"])
+        self.output_bytes = state["output_bytes"]
+        self.seen_urls = seen
+        return True
+
+    def start(self, pages_to_fetch):
+        """Fix the crawl's page count once page 1 has been read.
+
+        :param pages_to_fetch: Last page number to fetch.
+        :type pages_to_fetch: int
+        """
+        self.pages_to_fetch = pages_to_fetch
+        self.save()
+
+    def record_page(self, page_num, output_bytes):
+        """Mark *page_num* done once its rows are flushed to the output.
+
+        :param page_num: The completed page.
+        :type page_num: int
+        :param output_bytes: Output size after the page was written.
+        :type output_bytes: int
+        """
+        self.completed.add(page_num)
+        self.output_bytes = output_bytes
+        self.save()
+
+    def new_rows(self, rows):
+        """Return the rows whose URL has not been written yet.
+
+        GradCafe lists newest entries first, so rows shift onto later
+        pages between runs; de-duplicating by URL keeps a resumed output
+        free of repeats.
+
+        :param rows: A page's applicant dicts.
+        :type rows: list[dict]
+        :rtype: list[dict]
+        """
+        fresh = []
+        for row in rows:
+            url = row.get("url")
+            if url is None or url not in self.seen_urls:
+                self.seen_urls.add(url)
+                fresh.append(row)
+        return fresh
+
+    def clear(self):
+        """Delete the checkpoint file after a completed crawl."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -25,9 +25,11 @@ GRANT CONNECT ON DATABASE applicant_data TO app_user;
 GRANT USAGE ON SCHEMA public TO app_user;
 
 -- 4. Grant only the permissions the app needs on the applicants table:
---    SELECT  — query_data.run_queries(), cleanup_data.fix_uc_universities()
+--    SELECT  — query_data.run_queries(), cleanup_data.fix_uc_universities(),
+--              app._known_urls(), url_filter.UrlFilter.warm()
 --    INSERT  — app.insert_row()
---    UPDATE  — cleanup_data.fix_gre_aw(), cleanup_data.fix_uc_universities()
+--    UPDATE  — cleanup_data.fix_gre_aw(), cleanup_data.fix_uc_universities(),
+--              result_enricher.enrich_batches()
 GRANT SELECT, INSERT, UPDATE ON TABLE applicants TO app_user;
 
 -- 5. Allow the SERIAL primary key to auto-increment on INSERT
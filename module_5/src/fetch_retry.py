@@ -0,0 +1,188 @@
+"""
+Bounded retries and per-crawl failure accounting for page fetches.
+
+A timeout, a reset connection, a truncated or garbled response, or a
+``429``/``5xx`` answer is usually transient, so :class:`RetryPolicy`
+tries such a fetch again a few times with exponential backoff and full
+jitter: each wait is drawn at random between zero and a cap that doubles
+per retry, so concurrent fetchers do not retry in lockstep. A
+``Retry-After`` header sets a minimum wait. Anything else (a ``404``, an
+offline cache miss, an undecodable page) fails at once.
+:class:`CrawlReport` records which pages were retried, failed, or
+skipped, so a crawl can report its partial failures instead of silently
+dropping pages.
+"""
+
+import http.client
+import logging
+import random
+import threading
+import time
+from urllib.error import HTTPError
+
+from page_cache import CacheMiss
+
+logger = logging.getLogger(__name__)
+
+#: HTTP statuses worth retrying: timeouts, throttling and server errors.
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_transient(error):
+    """Return whether a failed fetch is worth retrying.
+
+    :param error: The exception raised by the fetch.
+    :type error: Exception
+    :rtype: bool
+    """
+    if isinstance(error, HTTPError):
+        return error.code in TRANSIENT_STATUSES
+    if isinstance(error, http.client.HTTPException):
+        return True   # IncompleteRead, BadStatusLine: a broken response
+    return isinstance(error, OSError) and not isinstance(error, CacheMiss)
+
+
+def _retry_after(error):
+    """Return the ``Retry-After`` seconds of an HTTP error, or ``0``.
+
+    Only the delta-seconds form is understood; an HTTP date is ignored.
+    """
+    try:
+        return max(0.0, float(error.headers.get("Retry-After")))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class CrawlReport:
+    """What happened to the pages of one crawl.
+
+    Safe to share between fetcher threads.
+
+    :ivar fetched: Number of successful fetches.
+    :ivar retried: Retries made per URL.
+    :ivar failed: Final error message per URL that could not be fetched.
+    :ivar skipped: Reason per URL that was never requested.
+    """
+
+    def __init__(self):
+        self.fetched = 0
+        self.retried = {}
+        self.failed = {}
+        self.skipped = {}
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        """Count a successful fetch."""
+        with self._lock:
+            self.fetched += 1
+
+    def record_retry(self, url):
+        """Count one more retry of *url*.
+
+        :type url: str
+        """
+        with self._lock:
+            self.retried[url] = self.retried.get(url, 0) + 1
+
+    def record_failure(self, url, error):
+        """Record that *url* could not be fetched.
+
+        :type url: str
+        :param error: The last error raised for it.
+        :type error: Exception
+        """
+        with self._lock:
+            self.failed[url] = str(error)
+
+    def record_skip(self, url, reason):
+        """Record that *url* was deliberately not requested.
+
+        :type url: str
+        :param reason: Why, e.g. ``"robots.txt"``.
+        :type reason: str
+        """
+        with self._lock:
+            self.skipped[url] = reason
+
+    def as_dict(self):
+        """Summarize the report for logs and JSON responses.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "fetched": self.fetched,
+                "retries": sum(self.retried.values()),
+                "retried": dict(self.retried),
+                "failed": dict(self.failed),
+                "skipped": dict(self.skipped),
+            }
+
+
+class RetryPolicy:
+    """How often and how patiently a transient fetch error is retried."""
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=10.0):
+        """Initialize the policy.
+
+        :param attempts: Total tries per URL, including the first.
+        :type attempts: int
+        :param base_delay: Backoff cap in seconds before the first retry;
+            it doubles for every further retry.
+        :type base_delay: float
+        :param max_delay: Longest wait between two tries.
+        :type max_delay: float
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+
+    def backoff(self, retry, error=None):
+        """Return the jittered wait before retry number *retry* (from 0).
+
+        :param retry: Number of retries already made.
+        :type retry: int
+        :param error: The error being retried; its ``Retry-After`` header,
+            if any, is the minimum wait.
+        :rtype: float
+        """
+        cap = min(self.max_delay, self.base_delay * 2 ** retry)
+        return max(random.uniform(0.0, cap),
+                   min(self.max_delay, _retry_after(error)))
+
+    def wrap(self, fetch, report=None, wait=None):
+        """Return *fetch* retrying transient errors under this policy.
+
+        :param fetch: Callable taking a URL and returning its content.
+        :param report: Report that records retries, failures and
+            successes.
+        :type report: CrawlReport or None
+        :param wait: Callable that waits the given number of seconds
+            before a retry, e.g. to also take a rate-limiter slot;
+            defaults to ``time.sleep``.
+        :returns: Callable with the same signature as *fetch*; it raises
+            the last error once the attempts are used up.
+        """
+        report = report if report is not None else CrawlReport()
+        wait = wait or time.sleep
+
+        def _fetch(url):
+            retry = 0
+            while True:
+                try:
+                    result = fetch(url)
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    if retry + 1 >= self.attempts or not is_transient(e):
+                        report.record_failure(url, e)
+                        raise
+                    delay = self.backoff(retry, e)
+                    retry += 1
+                    logger.warning("Retrying %s in %.2fs (%d/%d): %s",
+                                   url, delay, retry, self.attempts - 1, e)
+                    report.record_retry(url)
+                    wait(delay)
+                else:
+                    report.record_success()
+                    return result
+
+        return _fetch
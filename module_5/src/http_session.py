@@ -0,0 +1,225 @@
+"""
+Keep-alive HTTP client for the GradCafe scraper.
+
+:class:`HttpSession` pools ``http.client`` connections per host, asks for
+gzip/deflate bodies and decompresses them, follows redirects, and can sit
+on top of a :class:`page_cache.PageCache` for conditional GETs and
+offline replay. ``scrape``, ``app`` and ``robots_checker`` share it.
+"""
+
+import gzip
+import http.client
+import threading
+import zlib
+from collections import namedtuple
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+
+import robots_checker
+from page_cache import CacheMiss, PageCache
+
+HttpResponse = namedtuple("HttpResponse", ["status", "reason", "headers", "body"])
+
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+#: ``(connect, read)`` timeout in seconds for a request.
+DEFAULT_TIMEOUT = (10.0, 30.0)
+
+
+def split_timeout(timeout):
+    """Return ``(connect, read)`` seconds for a timeout setting.
+
+    :param timeout: One number for both phases, a ``(connect, read)``
+        pair, or ``None`` to block.
+    :type timeout: float or tuple[float, float] or None
+    :rtype: tuple
+    """
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+def _decompress(body, encoding):
+    """Undo a ``Content-Encoding`` of ``gzip`` or ``deflate``.
+
+    :param body: The raw response body.
+    :type body: bytes
+    :param encoding: The ``Content-Encoding`` header value, if any.
+    :type encoding: str or None
+    :returns: The decoded body bytes.
+    :rtype: bytes
+    :raises ValueError: If the body is corrupt or truncated.
+    """
+    encoding = (encoding or "").strip().lower()
+    try:
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                # Some servers send a raw deflate stream without the zlib header
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+    except (zlib.error, EOFError) as e:
+        raise ValueError(f"Undecodable {encoding} response body: {e}") from e
+    return body
+
+
+class HttpSession:
+    """Keep-alive HTTP client shared by the scraper, the app, and robots.txt.
+
+    Idle ``http.client`` connections are pooled per ``(scheme, host)`` so
+    consecutive requests to thegradcafe.com reuse one TCP/TLS connection
+    instead of handshaking every time. Requests advertise
+    ``Accept-Encoding: gzip, deflate`` and bodies are decompressed
+    transparently. The pool is thread-safe: each in-flight request checks
+    out its own connection, so concurrent fetchers never share a socket.
+
+    With a :class:`page_cache.PageCache` attached, requests carry the
+    cached ``ETag`` / ``Last-Modified`` validators and a ``304`` answer is
+    served from disk. In *offline* mode nothing is sent at all: cached
+    pages are replayed and uncached URLs raise
+    :class:`page_cache.CacheMiss`.
+    """
+
+    def __init__(self, user_agent=robots_checker.DEFAULT_USER_AGENT,
+                 timeout=DEFAULT_TIMEOUT, cache=None, offline=False):
+        """Initialize an empty connection pool.
+
+        :param user_agent: Default User-Agent header for requests.
+        :type user_agent: str
+        :param timeout: Seconds to wait for a connection and then for each
+            read of the response, as one number or a ``(connect, read)``
+            pair; ``None`` blocks forever.
+        :type timeout: float or tuple[float, float] or None
+        :param cache: Optional on-disk response cache.
+        :type cache: page_cache.PageCache or None
+        :param offline: Serve only cached pages; requires *cache*.
+        :type offline: bool
+        """
+        if offline and cache is None:
+            raise ValueError("offline mode requires a page cache")
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _checkout(self, key):
+        """Return ``(connection, reused)`` for *key*, reusing an idle one."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = key
+        conn_cls = (http.client.HTTPSConnection if scheme == "https"
+                    else http.client.HTTPConnection)
+        return conn_cls(netloc, timeout=split_timeout(self.timeout)[0]), False
+
+    def _checkin(self, key, conn):
+        """Return a still-open connection to the idle pool."""
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def _request_once(self, url, headers):
+        """Send one GET without following redirects.
+
+        A reused keep-alive connection may have been closed by the server
+        while idle; in that case the request is retried once on a fresh
+        connection.
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request("GET", target, headers=headers)
+                # Connected (or reused): from here on only reads wait
+                conn.sock.settimeout(split_timeout(self.timeout)[1])
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        return HttpResponse(
+            response.status, response.reason, response.msg,
+            _decompress(body, response.getheader("Content-Encoding")),
+        )
+
+    def get(self, url, headers=None):
+        """GET *url*, following redirects, and return the final response.
+
+        HTTP error statuses are returned rather than raised so callers can
+        inspect them (e.g. a 404 for robots.txt). When a cache is attached,
+        a ``304 Not Modified`` comes back as a ``200`` carrying the cached
+        body.
+
+        :param url: The absolute URL to fetch.
+        :type url: str
+        :param headers: Extra request headers; they override the defaults.
+        :type headers: dict or None
+        :returns: The final response with a decompressed body.
+        :rtype: HttpResponse
+        :raises page_cache.CacheMiss: In offline mode, if *url* is not cached.
+        """
+        request_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate",
+        }
+        request_headers.update(headers or {})
+        if self.cache is None:
+            return self._follow(url, request_headers)
+
+        entry = self.cache.load(url)
+        if self.offline:
+            if entry is None:
+                raise CacheMiss(f"{url} is not cached (offline mode)")
+            return HttpResponse(200, "OK", {}, entry.body)
+
+        request_headers.update(PageCache.conditional_headers(entry))
+        response = self._follow(url, request_headers)
+        if response.status == 304 and entry is not None:
+            return HttpResponse(200, "Not Modified", response.headers,
+                                entry.body)
+        if response.status == 200:
+            self.cache.store(url, response.body, response.headers)
+        return response
+
+    def _follow(self, url, request_headers):
+        """Send the request, following up to ``_MAX_REDIRECTS`` hops."""
+        for _ in range(_MAX_REDIRECTS):
+            response = self._request_once(url, request_headers)
+            location = response.headers.get("Location")
+            if response.status not in _REDIRECT_CODES or not location:
+                return response
+            url = urljoin(url, location)
+        raise HTTPError(url, response.status, "Too many redirects",
+                        response.headers, None)
+
+    def close(self):
+        """Close every idle pooled connection."""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
@@ -1,16 +1,34 @@
-"""Load llm_extended_applicant_data.json into a PostgreSQL applicants table."""
+"""Load llm_extended_applicant_data.json into a PostgreSQL applicants table.
+
+Rows are bulk-loaded by default: streamed with ``COPY ... FROM STDIN``
+into an unlogged staging table and merged into ``applicants`` with one
+``INSERT ... SELECT ... ON CONFLICT (url) DO NOTHING`` (see
+:func:`staged_copy.copy_rows`). ``--method insert`` keeps the per-row
+``executemany`` path. ``--mode`` picks what happens to the existing
+table: recreate it (``rebuild``), upsert into it (``incremental``) or
+load a new one and rename it into place (``swap``,
+:func:`table_swap.swap_load`).
+"""
 from __future__ import annotations
 
+import argparse
+import functools
+import itertools
 import json
 import logging
 import os
-from datetime import datetime, date
-from typing import Any
+import sys
 
 import psycopg
 from psycopg import Connection, OperationalError, sql
 
+from applicant_rows import (
+    DEFAULT_BATCH_SIZE, ENRICHED_COLUMN, HASH_COLUMN, SCRAPED_PARAM_KEYS,
+    build_insert_query, build_scraped_params, column_defs, iter_batches,
+    iter_rows)
 from query_data import DB_CONFIG, MAX_QUERY_LIMIT
+from staged_copy import CopyOptions, copy_rows, parallel_copy
+from table_swap import swap_load
 
 _DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_PATH = os.path.join(_DIR, "llm_extended_applicant_data.json")
@@ -19,92 +37,6 @@ JSON_PATH = os.path.join(_DIR, "llm_extended_applicant_data.json")
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
-APPLICANT_COLUMNS = [
-    "program", "comments", "date_added", "url", "status", "term",
-    "us_or_international", "gpa", "gre", "gre_v", "gre_aw",
-    "degree", "llm_generated_program", "llm_generated_university",
-]
-
-
-def build_insert_query(param_keys=None):
-    """Build an INSERT … ON CONFLICT (url) DO NOTHING query.
-
-    :param param_keys: Placeholder names for the VALUES clause.
-        Defaults to :data:`APPLICANT_COLUMNS` when ``None``.
-    :type param_keys: list[str] or None
-    :returns: A composed SQL query ready for ``cursor.execute``.
-    :rtype: psycopg.sql.Composed
-    """
-    keys = param_keys or APPLICANT_COLUMNS
-    return sql.SQL(
-        "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO NOTHING"
-    ).format(
-        sql.Identifier("applicants"),
-        sql.SQL(", ").join(sql.Identifier(c) for c in APPLICANT_COLUMNS),
-        sql.SQL(", ").join(sql.Placeholder(k) for k in keys),
-        sql.Identifier("url"),
-    )
-
-
-def clean_text(value: Any) -> str:
-    """Strip NUL bytes that PostgreSQL text fields reject.
-
-    :param value: The input value to clean.
-    :type value: Any
-    :returns: The cleaned string with NUL bytes removed.
-    :rtype: str
-    """
-    return (value or "").replace("\x00", "")
-
-
-def parse_float(value: Any, prefix: str = "") -> float | None:
-    """Strip a prefix like 'GPA ' or 'GRE V ' and return a float, or None.
-
-    :param value: The raw value containing a numeric string.
-    :type value: Any
-    :param prefix: A prefix to strip before parsing (e.g., ``"GPA"``).
-    :type prefix: str
-    :returns: The parsed float value, or ``None`` if parsing fails.
-    :rtype: float or None
-    """
-    s = (value or "").replace(prefix, "", 1).strip()
-    try:
-        return float(s) if s else None
-    except ValueError:
-        return None
-
-
-def build_score_params(row: dict[str, Any]) -> dict[str, Any]:
-    """Build the GPA/GRE/degree portion of insert parameters.
-
-    :param row: A dictionary of scraped applicant data.
-    :type row: dict[str, Any]
-    :returns: A dict with ``gpa``, ``gre``, ``gre_v``, ``gre_aw``, and ``degree``.
-    :rtype: dict[str, Any]
-    """
-    return {
-        "gpa": parse_float(row.get("GPA", ""), "GPA"),
-        "gre": parse_float(row.get("GRE", ""), "GRE"),
-        "gre_v": parse_float(row.get("GRE V", ""), "GRE V"),
-        "gre_aw": parse_float(row.get("GRE AW", ""), "GRE AW"),
-        "degree": clean_text(row.get("Degree", "")),
-    }
-
-
-def parse_date(date_str: Any) -> date | None:
-    """Parse 'Added on January 15, 2026' date format, return ``None`` if invalid.
-
-    :param date_str: The raw date string from GradCafe.
-    :type date_str: Any
-    :returns: The parsed date, or ``None`` if the format is invalid.
-    :rtype: datetime.date or None
-    """
-    date_str = clean_text(date_str or "").replace("Added on ", "")
-    try:
-        return datetime.strptime(date_str, "%B %d, %Y").date()
-    except ValueError:
-        return None
-
 
 def create_connection(
     dbname: str, user: str, host: str | None = None
@@ -162,61 +94,220 @@ def _ensure_database(db_name, db_user, db_host):
     return True
 
 
+# Columns added after the original schema, in the order they were added.
+# A table created before them gets them from _migrate_table.
+_ADDED_COLUMNS = (
+    (HASH_COLUMN, "TEXT"),
+    (ENRICHED_COLUMN, "TIMESTAMPTZ"),
+)
+
+
 def _create_table(conn):
     """Drop and recreate the ``applicants`` table."""
     cursor = conn.cursor()
     cursor.execute(
         sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier("applicants"))
     )
-    col_defs = sql.SQL(", ").join([
-        sql.SQL("{} SERIAL PRIMARY KEY").format(sql.Identifier("p_id")),
-        sql.SQL("{} TEXT").format(sql.Identifier("program")),
-        sql.SQL("{} TEXT").format(sql.Identifier("comments")),
-        sql.SQL("{} DATE").format(sql.Identifier("date_added")),
-        sql.SQL("{} TEXT UNIQUE").format(sql.Identifier("url")),
-        sql.SQL("{} TEXT").format(sql.Identifier("status")),
-        sql.SQL("{} TEXT").format(sql.Identifier("term")),
-        sql.SQL("{} TEXT").format(sql.Identifier("us_or_international")),
-        sql.SQL("{} REAL").format(sql.Identifier("gpa")),
-        sql.SQL("{} REAL").format(sql.Identifier("gre")),
-        sql.SQL("{} REAL").format(sql.Identifier("gre_v")),
-        sql.SQL("{} REAL").format(sql.Identifier("gre_aw")),
-        sql.SQL("{} TEXT").format(sql.Identifier("degree")),
-        sql.SQL("{} TEXT").format(sql.Identifier("llm_generated_program")),
-        sql.SQL("{} TEXT").format(sql.Identifier("llm_generated_university")),
-    ])
     cursor.execute(
         sql.SQL("CREATE TABLE {} ({})").format(
-            sql.Identifier("applicants"), col_defs,
+            sql.Identifier("applicants"), column_defs(),
         )
     )
     logger.info("Table 'applicants' ready")
 
 
-def _load_json(path):
-    """Open and parse a JSON file.
+def _migrate_table(conn):
+    """Create ``applicants`` if it is missing and add any newer columns.
 
-    :returns: Parsed rows, or ``None`` on error.
-    :rtype: list or None
+    Existing rows, indexes and columns are left as they are; every
+    migration only adds a nullable column, so it is safe to rerun.
     """
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
+    cursor = conn.cursor()
+    table = sql.Identifier("applicants")
+    cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(
+        table, column_defs()))
+    for column, column_type in _ADDED_COLUMNS:
+        cursor.execute(
+            sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {} {}").format(
+                table, sql.Identifier(column), sql.SQL(column_type)))
+    logger.info("Table 'applicants' ready (incremental)")
+
+
+# Errors of reading or decoding an input file
+_READ_ERRORS = (OSError, EOFError, ValueError)
+
+
+def _log_read_error(path, error):
+    """Log why *path* could not be read."""
+    if isinstance(error, FileNotFoundError):
         logger.error("JSON file not found: %s", path)
-        return None
-    except json.JSONDecodeError as e:
-        logger.error("Invalid JSON: %s", e)
-        return None
+    elif isinstance(error, json.JSONDecodeError):
+        logger.error("Invalid JSON: %s", error)
+    else:
+        logger.error("Could not read %s: %s", path, error)
+
+
+def _iter_params(rows, batch_size):
+    """Yield insert-parameter batches of *rows*, logging progress."""
+    count = 0
+    for batch in iter_batches(map(build_scraped_params, rows), batch_size):
+        count += len(batch)
+        logger.info("Read %d rows", count)
+        yield batch
+
+
+def _build_arg_parser():
+    """Build the command-line parser for :func:`main`.
+
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Load scraped applicant data into PostgreSQL."
+    )
+    parser.add_argument(
+        "--input", "-i",
+        type=str,
+        help=("JSON array or NDJSON file, optionally gzip-compressed "
+              "(default: llm_extended_applicant_data.json)")
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("rebuild", "incremental", "swap"),
+        default="rebuild",
+        help=("rebuild: drop and recreate applicants; incremental: keep it, "
+              "insert new rows and update changed ones; swap: load a new "
+              "table and rename it into place, dropping rows /pull-data "
+              "inserts during the load (default: rebuild)")
+    )
+    parser.add_argument(
+        "--method",
+        choices=("copy", "insert"),
+        default="copy",
+        help=("copy: COPY into a staging table and merge; insert: one "
+              "INSERT per row (default: copy)")
+    )
+    parser.add_argument(
+        "--batch_size", "-b",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=("rows decoded and inserted per batch, and per progress line "
+              f"(default: {DEFAULT_BATCH_SIZE})")
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help=("worker processes, each with its own connection, that "
+              "transform and COPY the input (--method copy) (default: 1)")
+    )
+    parser.add_argument(
+        "--copy_format",
+        choices=("text", "binary"),
+        default="text",
+        help="COPY data format for --method copy (default: text)"
+    )
+    return parser
+
+
+def _copy_input(conn, path, args, connect, into=None):
+    """Load *path* with COPY as *args* asks, via one or ``--jobs`` workers.
+
+    *connect* opens each worker's connection (see
+    :func:`staged_copy.parallel_copy`).
+
+    :returns: The number of rows inserted (or updated).
+    :rtype: int
+    """
+    binary = args.copy_format == "binary"
+    incremental = args.mode == "incremental"
+    if args.jobs > 1:
+        return parallel_copy(conn, path, args.jobs, connect, CopyOptions(
+            args.batch_size, binary, incremental, into))
+    batches = _iter_params(iter_rows(path), args.batch_size)
+    return copy_rows(conn, itertools.chain.from_iterable(batches),
+                     binary=binary, incremental=incremental, into=into)
 
 
-def main() -> None:
+def _insert_input(conn, path, batch_size):
+    """Load *path* with one ``executemany`` per batch (``--method insert``).
+
+    :returns: The number of rows sent to the ``INSERT``.
+    :rtype: int
+    """
+    insert_query = build_insert_query(param_keys=SCRAPED_PARAM_KEYS)
+    cursor = conn.cursor()
+    inserted = 0
+    for batch in _iter_params(iter_rows(path), batch_size):
+        cursor.executemany(insert_query, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def _prepare_table(conn, args):
+    """Ready ``applicants`` for ``--mode`` and settle the load method.
+
+    ``rebuild`` recreates the table and ``incremental`` migrates it;
+    ``swap`` leaves it alone until :func:`table_swap.swap_load` replaces
+    it. Modes
+    other than ``rebuild`` switch ``args.method`` to ``copy``.
+    """
+    if args.mode == "incremental":
+        _migrate_table(conn)
+    elif args.mode == "rebuild":
+        _create_table(conn)
+    if args.mode != "rebuild" and args.method != "copy":
+        logger.warning("--mode %s always uses --method copy", args.mode)
+        args.method = "copy"
+    if args.jobs > 1 and args.method != "copy":
+        logger.warning("--jobs only applies to --method copy")
+
+
+def _load_input(conn, path, args, connect):
+    """Load *path* the way ``--method`` and ``--mode`` ask.
+
+    :returns: The number of rows inserted (or updated).
+    :rtype: int
+    """
+    if args.method == "insert":
+        return _insert_input(conn, path, args.batch_size)
+    if args.mode == "swap":
+        return swap_load(conn, functools.partial(
+            _copy_input, conn, path, args, connect))
+    return _copy_input(conn, path, args, connect)
+
+
+def _log_total(conn):
+    """Log how many rows ``applicants`` holds."""
+    agg_limit = min(1, MAX_QUERY_LIMIT)
+    verify_query = sql.SQL("SELECT COUNT(*) FROM {} LIMIT %s").format(
+        sql.Identifier("applicants"),
+    )
+    cursor = conn.cursor()
+    cursor.execute(verify_query, (agg_limit,))
+    logger.info("Total rows in table: %s", cursor.fetchone()[0])
+
+
+def main(argv=None) -> None:
     """Load JSON data into PostgreSQL database.
 
     Creates the ``applicant_data`` database and ``applicants`` table if they
-    do not exist, then inserts all rows from the JSON file. Duplicates are
-    skipped via ``ON CONFLICT (url) DO NOTHING``.
+    do not exist, then streams the input file's rows in batches of
+    ``--batch_size`` into :func:`staged_copy.copy_rows` or, for
+    ``--method insert``, one ``executemany`` per batch; ``--jobs`` above 1
+    hands a COPY load to :func:`staged_copy.parallel_copy`. Duplicates are skipped via
+    ``ON CONFLICT (url) DO NOTHING``. A COPY load is all or nothing; the
+    insert path keeps the batches stored before a read error.
+
+    ``--mode incremental`` keeps the table instead of recreating it
+    (:func:`_migrate_table`) and always loads with COPY, updating stored
+    rows whose content hash changed. ``--mode swap`` also loads with COPY,
+    into a new table that :func:`table_swap.swap_load` renames into place;
+    rows ``/pull-data`` inserts meanwhile are lost.
+
+    :param argv: Command-line arguments; ``None`` uses the defaults.
+    :type argv: list[str] or None
     """
+    args = _build_arg_parser().parse_args([] if argv is None else argv)
     db_name = DB_CONFIG.get("dbname", "")
     db_user = DB_CONFIG.get("user", "")
     db_host = DB_CONFIG.get("host")
@@ -228,53 +319,25 @@ def main() -> None:
     if not conn:
         return
 
-    _create_table(conn)
-
-    rows = _load_json(JSON_PATH)
-    if rows is None:
+    _prepare_table(conn, args)
+    path = args.input or JSON_PATH
+    try:
+        inserted = _load_input(conn, path, args, functools.partial(
+            create_connection, db_name, db_user, db_host))
+    except _READ_ERRORS as e:
+        _log_read_error(path, e)
         conn.close()
         return
-
-    insert_query = build_insert_query()
-    params_list = [
-        {
-            "program": clean_text(row.get("program", "")),
-            "comments": clean_text(row.get("comments", "")),
-            "date_added": parse_date(row.get("date_added", "")),
-            "url": clean_text(row.get("url", "")),
-            "status": clean_text(row.get("status", "")),
-            "term": clean_text(row.get("term", "")),
-            "us_or_international": clean_text(
-                row.get("US/International", "")
-            ),
-            **build_score_params(row),
-            "llm_generated_program": clean_text(
-                row.get("llm-generated-program", "")
-            ),
-            "llm_generated_university": clean_text(
-                row.get("llm-generated-university", "")
-            ),
-        }
-        for row in rows
-    ]
-    try:
-        conn.cursor().executemany(insert_query, params_list)
     except psycopg.Error as e:
         logger.error("Database error during insert: %s", e)
         conn.close()
         return
 
-    logger.info("Inserted %d rows", len(rows))
-
-    agg_limit = min(1, MAX_QUERY_LIMIT)
-    verify_query = sql.SQL("SELECT COUNT(*) FROM {} LIMIT %s").format(
-        sql.Identifier("applicants"),
-    )
-    cursor = conn.cursor()
-    cursor.execute(verify_query, (agg_limit,))
-    logger.info("Total rows in table: %s", cursor.fetchone()[0])
-
+    logger.info("%s %d rows",
+                "Inserted or updated" if args.mode == "incremental"
+                else "Inserted", inserted)
+    _log_total(conn)
     conn.close()
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
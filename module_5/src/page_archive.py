@@ -0,0 +1,203 @@
+"""
+Append-only archive of fetched survey pages for re-parsing.
+
+Every page is zlib-compressed and appended to a segment file
+(``segment-00000.dat``, ``segment-00001.dat``, ...); a new segment is
+started once the current one would grow past ``max_segment_bytes``. Each
+record is then listed in ``index.tsv`` as one line of segment number,
+offset, compressed length, fetch time and URL. A record is flushed
+before its index line is written, so a crash can leave unused bytes at
+the end of a segment but never an index line pointing at a partial
+record. Readers map a segment with ``mmap`` and decompress only the
+slice they need, so a re-parse reads the pages without refetching them
+(see ``reparse.py``). A URL archived by several crawls keeps every
+record; :meth:`PageArchive.load` returns the latest one. Opening an
+archive only reads it: the directory, segments and index are written by
+the first :meth:`PageArchive.store`.
+"""
+
+import mmap
+import os
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+INDEX_NAME = "index.tsv"
+
+#: Segment size after which a new segment file is started.
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+#: Where one archived page lives: segment number, byte offset and
+#: compressed length in the segment, fetch time (epoch seconds) and URL.
+ArchiveEntry = namedtuple(
+    "ArchiveEntry", ["segment", "offset", "length", "fetched_at", "url"])
+
+
+def segment_path(directory, segment):
+    """Return the path of segment number *segment* in *directory*.
+
+    :rtype: str
+    """
+    return os.path.join(directory, f"segment-{segment:05d}.dat")
+
+
+def _parse_index_line(line):
+    """Return the :class:`ArchiveEntry` of an index line, or ``None``."""
+    fields = line.rstrip("\n").split("\t", 4)
+    if len(fields) != 5:
+        return None
+    try:
+        return ArchiveEntry(int(fields[0]), int(fields[1]), int(fields[2]),
+                            float(fields[3]), fields[4])
+    except ValueError:
+        return None
+
+
+def read_entry(directory, entry):
+    """Read and decompress one archived page.
+
+    Module-level so parse worker processes can read pages themselves
+    instead of receiving the HTML from the parent.
+
+    :param directory: The archive directory.
+    :type directory: str
+    :param entry: The page's index entry.
+    :type entry: ArchiveEntry
+    :returns: The page's HTML.
+    :rtype: str
+    """
+    with open(segment_path(directory, entry.segment), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            record = data[entry.offset:entry.offset + entry.length]
+    return zlib.decompress(record).decode("utf-8")
+
+
+class PageArchive:
+    """Directory of append-only page segments and their offset index.
+
+    Safe to share between fetcher threads of one process; two processes
+    must not write to the same archive at once.
+    """
+
+    def __init__(self, directory, max_segment_bytes=DEFAULT_SEGMENT_BYTES):
+        """Open the archive in *directory*; it is created on first store.
+
+        :param directory: Path of the archive directory.
+        :type directory: str
+        :param max_segment_bytes: Size after which a new segment starts.
+        :type max_segment_bytes: int
+        """
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.Lock()
+        self._records = []
+        self._entries = {}
+        self._segment = 0
+        # Index size without a torn last line, until store() cuts it off
+        self._index_end = None
+        self._load_index()
+
+    def _load_index(self):
+        """Read ``index.tsv`` into the record list and URL → latest map.
+
+        A last line cut short by a crash is skipped here and truncated
+        away before the next store, so the next index line starts on a
+        line of its own.
+        """
+        path = os.path.join(self.directory, INDEX_NAME)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            self._index_end = complete
+        for line in data[:complete].decode("utf-8").splitlines(True):
+            entry = _parse_index_line(line)
+            if entry is not None:
+                self._add(entry)
+                self._segment = max(self._segment, entry.segment)
+
+    def _add(self, entry):
+        """Make *entry* the newest record and its URL's latest entry."""
+        self._records.append(entry)
+        self._entries.pop(entry.url, None)
+        self._entries[entry.url] = entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entries(self):
+        """Return the latest entry of every archived URL.
+
+        :returns: Entries in the order their records were written.
+        :rtype: list[ArchiveEntry]
+        """
+        with self._lock:
+            return list(self._entries.values())
+
+    def records(self):
+        """Return every archived record, including a URL's older ones.
+
+        :returns: Entries in the order their records were written.
+        :rtype: list[ArchiveEntry]
+        """
+        with self._lock:
+            return list(self._records)
+
+    def store(self, url, html):
+        """Append *html* as the latest record of *url*.
+
+        :param url: The page URL.
+        :type url: str
+        :param html: The decoded page content.
+        :type html: str
+        :rtype: ArchiveEntry
+        """
+        record = zlib.compress(html.encode("utf-8"))
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if self._index_end is not None:
+                with open(index_path, "r+b") as f:
+                    f.truncate(self._index_end)
+                self._index_end = None
+            path = segment_path(self.directory, self._segment)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size and size + len(record) > self.max_segment_bytes:
+                self._segment += 1
+                path = segment_path(self.directory, self._segment)
+                size = 0
+            with open(path, "ab") as f:
+                f.write(record)
+            entry = ArchiveEntry(self._segment, size, len(record),
+                                 round(time.time(), 3), url)
+            with open(index_path, "a", encoding="utf-8") as f:
+                f.write("\t".join(str(field) for field in entry) + "\n")
+            self._add(entry)
+        return entry
+
+    def load(self, url):
+        """Return the latest archived HTML of *url*, or ``None``.
+
+        :param url: The page URL.
+        :type url: str
+        :rtype: str or None
+        """
+        entry = self._entries.get(url)
+        return None if entry is None else read_entry(self.directory, entry)
+
+    def record(self, fetch):
+        """Wrap *fetch* so that every page it returns is archived.
+
+        :param fetch: Callable taking a URL and returning its HTML.
+        :returns: Callable with the same signature as *fetch*.
+        """
+        def _fetch(url):
+            html = fetch(url)
+            self.store(url, html)
+            return html
+
+        return _fetch
@@ -0,0 +1,116 @@
+"""
+On-disk HTTP response cache for the GradCafe scraper.
+
+Stores each fetched page body (gzip-compressed) next to its HTTP
+validators (``ETag`` / ``Last-Modified``), keyed by URL. ``HttpSession``
+uses the validators to send conditional GETs and serves ``304 Not
+Modified`` answers from disk; in offline mode it serves only cached pages.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import namedtuple
+from urllib.error import URLError
+
+CachedPage = namedtuple("CachedPage", ["url", "body", "etag", "last_modified"])
+
+#: Environment variable naming the page cache directory of the Flask app.
+CACHE_DIR_ENV = "SCRAPE_CACHE_DIR"
+
+
+class CacheMiss(URLError):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+class PageCache:
+    """Directory of cached page bodies and validators keyed by URL.
+
+    Every URL maps to two files named after the SHA-256 of the URL: a
+    ``.json`` file with the validators and a gzip-compressed ``.body``
+    file. Both are written via a temporary file and ``os.replace`` so a
+    crash never leaves a half-written entry behind.
+    """
+
+    def __init__(self, directory):
+        """Create the cache directory if needed.
+
+        :param directory: Path of the cache directory.
+        :type directory: str
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url, suffix):
+        """Return the file path for *url* with the given suffix."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + suffix)
+
+    def _write(self, path, data):
+        """Atomically replace *path* with *data*."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """Return the cached entry for *url*, or ``None`` if absent.
+
+        :param url: The page URL.
+        :type url: str
+        :rtype: CachedPage or None
+        """
+        try:
+            with open(self._path(url, ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(self._path(url, ".body"), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CachedPage(url, body, meta.get("etag"),
+                          meta.get("last_modified"))
+
+    def store(self, url, body, headers):
+        """Save *body* and the validators found in *headers*.
+
+        :param url: The page URL.
+        :type url: str
+        :param body: The decoded response body.
+        :type body: bytes
+        :param headers: Response headers (any mapping with ``get``).
+        """
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        self._write(self._path(url, ".body"), gzip.compress(body))
+        self._write(self._path(url, ".json"),
+                    json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Build ``If-None-Match`` / ``If-Modified-Since`` request headers.
+
+        :param entry: A cached entry, or ``None``.
+        :type entry: CachedPage or None
+        :returns: Headers that let the server answer ``304``.
+        :rtype: dict
+        """
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+
+def cache_from_env():
+    """Return the page cache named by ``$SCRAPE_CACHE_DIR``, if set.
+
+    :rtype: PageCache or None
+    """
+    path = os.environ.get(CACHE_DIR_ENV)
+    return PageCache(path) if path else None
@@ -61,6 +61,19 @@ DB_CONFIG: dict[str, Any] = _build_db_config()
 
 MAX_QUERY_LIMIT = 1000
 
+
+def connect_db() -> Connection | None:
+    """Open a connection with :data:`DB_CONFIG`, logging a failure.
+
+    :returns: The connection, or ``None`` when the database is unreachable.
+    :rtype: psycopg.Connection or None
+    """
+    try:
+        return psycopg.connect(**DB_CONFIG)
+    except OperationalError as e:
+        logger.error("Database connection failed: %s", e)
+        return None
+
 # ---------------------------------------------------------------------------
 # Query parameter constants
 # ---------------------------------------------------------------------------
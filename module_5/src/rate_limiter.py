@@ -0,0 +1,353 @@
+"""
+Request pacing for the GradCafe scraper.
+
+A single :class:`RateLimiter` is shared by every fetcher thread of a
+crawl so that, no matter how many requests are in flight, request start
+times stay at least one crawl delay apart. :class:`AdaptiveRateLimiter`
+additionally tunes that delay from the server's responses (AIMD). With a
+:class:`LockFileSchedule` the slots are shared by every process using the
+same lock file, e.g. several WSGI workers and CLI crawls at once.
+"""
+
+import http.client
+import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from urllib.error import HTTPError
+
+try:
+    import fcntl
+except ImportError:     # Windows has no flock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+#: One pacing adjustment made by :meth:`AdaptiveRateLimiter.record`;
+#: ``at`` is the monotonic time of the decision.
+PacingDecision = namedtuple(
+    "PacingDecision", ["status", "latency", "action", "interval", "at"])
+
+#: Environment variable naming the lock file of a shared schedule.
+RATE_LOCK_ENV = "SCRAPE_RATE_LOCK"
+
+# A shared slot this far ahead is left over from a clock jump, not a queue
+_STALE_SLOT_SECONDS = 300.0
+
+
+class MonotonicSchedule:
+    """Request slots on this process's monotonic clock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_slot = self._next_slot = 0.0
+
+    def book(self, interval):
+        """Book the next free slot and the one after it *interval* later.
+
+        :param interval: Seconds until the following slot.
+        :type interval: float
+        :returns: Seconds until the booked slot starts (``0`` if now).
+        :rtype: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._last_slot, self._next_slot = slot, slot + interval
+        return slot - now
+
+    def retime(self, interval):
+        """Put the next free slot *interval* after the last booked one.
+
+        Only this process books here, so the slot may move either way.
+
+        :type interval: float
+        """
+        with self._lock:
+            self._next_slot = self._last_slot + interval
+
+
+class LockFileSchedule:
+    """Request slots shared by every process that opens the same file.
+
+    The file holds the wall-clock start of the last booked slot and of
+    the next free one. Booking takes an exclusive ``flock`` on it, reads
+    those times, writes back the booked slot and the one after it, and
+    releases the lock, so the processes together keep one request per
+    interval: a token bucket holding a single token, refilled every
+    interval. POSIX only.
+    """
+
+    def __init__(self, path):
+        """Use *path* as the shared lock file, creating it on first use.
+
+        :param path: Lock file path; every process must use the same one.
+        :type path: str
+        :raises NotImplementedError: If ``fcntl`` file locks are missing.
+        """
+        if fcntl is None:
+            raise NotImplementedError("LockFileSchedule needs fcntl.flock")
+        self.path = path
+
+    def _update(self, change):
+        """Apply *change* to the stored slot under the file lock.
+
+        :param change: Callable ``(last_slot, next_slot, now) ->
+            (new_last_slot, new_next_slot, result)``.
+        :returns: *change*'s result.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                slots = [float(v) for v in os.pread(fd, 128, 0).split()]
+            except ValueError:
+                slots = []
+            # Older files hold only the next slot
+            last_slot, next_slot = ([0.0, 0.0] + slots)[-2:]
+            *new_slots, result = change(last_slot, next_slot, time.time())
+            os.ftruncate(fd, 0)
+            os.pwrite(fd, " ".join(map(repr, new_slots)).encode("ascii"), 0)
+        finally:
+            os.close(fd)    # also releases the lock
+        return result
+
+    def book(self, interval):
+        """Book the next free slot across all processes.
+
+        :param interval: Seconds until the following slot.
+        :type interval: float
+        :returns: Seconds until the booked slot starts (``0`` if now).
+        :rtype: float
+        """
+        def _book(_last_slot, next_slot, now):
+            if next_slot - now > _STALE_SLOT_SECONDS:
+                next_slot = now
+            slot = max(now, next_slot)
+            return slot, slot + interval, slot - now
+        return self._update(_book)
+
+    def retime(self, interval):
+        """Push the shared next slot to *interval* after the last booked one.
+
+        The last slot may belong to another process pacing at its own
+        interval, so the next slot only ever moves later: a process that
+        speeds up never pulls it below what the booking process set.
+
+        :type interval: float
+        """
+        self._update(lambda last_slot, next_slot, now: (
+            last_slot, max(next_slot, last_slot + interval), None))
+
+
+def schedule_from_env():
+    """Return the shared schedule named by ``$SCRAPE_RATE_LOCK``, if set.
+
+    :rtype: LockFileSchedule or None
+    """
+    path = os.environ.get(RATE_LOCK_ENV)
+    return LockFileSchedule(path) if path else None
+
+#: Statuses that mean the server is throttling or overloaded.
+BACKOFF_STATUSES = frozenset({429, 503})
+
+
+class RateLimiter:
+    """Thread-safe limiter that hands out evenly spaced request slots.
+
+    Each call to :meth:`acquire` reserves the next free slot from the
+    schedule and sleeps until it arrives, so the wait happens outside any
+    lock and other threads (or processes) can queue up behind it.
+    """
+
+    def __init__(self, interval, schedule=None):
+        """Initialize the limiter.
+
+        :param interval: Minimum number of seconds between request starts.
+        :type interval: float
+        :param schedule: Where slots are booked: a :class:`LockFileSchedule`
+            to share them across processes, or ``None`` for this process
+            only.
+        :type schedule: LockFileSchedule or MonotonicSchedule or None
+        """
+        self.interval = max(0.0, interval)
+        self.schedule = schedule or MonotonicSchedule()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Reserve the next free request slot without sleeping.
+
+        :returns: Seconds until the reserved slot starts (``0`` if now).
+        :rtype: float
+        """
+        return self.schedule.book(self.interval)
+
+    def acquire(self, at_least=0.0):
+        """Block until the caller may start its next request.
+
+        :param at_least: Minimum wait in seconds, e.g. a retry backoff.
+        :type at_least: float
+        :returns: The number of seconds the caller waited.
+        :rtype: float
+        """
+        wait = max(self.reserve(), at_least)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """Rate limiter whose interval follows the server's responses (AIMD).
+
+    Call :meth:`record` after every request. While responses succeed and
+    latency stays near the best smoothed latency seen so far, the request
+    rate grows additively by :attr:`increase` requests per second. A
+    ``429``/``503``, a timeout or connection failure (``status=None``),
+    or latency above :attr:`latency_factor` times that baseline
+    multiplies the interval by :attr:`backoff` — at most once per
+    interval, so a burst of in-flight failures counts as one signal. The
+    interval always stays between *min_interval* and *max_interval*.
+    """
+
+    #: Requests per second added after each healthy response.
+    increase = 0.1
+    #: Factor the interval is multiplied by on back-off.
+    backoff = 2.0
+    #: Smallest interval a back-off moves to, in seconds.
+    backoff_floor = 0.25
+    #: Latency above this multiple of the baseline counts as congestion.
+    latency_factor = 2.0
+    #: Weight of the newest sample in the smoothed latency.
+    smoothing = 0.3
+    #: Most recent decisions kept in :attr:`decisions`.
+    history = 1000
+
+    def __init__(self, interval, min_interval=0.0, max_interval=60.0,
+                 schedule=None):
+        """Initialize the limiter.
+
+        :param interval: Starting number of seconds between request starts.
+        :type interval: float
+        :param min_interval: Fastest allowed pacing, e.g. the robots.txt
+            ``Crawl-delay``.
+        :type min_interval: float
+        :param max_interval: Slowest pacing a back-off may reach.
+        :type max_interval: float
+        :param schedule: Where slots are booked, as for :class:`RateLimiter`.
+        """
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        super().__init__(min(self.max_interval,
+                             max(self.min_interval, interval)), schedule)
+        self.decisions = deque(maxlen=self.history)
+        self._latency = None        # (smoothed, best smoothed) seconds
+        self._last_backoff = None   # monotonic time of the last back-off
+        # Per-action counts and the interval range over every decision,
+        # including those dropped from the history
+        self._totals = {"increase": 0, "backoff": 0, "hold": 0,
+                        "min_interval": self.interval,
+                        "max_interval": self.interval}
+
+    def _latency_rising(self, latency):
+        """Fold *latency* into the smoothed latency; report congestion."""
+        if self._latency is None:
+            smoothed = baseline = latency
+        else:
+            smoothed, baseline = self._latency
+            smoothed += self.smoothing * (latency - smoothed)
+            baseline = min(baseline, smoothed)
+        self._latency = (smoothed, baseline)
+        return smoothed > self.latency_factor * max(baseline, 1e-3)
+
+    def _set_interval(self, interval):
+        """Change the interval and retime the pending slot along with it.
+
+        The next slot was booked with the old interval; retiming keeps it
+        one new interval after the last request's start (only later, on a
+        shared schedule).
+        """
+        self.schedule.retime(interval)
+        self.interval = interval
+
+    def _decide(self, status, latency, now):
+        """Return the action for a response and apply it to the interval."""
+        if status is None or status in BACKOFF_STATUSES:
+            congested = True
+        else:
+            congested = self._latency_rising(latency)
+        if congested:
+            if (self._last_backoff is not None
+                    and now - self._last_backoff < self.interval):
+                return "hold"
+            self._set_interval(min(self.max_interval,
+                                   max(self.interval * self.backoff,
+                                       self.backoff_floor, self.min_interval)))
+            self._last_backoff = now
+            return "backoff"
+        if status >= 400 or self.interval <= self.min_interval:
+            return "hold"
+        self._set_interval(max(self.min_interval,
+                               1.0 / (1.0 / self.interval + self.increase)))
+        return "increase"
+
+    def record(self, status, latency):
+        """Adjust the pacing after a request completes.
+
+        :param status: HTTP status code, or ``None`` for a timeout or
+            connection failure.
+        :type status: int or None
+        :param latency: Seconds from request start to response.
+        :type latency: float
+        :returns: The decision taken, also appended to :attr:`decisions`,
+            which keeps the last :attr:`history` of them.
+        :rtype: PacingDecision
+        """
+        with self._lock:
+            now = time.monotonic()
+            action = self._decide(status, latency, now)
+            decision = PacingDecision(status, latency, action, self.interval,
+                                      now)
+            self.decisions.append(decision)
+            totals = self._totals
+            totals[action] += 1
+            totals["min_interval"] = min(totals["min_interval"], self.interval)
+            totals["max_interval"] = max(totals["max_interval"], self.interval)
+        logger.info("Pacing: status %s in %.3fs -> %s, interval %.3fs",
+                    status, latency, action, decision.interval)
+        return decision
+
+    def observe(self, fetch):
+        """Wrap *fetch* so every response's status and latency are recorded.
+
+        :param fetch: Callable taking a URL and returning the page body;
+            it raises :class:`urllib.error.HTTPError` for error statuses.
+        :returns: A callable with the same signature as *fetch*.
+        """
+        def _fetch(url):
+            start = time.monotonic()
+            try:
+                body = fetch(url)
+            except HTTPError as e:
+                self.record(e.code, time.monotonic() - start)
+                raise
+            except (OSError, http.client.HTTPException):
+                # Timeouts, connection failures and broken responses: the
+                # server is struggling
+                self.record(None, time.monotonic() - start)
+                raise
+            self.record(200, time.monotonic() - start)
+            return body
+        return _fetch
+
+    def stats(self):
+        """Summarize the pacing decisions made so far.
+
+        :returns: Request and per-action counts plus the current,
+            smallest and largest interval in seconds.
+        :rtype: dict
+        """
+        with self._lock:
+            totals = dict(self._totals, interval=self.interval)
+        requests = sum(totals[a] for a in ("increase", "backoff", "hold"))
+        return {"requests": requests, **totals}
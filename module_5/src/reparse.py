@@ -0,0 +1,220 @@
+"""
+Re-parse archived survey pages without refetching them.
+
+Reads every page kept by ``scrape.py --archive_dir`` (see
+:mod:`page_archive`), runs the current ``parse_survey`` over it, and
+writes the rows as NDJSON or upserts them into the ``applicants`` table.
+Use it to apply a parser fix to historical data::
+
+    python3 src/reparse.py --archive_dir .page_archive -o reparsed.ndjson
+    python3 src/reparse.py --archive_dir .page_archive --db --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import psycopg
+
+import survey_parser
+from applicant_rows import SCRAPED_PARAM_KEYS, build_scraped_params, build_upsert_query
+from cleanup_data import fix_gre_aw, fix_uc_universities
+from crawl_args import add_output_arguments, resolve_output
+from crawl_output import write_ndjson
+from page_archive import PageArchive, read_entry
+from query_data import connect_db
+from scrape import parse_survey
+from survey_rows import finalize_comments
+
+logger = logging.getLogger(__name__)
+
+# Archived pages handed to a parse worker at a time
+_CHUNK_SIZE = 8
+
+
+def page_number(url):
+    """Return the ``?page=N`` number of a survey URL, 1 when there is none.
+
+    :rtype: int
+    """
+    match = re.search(r"\?page=(\d+)", url)
+    return int(match.group(1)) if match else 1
+
+
+def _reparse_entry(directory, entry, parser):
+    """Read and parse one archived page into finalized applicant dicts.
+
+    Module-level so it can run in a parse worker process.
+
+    :rtype: list[dict]
+    """
+    results = parse_survey(read_entry(directory, entry), parser)
+    finalize_comments(results)
+    return results
+
+
+def iter_reparsed(archive, parser=survey_parser.DEFAULT_BACKEND, workers=0):
+    """Parse every archived record and yield its rows, newest record first.
+
+    A page archived by several crawls is parsed once per record, so rows
+    that later moved past the pages a crawl fetched are not lost. GradCafe
+    lists newest entries first, so those records repeat rows; only the
+    copy from the newest record is kept, since an entry's status can
+    change between crawls.
+
+    :param archive: The page archive.
+    :type archive: page_archive.PageArchive
+    :param parser: Parser backend, one of :data:`survey_parser.BACKENDS`.
+    :type parser: str
+    :param workers: Number of parse processes; ``0`` parses in this
+        process. Workers read their pages from the archive themselves.
+    :type workers: int
+    :returns: Generator of ``(page_num, rows)``, one per record.
+    :rtype: collections.abc.Iterator[tuple[int, list[dict]]]
+    """
+    entries = archive.records()[::-1]
+    count = len(entries)
+    directories = [archive.directory] * count
+    parsers = [parser] * count
+    seen = set()
+
+    def _dedupe(pages):
+        for entry, rows in zip(entries, pages):
+            fresh = []
+            for row in rows:
+                url = row.get("url")
+                if url and url in seen:
+                    continue
+                seen.add(url)
+                fresh.append(row)
+            yield page_number(entry.url), fresh
+
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from _dedupe(pool.map(_reparse_entry, directories, entries,
+                                        parsers, chunksize=_CHUNK_SIZE))
+    else:
+        yield from _dedupe(map(_reparse_entry, directories, entries, parsers))
+
+
+def upsert_pages(conn, pages):
+    """Upsert each page's rows into ``applicants`` by ``url``.
+
+    Rows without a result URL are skipped: nothing identifies them.
+
+    :param conn: An open database connection; the caller commits.
+    :type conn: psycopg.Connection
+    :param pages: Iterable of ``(page_num, rows)``.
+    :returns: The number of rows written.
+    :rtype: int
+    """
+    query = build_upsert_query(param_keys=SCRAPED_PARAM_KEYS)
+    cur = conn.cursor()
+    count = 0
+    for _, rows in pages:
+        params = [build_scraped_params(row, name_fallback=True)
+                  for row in rows if row.get("url")]
+        if params:
+            cur.executemany(query, params)
+            count += len(params)
+    return count
+
+
+def _build_arg_parser():
+    """Build the command-line parser for :func:`main`.
+
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Re-parse archived survey pages without refetching them."
+    )
+    parser.add_argument(
+        "--archive_dir", "-a",
+        type=str,
+        required=True,
+        help="archive written by scrape.py --archive_dir"
+    )
+    add_output_arguments(parser)
+    parser.add_argument(
+        "--db",
+        action="store_true",
+        help=("upsert the rows into the applicants table instead of writing "
+              "NDJSON, then run the data cleanup (default: False)")
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=0,
+        help=("number of processes parsing archived pages; 0 parses in the "
+              "main process (default: 0)")
+    )
+    parser.add_argument(
+        "--parser",
+        choices=survey_parser.BACKENDS,
+        default=survey_parser.DEFAULT_BACKEND,
+        help=f"HTML parser backend (default: {survey_parser.DEFAULT_BACKEND})"
+    )
+    return parser
+
+
+def _reparse_to_db(pages):
+    """Upsert *pages* in one transaction and run the data cleanup.
+
+    :returns: The number of rows written, or ``0`` on a database error.
+    :rtype: int
+    """
+    conn = connect_db()
+    if conn is None:
+        return 0
+    try:
+        count = upsert_pages(conn, pages)
+        fix_gre_aw(conn)
+        fix_uc_universities(conn)
+    except psycopg.Error as e:
+        logger.error("Database error during upsert: %s", e)
+        conn.rollback()
+        conn.close()
+        return 0
+    conn.commit()
+    conn.close()
+    return count
+
+
+def main(argv=None):
+    """Re-parse an archive to NDJSON or into the database.
+
+    :param argv: Command-line arguments; ``None`` reads ``sys.argv``.
+    :type argv: list[str] or None
+    :returns: The number of rows written.
+    :rtype: int
+    """
+    args = _build_arg_parser().parse_args(argv)
+    if not os.path.isdir(args.archive_dir):
+        logger.error("No archive at %s", args.archive_dir)
+        return 0
+    try:
+        output_path = resolve_output(args)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 0
+    archive = PageArchive(args.archive_dir)
+    logger.info("Re-parsing %d archived pages", len(archive.records()))
+    pages = iter_reparsed(archive, args.parser, max(0, args.workers))
+
+    if args.db:
+        count = _reparse_to_db(pages)
+    elif output_path:
+        with open(output_path, "wb") as out:
+            count = write_ndjson(pages, out, args.compress)
+    else:
+        count = write_ndjson(pages, sys.stdout.buffer)
+    logger.info("Total rows: %d", count)
+    return count
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
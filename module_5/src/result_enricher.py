@@ -0,0 +1,423 @@
+"""
+Detail-page enrichment for rows of the ``applicants`` table.
+
+Each survey row links to a ``/result/<id>`` page that lists the entry as
+``<dt>``/``<dd>`` pairs, including scores and the applicant's origin that
+the survey table often leaves out. :func:`parse_result_page` reads those
+pairs into ``applicants`` columns, and :func:`enrich_batches` fetches
+batches of result URLs on a thread pool whose requests all take slots
+from one shared :class:`rate_limiter.RateLimiter`, then writes each batch
+back with a single ``executemany`` UPDATE that only fills columns that
+are still empty. The next batch is already downloading while the current
+one is written.
+
+Run standalone to enrich rows that are missing fields::
+
+    python3 src/result_enricher.py --limit 5000 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import http.client
+import logging
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+import psycopg
+from psycopg import sql
+
+from applicant_rows import ENRICHED_COLUMN, build_score_params, clean_text
+from crawl_args import add_request_arguments, resolve_rate_lock
+from fetch_retry import CrawlReport, RetryPolicy
+from http_session import HttpSession
+from query_data import MAX_QUERY_LIMIT, connect_db
+from rate_limiter import LockFileSchedule, RateLimiter
+from scrape import check_robots, fetch_page
+from survey_rows import normalize_degree
+
+logger = logging.getLogger(__name__)
+
+RESULT_BASE_URL = "https://www.thegradcafe.com/result/"
+
+#: Default number of result pages fetched concurrently.
+DEFAULT_WORKERS = 4
+
+#: Default number of result URLs fetched and stored per UPDATE.
+DEFAULT_BATCH_SIZE = 100
+
+#: Result-page labels (lower case, without the colon) and the scraped-row
+#: keys their values are stored under.
+DETAIL_LABELS = {
+    "degree type": "Degree",
+    "degree's country of origin": "US/International",
+    "undergrad gpa": "GPA",
+    "gre general": "GRE",
+    "gre verbal": "GRE V",
+    "analytical writing": "GRE AW",
+    "notes": "comments",
+}
+
+#: ``applicants`` columns filled from a result page.
+NUMERIC_COLUMNS = ("gpa", "gre", "gre_v", "gre_aw")
+TEXT_COLUMNS = ("degree", "us_or_international", "comments")
+
+#: What one batch of :func:`enrich_batches` did: URLs requested, pages
+#: fetched and parsed, and rows the UPDATE touched.
+EnrichedBatch = namedtuple("EnrichedBatch", ["checked", "fetched", "updated"])
+
+
+class _DetailListParser(HTMLParser):
+    """Collect the text of every ``<dt>`` and the ``<dd>`` that follows it."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pairs = []
+        self._label = None
+        self._open = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("dt", "dd"):
+            self._open = tag
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag != self._open:
+            return
+        text = " ".join("".join(self._text).split())
+        if tag == "dt":
+            self._label = text.rstrip(":").strip().lower()
+        elif self._label is not None:
+            self.pairs.append((self._label, text))
+            self._label = None
+        self._open = None
+
+    def handle_data(self, data):
+        if self._open is not None:
+            self._text.append(data)
+
+
+def parse_result_page(html):
+    """Parse a ``/result/`` page into ``applicants`` column values.
+
+    :param html: The raw HTML content of a result page.
+    :type html: str
+    :returns: A value for every column in :data:`NUMERIC_COLUMNS` (a
+        float, or ``None`` when the page leaves it blank or shows ``0``)
+        and :data:`TEXT_COLUMNS` (``""`` when absent).
+    :rtype: dict
+    """
+    parser = _DetailListParser()
+    parser.feed(html)
+    parser.close()
+    row = {DETAIL_LABELS[label]: value for label, value in parser.pairs
+           if label in DETAIL_LABELS}
+
+    params = build_score_params(row)
+    for column in NUMERIC_COLUMNS:
+        # A score left blank on the submission form is shown as 0
+        if params[column] is not None and params[column] <= 0:
+            params[column] = None
+    params["degree"] = normalize_degree(params["degree"])
+    params["us_or_international"] = clean_text(row.get("US/International"))
+    params["comments"] = clean_text(row.get("comments"))
+    return params
+
+
+def build_update_query():
+    """Build the UPDATE that fills a row's empty columns by ``url``.
+
+    Columns that already hold a value are left unchanged, so enriching a
+    row twice, or a row the survey table filled in, is harmless. The
+    ``enriched_at`` column is always set, so a page that filled nothing
+    is not fetched again by :func:`iter_incomplete`.
+
+    :returns: A composed SQL query for ``cursor.executemany`` with one
+        placeholder per column and ``url``.
+    :rtype: psycopg.sql.Composed
+    """
+    assignments = [
+        sql.SQL("{col} = COALESCE({col}, {val})").format(
+            col=sql.Identifier(c), val=sql.Placeholder(c))
+        for c in NUMERIC_COLUMNS
+    ] + [
+        sql.SQL("{col} = COALESCE(NULLIF({col}, ''), {val})").format(
+            col=sql.Identifier(c), val=sql.Placeholder(c))
+        for c in TEXT_COLUMNS
+    ] + [
+        sql.SQL("{} = now()").format(sql.Identifier(ENRICHED_COLUMN)),
+    ]
+    return sql.SQL("UPDATE {} SET {} WHERE {} = {}").format(
+        sql.Identifier("applicants"),
+        sql.SQL(", ").join(assignments),
+        sql.Identifier("url"),
+        sql.Placeholder("url"),
+    )
+
+
+def _missing_fields():
+    """Return the SQL condition true for rows with an empty detail column.
+
+    ``comments`` is left out: most entries never have one.
+    """
+    checks = [sql.SQL("{} IS NULL").format(sql.Identifier(c))
+              for c in NUMERIC_COLUMNS]
+    checks += [sql.SQL("COALESCE({}, '') = ''").format(sql.Identifier(c))
+               for c in TEXT_COLUMNS if c != "comments"]
+    return sql.SQL(" OR ").join(checks)
+
+
+def iter_incomplete(conn, batch_size=DEFAULT_BATCH_SIZE, from_id=0,
+                    limit=None):
+    """Yield batches of result URLs for rows missing a detail field.
+
+    Rows whose page was already fetched (``enriched_at`` is set) are
+    skipped, even if the page left some fields empty. Rows are walked in
+    ``p_id`` order with keyset pagination, so each batch is one indexed
+    query however far the walk has got.
+
+    :param conn: An open database connection.
+    :type conn: psycopg.Connection
+    :param batch_size: URLs per batch, at most
+        :data:`query_data.MAX_QUERY_LIMIT`.
+    :type batch_size: int
+    :param from_id: Only rows with a larger ``p_id`` are returned, e.g.
+        the last ``p_id`` logged by an earlier run.
+    :type from_id: int
+    :param limit: Maximum number of URLs in total, or ``None``.
+    :type limit: int or None
+    :rtype: collections.abc.Iterator[list[str]]
+    """
+    query = sql.SQL(
+        "SELECT {p_id}, {url} FROM {table} "
+        "WHERE {p_id} > %s AND {url} LIKE %s AND {enriched} IS NULL "
+        "AND ({missing}) "
+        "ORDER BY {p_id} LIMIT %s"
+    ).format(
+        p_id=sql.Identifier("p_id"),
+        url=sql.Identifier("url"),
+        table=sql.Identifier("applicants"),
+        enriched=sql.Identifier(ENRICHED_COLUMN),
+        missing=_missing_fields(),
+    )
+    batch_size = max(1, min(batch_size, MAX_QUERY_LIMIT))
+    cur = conn.cursor()
+    last_id = from_id
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        cur.execute(query, (last_id, "%/result/%", size))
+        rows = cur.fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+        logger.info("Enriching %d rows up to p_id %d", len(rows), last_id)
+        yield [url for _, url in rows]
+
+
+def allowed_urls(urls, robots, report=None):
+    """Drop the URLs that robots.txt disallows.
+
+    :param urls: Result URLs.
+    :type urls: list[str]
+    :param robots: A ``RobotsChecker``, or ``None`` to skip the check.
+    :param report: Optional :class:`fetch_retry.CrawlReport` that records
+        the skipped URLs.
+    :type report: fetch_retry.CrawlReport or None
+    :rtype: list[str]
+    """
+    if robots is None:
+        return list(urls)
+    allowed = []
+    for url in urls:
+        if robots.can_fetch(url):
+            allowed.append(url)
+        elif report is not None:
+            report.record_skip(url, "robots.txt")
+    return allowed
+
+
+def _store(cur, submitted):
+    """Wait for one batch of fetches, parse them and UPDATE their rows.
+
+    :param submitted: ``(url, future)`` pairs of the batch.
+    :rtype: EnrichedBatch
+    """
+    params = []
+    for url, future in submitted:
+        try:
+            html = future.result()
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            logger.error("Error fetching %s: %s", url, e)
+            continue
+        params.append({"url": url, **parse_result_page(html)})
+    if not params:
+        return EnrichedBatch(len(submitted), 0, 0)
+    cur.executemany(build_update_query(), params)
+    return EnrichedBatch(len(submitted), len(params), max(0, cur.rowcount))
+
+
+def enrich_batches(cur, batches, fetch, limiter, workers=DEFAULT_WORKERS):
+    """Fetch, parse and store result pages one batch at a time.
+
+    Every request first takes a slot from *limiter*, so *workers* only
+    hides network latency and never exceeds the crawl delay. The next
+    batch is submitted before the current one is written, so the pool
+    keeps fetching during the UPDATE. Pages that cannot be fetched are
+    logged and left out; their rows stay as they were.
+
+    :param cur: Cursor the UPDATEs run on. Nothing is committed, so the
+        caller decides whether each batch or the whole run is one
+        transaction.
+    :type cur: psycopg.cursor.Cursor
+    :param batches: Iterable of lists of result URLs.
+    :param fetch: Callable taking a URL and returning its HTML, e.g. a
+        :meth:`fetch_retry.RetryPolicy.wrap` of ``scrape.fetch_page``.
+    :param limiter: Rate limiter shared by all fetcher threads.
+    :type limiter: rate_limiter.RateLimiter
+    :param workers: Maximum number of requests in flight.
+    :type workers: int
+    :returns: Generator yielding an :class:`EnrichedBatch` after each
+        batch's UPDATE.
+    :rtype: collections.abc.Iterator[EnrichedBatch]
+    """
+    def _fetch_one(url):
+        limiter.acquire()
+        return fetch(url)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        try:
+            pending = None
+            for urls in batches:
+                submitted = [(url, pool.submit(_fetch_one, url))
+                             for url in urls]
+                if pending is not None:
+                    yield _store(cur, pending)
+                pending = submitted
+            if pending is not None:
+                yield _store(cur, pending)
+        finally:
+            # A consumer that stops early must not wait for queued pages
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_arg_parser():
+    """Build the command-line parser for :func:`main`.
+
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Fill missing applicant fields from GradCafe result pages."
+    )
+    parser.add_argument(
+        "--limit", "-l",
+        type=int,
+        default=1000,
+        help="maximum number of rows to enrich, 0 for all (default: 1000)"
+    )
+    parser.add_argument(
+        "--batch_size", "-b",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=("result pages fetched and stored per UPDATE "
+              f"(default: {DEFAULT_BATCH_SIZE})")
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=("number of result pages fetched concurrently "
+              f"(default: {DEFAULT_WORKERS})")
+    )
+    parser.add_argument(
+        "--delay", "-d",
+        type=float,
+        default=0.5,
+        help="delay between request starts in seconds (default: 0.5)"
+    )
+    parser.add_argument(
+        "--from_id",
+        type=int,
+        default=0,
+        help="only enrich rows with a larger p_id (default: 0)"
+    )
+    add_request_arguments(parser)
+    return parser
+
+
+def _check_robots(args, session):
+    """Return ``(robots, delay)``, or ``None`` when result pages are disallowed.
+
+    The delay is ``--delay``, or the robots.txt ``Crawl-delay`` when that
+    is longer.
+    """
+    if args.ignore_robots:
+        return None, args.delay
+    check = check_robots(RESULT_BASE_URL, args.user_agent, args.delay,
+                         session)
+    if check is None:
+        return None
+    robots, delay = check
+    return robots, max(args.delay, delay)
+
+
+def main(argv=None):
+    """Enrich rows with missing fields from their result pages.
+
+    Each batch is committed once stored, so an interrupted run keeps its
+    progress; ``--from_id`` with the last logged ``p_id`` continues it.
+
+    :param argv: Command-line arguments; ``None`` uses the defaults.
+    :type argv: list[str] or None
+    :returns: The number of rows updated.
+    :rtype: int
+    """
+    args = _build_arg_parser().parse_args([] if argv is None else argv)
+    try:
+        rate_lock = resolve_rate_lock(args)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 0
+    conn = connect_db()
+    if conn is None:
+        return 0
+
+    report = CrawlReport()
+    updated = 0
+    with HttpSession(args.user_agent,
+                     timeout=(args.connect_timeout, args.timeout)) as session:
+        check = _check_robots(args, session)
+        if check is None:
+            conn.close()
+            return 0
+        robots, delay = check
+        limiter = RateLimiter(
+            delay, LockFileSchedule(rate_lock) if rate_lock else None)
+        fetch = RetryPolicy(attempts=1 + max(0, args.retries)).wrap(
+            functools.partial(fetch_page, user_agent=args.user_agent,
+                              session=session),
+            report, limiter.acquire)
+        batches = (allowed_urls(urls, robots, report) for urls in
+                   iter_incomplete(conn, args.batch_size, args.from_id,
+                                   args.limit if args.limit > 0 else None))
+        try:
+            for batch in enrich_batches(conn.cursor(), batches, fetch,
+                                        limiter, args.workers):
+                conn.commit()
+                updated += batch.updated
+        except psycopg.Error as e:
+            logger.error("Database error during enrichment: %s", e)
+            conn.rollback()
+    conn.close()
+    logger.info("Updated %d rows", updated)
+    logger.info("Crawl report: %s", report.as_dict())
+    return updated
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
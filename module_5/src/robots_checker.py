@@ -2,12 +2,26 @@
 Robots.txt compliance checker for web scraping.
 
 Fetches and parses a site's robots.txt to determine whether a given
-URL may be crawled and what crawl delay to respect.
+URL may be crawled and what crawl delay to respect. :class:`RobotsCache`
+keeps each host's robots.txt in memory and optionally on disk, so
+repeated crawls and the Flask pull path share one parsed policy instead
+of downloading it again.
 """
 
+import hashlib
+import json
 import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
 from urllib import robotparser
-from urllib.parse import urlparse
+from urllib.error import HTTPError
+from urllib.parse import quote, unquote, urlparse, urlunparse
+from urllib.request import Request, urlopen
 
 logger = logging.getLogger(__name__)
 
@@ -15,48 +29,138 @@ logger = logging.getLogger(__name__)
 DEFAULT_USER_AGENT = "DawnaGradCafeScraper/1.0"
 BASE_URL = "https://www.thegradcafe.com/"
 
+#: Longest a robots.txt is reused, in seconds (RFC 9309 caps it at 24h).
+DEFAULT_ROBOTS_TTL = 24 * 60 * 60
+
+#: Seconds a robots.txt download without a session may block on the
+#: socket; matches the read timeout of ``http_session.DEFAULT_TIMEOUT``.
+DEFAULT_ROBOTS_TIMEOUT = 30.0
+
+#: A robots.txt download: HTTP status, body text and expiry (epoch secs).
+CachedRobots = namedtuple("CachedRobots", ["status", "body", "expires"])
+
+
+def robots_url_for(url):
+    """Return the robots.txt URL of the host serving *url*.
+
+    :param url: Any URL on the site.
+    :type url: str
+    :rtype: str
+    """
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+
 class RobotsChecker:
     """Check robots.txt permissions for a given site and user agent.
 
     Parses the robots.txt file at the target site and provides methods
-    to check crawl permissions and retrieve crawl delay directives.
+    to check crawl permissions and retrieve crawl delay directives. When
+    robots.txt cannot be read (network error, 5xx) nothing may be
+    fetched, and :attr:`fetch_error` says why, so callers can tell that
+    apart from a policy that disallows the URL.
     """
 
-    def __init__(self, url, user_agent=DEFAULT_USER_AGENT):
+    def __init__(self, url, user_agent=DEFAULT_USER_AGENT, session=None,
+                 response=None):
         """Initialize the RobotsChecker by fetching and parsing robots.txt.
 
         :param url: The base URL of the site to check.
         :type url: str
         :param user_agent: The User-Agent string to check permissions for.
         :type user_agent: str
+        :param session: Optional ``scrape.HttpSession`` used to download
+            robots.txt over the crawl's keep-alive connection.
+        :type session: scrape.HttpSession or None
+        :param response: An already downloaded robots.txt (e.g. from a
+            :class:`RobotsCache`); nothing is fetched when it is given.
+        :type response: CachedRobots or None
         """
         self.base_url = url
         self.user_agent = user_agent
         self.parser = robotparser.RobotFileParser()
         self.crawl_delay = None
+        #: Why robots.txt could not be read, or ``None`` if it was.
+        self.fetch_error = None
+        self._decisions = {}
+        self._prefix_len = 0
 
         # Build robots.txt URL
-        parsed = urlparse(url)
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        robots_url = robots_url_for(url)
 
         try:
             self.parser.set_url(robots_url)
-            self.parser.read()
+            if response is not None:
+                self._apply(response.status, response.body)
+            elif session is None:
+                self.parser.read()
+            else:
+                self._read_with_session(session, robots_url)
 
             # check for crawl delay directive
             self.crawl_delay = self.parser.crawl_delay(user_agent)
         except (OSError, UnicodeDecodeError) as e:
             logger.warning("Could not fetch robots.txt: %s", e)
+            self.fetch_error = str(e)
+        self._prefix_len = self._longest_rule()
+
+    def _read_with_session(self, session, robots_url):
+        """Fetch robots.txt through *session* and feed it to the parser."""
+        response = session.get(robots_url, {"User-Agent": self.user_agent})
+        self._apply(response.status, response.body.decode("utf-8"))
+
+    def _apply(self, status, body):
+        """Load a robots.txt response into the parser.
+
+        Mirrors ``RobotFileParser.read``: 401/403 disallow everything,
+        other 4xx statuses allow everything, and 5xx leaves the parser
+        unread so that nothing may be fetched.
+        """
+        if status in (401, 403):
+            self.parser.disallow_all = True
+        elif 400 <= status < 500:
+            self.parser.allow_all = True
+        elif status < 400:
+            self.parser.parse(body.splitlines())
+        else:
+            self.fetch_error = f"robots.txt returned HTTP {status}"
+
+    def _longest_rule(self):
+        """Return the length of the longest rule path in robots.txt."""
+        entries = list(self.parser.entries)
+        if self.parser.default_entry is not None:
+            entries.append(self.parser.default_entry)
+        return max((len(rule.path) for entry in entries
+                    for rule in entry.rulelines), default=0)
+
+    def _decision_key(self, url):
+        """Return the part of *url* that robots.txt rules can see.
+
+        Rules match by path prefix, so two URLs that agree on their first
+        :attr:`_prefix_len` characters (normalized like
+        ``RobotFileParser.can_fetch``) always get the same answer.
+        """
+        parsed = urlparse(unquote(url))
+        path = quote(urlunparse(("", "", parsed.path, parsed.params,
+                                 parsed.query, parsed.fragment))) or "/"
+        return path[:self._prefix_len]
 
     def can_fetch(self, url):
         """Check if the given URL can be crawled according to robots.txt.
 
+        Decisions are memoized per rule-length path prefix, so a crawl
+        evaluates the rule set once for all of its survey pages.
+
         :param url: The URL to check.
         :type url: str
         :returns: ``True`` if crawling is allowed, ``False`` otherwise.
         :rtype: bool
         """
-        return self.parser.can_fetch(self.user_agent, url)
+        key = self._decision_key(url)
+        decision = self._decisions.get(key)
+        if decision is None:
+            decision = self.parser.can_fetch(self.user_agent, url)
+            self._decisions[key] = decision
+        return decision
 
     def get_crawl_delay(self, default=0.5):
         """Get the crawl delay from robots.txt, or use a default.
@@ -67,3 +171,156 @@ class RobotsChecker:
         :rtype: float
         """
         return self.crawl_delay if self.crawl_delay is not None else default
+
+
+class RobotsCache:
+    """Per-host robots.txt cache shared by crawls and the Flask app.
+
+    Downloads are kept in memory and, with a *directory*, as one JSON file
+    per host so later runs skip the request. An entry lives for *ttl*
+    seconds, or less when the response's ``Cache-Control: max-age`` or
+    ``Expires`` says so; ``no-store``/``no-cache`` responses and server
+    errors are not reused. Parsed :class:`RobotsChecker` objects are
+    shared per host and user agent, along with their memoized decisions.
+    """
+
+    def __init__(self, directory=None, ttl=DEFAULT_ROBOTS_TTL,
+                 timeout=DEFAULT_ROBOTS_TIMEOUT):
+        """Create an empty cache.
+
+        :param directory: Directory for the on-disk copies, created on
+            first write, or ``None`` to cache in memory only.
+        :type directory: str or None
+        :param ttl: Longest an entry is reused, in seconds.
+        :type ttl: float
+        :param timeout: Socket timeout in seconds for downloads made
+            without a session; a session applies its own timeout.
+        :type timeout: float
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.timeout = timeout
+        self._entries = {}      # robots URL -> CachedRobots
+        self._checkers = {}     # (robots URL, user agent) -> (entry, checker)
+        self._lock = threading.Lock()
+
+    def _path(self, robots_url):
+        """Return the on-disk file for *robots_url*."""
+        digest = hashlib.sha256(robots_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def _lifetime(self, headers):
+        """Return how long a response may be reused, in seconds."""
+        cache_control = (headers.get("Cache-Control") or "").lower()
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            return min(self.ttl, int(match.group(1)))
+        if headers.get("Expires"):
+            try:
+                expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return 0    # an invalid Expires means already expired
+            return max(0, min(self.ttl, expires - time.time()))
+        return self.ttl
+
+    def _load(self, robots_url):
+        """Return a fresh entry from memory or disk, or ``None``."""
+        entry = self._entries.get(robots_url)
+        if entry is None and self.directory:
+            try:
+                with open(self._path(robots_url), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                entry = CachedRobots(data["status"], data["body"],
+                                     data["expires"])
+            except (OSError, ValueError, KeyError):
+                return None
+        if entry is None or entry.expires <= time.time():
+            return None
+        self._entries[robots_url] = entry
+        return entry
+
+    def _store(self, robots_url, entry):
+        """Keep *entry* in memory and, with a directory, on disk."""
+        self._entries[robots_url] = entry
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"url": robots_url, **entry._asdict()}, f)
+        os.replace(tmp_path, self._path(robots_url))
+
+    def _download(self, robots_url, user_agent, session):
+        """Fetch robots.txt and cache it when the response allows.
+
+        :rtype: CachedRobots
+        :raises OSError: If robots.txt could not be fetched.
+        :raises UnicodeDecodeError: If it is not UTF-8.
+        """
+        headers = {"User-Agent": user_agent}
+        if session is not None:
+            response = session.get(robots_url, headers)
+            status, body = response.status, response.body
+            response_headers = response.headers
+        else:
+            try:
+                with urlopen(Request(robots_url, headers=headers),
+                             timeout=self.timeout) as page:
+                    status, body = page.status, page.read()
+                    response_headers = page.headers
+            except HTTPError as e:
+                status, body, response_headers = e.code, b"", e.headers
+        text = body.decode("utf-8")
+
+        lifetime = self._lifetime(response_headers or {})
+        entry = CachedRobots(status, text, time.time() + lifetime)
+        if status < 500 and lifetime > 0:
+            self._store(robots_url, entry)
+        return entry
+
+    def invalidate(self, url):
+        """Forget the cached robots.txt of *url*'s host, on disk as well.
+
+        :param url: Any URL on the site.
+        :type url: str
+        """
+        robots_url = robots_url_for(url)
+        with self._lock:
+            self._entries.pop(robots_url, None)
+            if self.directory:
+                try:
+                    os.remove(self._path(robots_url))
+                except FileNotFoundError:
+                    pass
+
+    def get(self, url, user_agent=DEFAULT_USER_AGENT, session=None):
+        """Return the shared checker for *url*'s host and *user_agent*.
+
+        :param url: Any URL on the site.
+        :type url: str
+        :param user_agent: The User-Agent string to check permissions for.
+        :type user_agent: str
+        :param session: Optional ``HttpSession`` used for a download.
+        :rtype: RobotsChecker
+        """
+        robots_url = robots_url_for(url)
+        with self._lock:
+            entry = self._load(robots_url)
+            if entry is None:
+                try:
+                    entry = self._download(robots_url, user_agent, session)
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning("Could not fetch robots.txt: %s", e)
+                    # Unreachable: an unread parser allows nothing
+                    checker = RobotsChecker(url, user_agent,
+                                            response=CachedRobots(500, "", 0))
+                    checker.fetch_error = str(e)
+                    return checker
+            cached = self._checkers.get((robots_url, user_agent))
+            if cached is not None and cached[0] is entry:
+                return cached[1]
+            checker = RobotsChecker(url, user_agent, response=entry)
+            self._checkers[(robots_url, user_agent)] = (entry, checker)
+            return checker
@@ -1,267 +1,206 @@
 """GradCafe web scraper for applicant survey data."""
+from __future__ import annotations
 
 import argparse
+import collections
+import contextlib
+import functools
+import gzip
+import http.client
+import itertools
 import json
 import logging
-import os
+import multiprocessing
 import re
-import time
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 
+from urllib.error import HTTPError
 from urllib.request import urlopen, Request
 
 from bs4 import BeautifulSoup
 
 import robots_checker
+import survey_parser
+from applicant_record import json_default
+from crawl_args import (
+    add_output_arguments, add_request_arguments, cwd_path, resolve_output,
+    resolve_rate_lock)
+from crawl_output import CHECKPOINT_SUFFIX, CrawlCheckpoint, write_ndjson
+from fetch_retry import CrawlReport, RetryPolicy
+from http_session import DEFAULT_TIMEOUT, HttpSession, split_timeout
+from page_archive import PageArchive
+from page_cache import PageCache
+from rate_limiter import AdaptiveRateLimiter, LockFileSchedule, RateLimiter
+from survey_rows import build_results, finalize_comments
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_page(url, user_agent=robots_checker.DEFAULT_USER_AGENT):
+ParsedPage = namedtuple("ParsedPage", ["rows", "max_page"])
+
+
+def fetch_page(url, user_agent=robots_checker.DEFAULT_USER_AGENT,
+               session=None, timeout=DEFAULT_TIMEOUT):
     """Fetch a web page and return its HTML content.
 
     :param url: The URL to fetch.
     :type url: str
     :param user_agent: The User-Agent header string.
     :type user_agent: str
+    :param session: Optional :class:`HttpSession` whose keep-alive
+        connections are reused; without one each call opens a new
+        connection via ``urlopen``.
+    :type session: HttpSession or None
+    :param timeout: ``(connect, read)`` seconds, or one number for both,
+        for the ``urlopen`` path; a session applies its own timeout.
+        ``urlopen`` has a single socket timeout, so the read timeout is
+        used for connecting too.
+    :type timeout: float or tuple[float, float] or None
     :returns: The decoded HTML content of the page.
     :rtype: str
+    :raises urllib.error.HTTPError: If the server answers with an error
+        status.
     """
+    if session is not None:
+        response = session.get(url, {"User-Agent": user_agent})
+        if response.status >= 400:
+            raise HTTPError(url, response.status, response.reason,
+                            response.headers, None)
+        return response.body.decode("utf-8")
+
     headers = {'User-Agent': user_agent}
     request = Request(url, headers=headers)
-    with urlopen(request) as page:
+    with urlopen(request, timeout=split_timeout(timeout)[1]) as page:
         html = page.read().decode("utf-8")
     return html
 
-def parse_survey(html):
-    """Parse the GradCafe survey page and return a list of applicant data.
+def _make_soup(html, parser):
+    """Build a BeautifulSoup tree with a validated tree-building backend.
 
-    :param html: The raw HTML content of a survey page.
-    :type html: str
-    :returns: A list of dictionaries, each containing one applicant's data.
-    :rtype: list[dict]
+    :raises ValueError: If *parser* is not one of
+        :data:`survey_parser.BACKENDS`.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    results = []
+    if parser not in survey_parser.BACKENDS:
+        raise ValueError(f"Unknown parser backend: {parser!r}")
+    return BeautifulSoup(html, parser)
+
+
+def _parse_document(html, parser):
+    """Parse *html* once into survey rows and page links.
+
+    :returns: ``rows`` — the ``<td>`` cells of each ``<tr>`` in the survey
+        table body (empty if the page has no table or no ``<tbody>``) —
+        and ``links`` — the pagination ``<a>`` elements.
+    :rtype: survey_parser.SurveyDocument
+    """
+    if parser == survey_parser.STREAM_BACKEND:
+        return survey_parser.extract(html)
+
+    soup = _make_soup(html, parser)
+    links = soup.find_all("a", href=re.compile(r"\?page=\d+"))
 
     # Find the main results table
     table = soup.find("table")
     if not table:
-        return results
+        return survey_parser.SurveyDocument([], links)
 
     # Data is stored in tbody
     tbody = table.find("tbody")
     if not tbody:
-        return results
-
-    rows = tbody.find_all("tr")
+        return survey_parser.SurveyDocument([], links)
 
-    current_result = None
-    for row in rows:
-        cells = row.find_all("td")
+    rows = [row.find_all("td") for row in tbody.find_all("tr")]
+    return survey_parser.SurveyDocument(rows, links)
 
-        if len(cells) == 5:
-            # Main data row - save previous result and start new one
-            if current_result:
-                results.append(current_result)
-            current_result = parse_main_row(cells)
-        elif len(cells) == 1 and current_result:
-            # This could be a detail row or a comment row
-            parse_detail_row(cells[0], current_result)
 
-    # Remember the last result
-    if current_result:
-        results.append(current_result)
+def _max_page(links):
+    """Return the highest ``?page=N`` among *links*, or 1 if none.
 
-    return results
-
-
-def parse_main_row(cells):
-    """Parse a main table row and return a dict of applicant data.
-
-    :param cells: The list of ``<td>`` elements from a main data row.
-    :type cells: list[bs4.element.Tag]
-    :returns: A dictionary of parsed applicant fields.
-    :rtype: dict
+    :param links: ``<a>`` elements or attribute dicts.
+    :rtype: int
     """
-    result = {}
-
-    # Cell 0: university name
-    school = cells[0].get_text(strip=True)
-
-    # Cell 1: program and degree (eg, "Physics | PhD")
-    program_cell = cells[1].get_text(separator=" | ", strip=True)
-    program_parts = program_cell.split(" | ")
-    program_name = program_parts[0] if program_parts else ""
-
-    # Combine school and program
-    result["program"] = f"{program_name}, {school}"
-    result["school"] = school
-    result["program_name"] = program_name
-
-    # Extract degree from program cell
-    if len(program_parts) > 1:
-        degree = program_parts[1].strip()
-        if "phd" in degree.lower():
-            result["Degree"] = "PhD"
-        elif ("master" in degree.lower()
-              or degree in ["MS", "MA", "MFA", "MBA", "MEng"]):
-            result["Degree"] = "Masters"
-        else:
-            result["Degree"] = degree
-
-    # Cell 2: date added
-    date_text = cells[2].get_text(strip=True)
-    result["date_added"] = f"Added on {date_text}"
-
-    # Cell 3: decision/status
-    result["status"] = cells[3].get_text(strip=True)
-
-    # Cell 4: links - extract URL
-    link = cells[4].find("a", href=re.compile(r"/result/"))
-    if link:
+    max_page = 1
+    for link in links:
         href = link.get("href", "")
-        if href.startswith("/"):
-            result["url"] = f"https://www.thegradcafe.com{href}"
-        else:
-            result["url"] = href
-
-    # Default GPA/GRE fields
-    result["GPA"] = ""
-    result["GRE V"] = ""
-    result["GRE AW"] = ""
-    result["GRE Q"] = ""
-    result["GRE"] = ""
-
-    # Initialize comments as empty list to collect multiple comment rows
-    result["comments"] = []
-    return result
-
-_NATIONALITY_MAP = {
-    "international": ("US/International", "International"),
-    "american": ("US/International", "American"),
-}
-
-_GRE_PREFIXES = [
-    ("gre v", "GRE V"),
-    ("gre aw", "GRE AW"),
-    ("gre q", "GRE Q"),
-    ("gre", "GRE"),
-]
-
-
-def _classify_part(part):
-    """Classify a single pipe-separated part from a detail row.
-
-    :param part: A trimmed text fragment from the detail row.
-    :type part: str
-    :returns: ``(field_name, value)`` for structured data, or ``None``
-        if the part is unstructured (i.e. a comment fragment).
-    :rtype: tuple[str, str] or None
-    """
-    part_lower = part.lower()
-
-    if re.match(r'^(fall|spring|summer|winter)\s+\d{4}$', part_lower):
-        return ("term", part)
-
-    if part_lower in _NATIONALITY_MAP:
-        return _NATIONALITY_MAP[part_lower]
-
-    if re.match(r'^gpa\s+\d+(\.\d+)?$', part_lower):
-        return ("GPA", part)
-
-    for prefix, field in _GRE_PREFIXES:
-        if part_lower.startswith(prefix):
-            return (field, part)
-
-    if (any(x in part_lower for x in
-            ["accepted", "rejected", "interview", "wait"])
-            and len(part) < 50):
-        return ("_status", part)
-    return None
+        match = re.search(r"\?page=(\d+)", href)
+        if match:
+            page_num = int(match.group(1))
+            max_page = max(max_page, page_num)
 
+    return max_page
 
-def parse_detail_row(cell, result):
-    """Parse a detail or comment row and update the result dict in place.
 
-    Handles two types of rows:
+def parse_page(html, parser=survey_parser.DEFAULT_BACKEND):
+    """Parse a survey page once and return its rows and pagination.
 
-    1. Detail rows containing structured data (GPA, GRE, status, etc.)
-    2. Comment rows containing free-form text.
+    Equivalent to ``ParsedPage(parse_survey(html), get_max_pages(html))``
+    but tokenizes and builds the page only once.
 
-    :param cell: The single ``<td>`` element from the detail row.
-    :type cell: bs4.element.Tag
-    :param result: The applicant data dict to update.
-    :type result: dict
+    :param html: The raw HTML content of a survey page.
+    :type html: str
+    :param parser: Parser backend, as for :func:`parse_survey`.
+    :type parser: str
+    :returns: The applicant dicts and the highest page number found.
+    :rtype: ParsedPage
     """
-    text = cell.get_text(separator=" | ", strip=True)
-
-    # Skip empty cells
-    if not text:
-        return
-
-    parts = [p.strip() for p in text.split(" | ")]
+    document = _parse_document(html, parser)
+    return ParsedPage(build_results(document.rows),
+                      _max_page(document.links))
 
-    found_structured_data = False
-    comment_parts = []
 
-    for part in parts:
-        classified = _classify_part(part)
-        if classified is None:
-            comment_parts.append(part)
-            continue
-
-        field, value = classified
-        if field == "_status":
-            if "status" not in result or not result["status"]:
-                result["status"] = value
-                found_structured_data = True
-        else:
-            result[field] = value
-            found_structured_data = True
+def parse_survey(html, parser=survey_parser.DEFAULT_BACKEND):
+    """Parse the GradCafe survey page and return a list of applicant data.
 
-    # If we have comment parts, add them to the comments list
-    if comment_parts:
-        comment_text = " ".join(comment_parts)
-        result["comments"].append(comment_text)
+    :param html: The raw HTML content of a survey page.
+    :type html: str
+    :param parser: Parser backend, one of :data:`survey_parser.BACKENDS`.
+        ``"html.parser"`` and ``"lxml"`` build a BeautifulSoup tree;
+        ``"stream"`` uses the tree-free :func:`survey_parser.extract`.
+        All backends produce identical dicts.
+    :type parser: str
+    :returns: A list of dictionaries, each containing one applicant's data.
+    :rtype: list[dict]
+    """
+    return build_results(_parse_document(html, parser).rows)
 
-    # If this entire row had no structured data, it's a pure comment row
-    if not found_structured_data and text:
-        if text not in result["comments"]:
-            result["comments"].append(text)
 
-def get_max_pages(html):
+def get_max_pages(html, parser=survey_parser.DEFAULT_BACKEND):
     """Extract the maximum page number from pagination links.
 
     :param html: The raw HTML content of a survey page.
     :type html: str
+    :param parser: Parser backend, as for :func:`parse_survey`.
+    :type parser: str
     :returns: The highest page number found, or 1 if no pagination.
     :rtype: int
     """
-    soup = BeautifulSoup(html, "html.parser")
-    max_page = 1
+    return _max_page(_parse_document(html, parser).links)
 
-    # Find pagination links
-    page_links = soup.find_all("a", href=re.compile(r"\?page=\d+"))
-    for link in page_links:
-        href = link.get("href", "")
-        match = re.search(r"\?page=(\d+)", href)
-        if match:
-            page_num = int(match.group(1))
-            max_page = max(max_page, page_num)
-
-    return max_page
-
-def _check_robots(base_url, user_agent, delay):
+def check_robots(base_url, user_agent, delay, session=None, cache=None):
     """Check robots.txt and return ``(robots, delay)`` or ``None`` to abort.
 
     :param base_url: The base URL to check.
     :param user_agent: The User-Agent string.
     :param delay: Default crawl delay in seconds.
+    :param session: Optional :class:`HttpSession` used to fetch robots.txt.
+    :param cache: Optional :class:`robots_checker.RobotsCache` that
+        supplies a shared, already parsed policy when it has one.
     :returns: ``(robots_checker_instance, effective_delay)`` or ``None``.
     """
     logger.info("Checking robots.txt for user-agent: %s", user_agent)
-    robots = robots_checker.RobotsChecker(base_url, user_agent)
+    if cache is not None:
+        robots = cache.get(base_url, user_agent, session)
+    else:
+        robots = robots_checker.RobotsChecker(base_url, user_agent,
+                                              session=session)
 
+    if robots.fetch_error is not None:
+        logger.error("Could not read robots.txt for %s: %s", base_url,
+                     robots.fetch_error)
+        return None
     if not robots.can_fetch(base_url):
         logger.error("robots.txt disallows access to %s for %s",
                       base_url, user_agent)
@@ -276,92 +215,432 @@ def _check_robots(base_url, user_agent, delay):
     return robots, robots_delay
 
 
-def _finalize_comments(results):
-    """Convert comment lists to joined strings in place.
+def _page_urls(base_url, pages_to_fetch, robots, done=(), report=None):
+    """Build ``(page_num, url)`` pairs for pages 2..N allowed by robots.txt.
 
-    :param results: List of applicant data dicts.
-    :type results: list[dict]
+    :param base_url: Base URL for GradCafe survey pages.
+    :param pages_to_fetch: Last page number to fetch.
+    :param robots: A ``RobotsChecker``, or ``None`` to skip the check.
+    :param done: Page numbers completed by an earlier, resumed run.
+    :param report: Optional :class:`fetch_retry.CrawlReport` that records
+        the pages robots.txt rules out.
+    :returns: Page numbers and URLs in page order.
+    :rtype: list[tuple[int, str]]
     """
-    for result in results:
-        if isinstance(result.get("comments"), list):
-            result["comments"] = " ".join(result["comments"]).strip()
+    page_urls = []
+    for page_num in range(2, pages_to_fetch + 1):
+        if page_num in done:
+            continue
+        page_url = f"{base_url}?page={page_num}"
 
+        # Check robots.txt for each page URL
+        if robots is not None and not robots.can_fetch(page_url):
+            logger.warning("Skipping page %d: disallowed by robots.txt",
+                           page_num)
+            if report is not None:
+                report.record_skip(page_url, "robots.txt")
+            continue
+        page_urls.append((page_num, page_url))
+    return page_urls
 
-def scrape_data(
+
+def _fetch_serially(page_urls, fetch, limiter):
+    """Fetch pages one at a time, each at its next scheduled start time.
+
+    The limiter schedules every request one interval after the previous
+    one started, so the time spent fetching, parsing and storing a page
+    counts toward the delay instead of being added to it.
+
+    :param page_urls: ``(page_num, url)`` pairs to fetch.
+    :param fetch: Callable taking a URL and returning its HTML.
+    :param limiter: The crawl's :class:`rate_limiter.RateLimiter`.
+    :returns: Generator of ``(page_num, html)``; ``html`` is ``None``
+        when the fetch failed.
+    """
+    for page_num, page_url in page_urls:
+        limiter.acquire()  # being respectful to the server
+        try:
+            yield page_num, fetch(page_url)
+        except (OSError, http.client.HTTPException, ValueError,
+                UnicodeDecodeError) as e:
+            logger.error("Error fetching page %d: %s", page_num, e)
+            yield page_num, None
+
+
+# Pages fetched ahead of the consumer, per worker thread
+_PREFETCH_PER_WORKER = 2
+
+
+def _fetch_concurrently(page_urls, fetch, limiter, workers):
+    """Fetch pages with a bounded thread pool and yield them in page order.
+
+    Every request first takes a slot from the shared *limiter*, so the
+    pool hides network latency without exceeding the crawl delay. At most
+    ``workers * _PREFETCH_PER_WORKER`` pages are fetched ahead of the
+    consumer, so a slow consumer never buffers the whole crawl.
+
+    :param page_urls: ``(page_num, url)`` pairs to fetch.
+    :param fetch: Callable taking a URL and returning its HTML.
+    :param limiter: Shared :class:`rate_limiter.RateLimiter`.
+    :param workers: Maximum number of requests in flight.
+    :returns: Generator of ``(page_num, html)``; ``html`` is ``None``
+        when the fetch failed.
+    """
+    def _fetch_one(url):
+        limiter.acquire()
+        return fetch(url)
+
+    remaining = iter(page_urls)
+    window = collections.deque()
+
+    def _submit_next(pool, count=1):
+        for page_num, url in itertools.islice(remaining, count):
+            window.append((page_num, pool.submit(_fetch_one, url)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            _submit_next(pool, workers * _PREFETCH_PER_WORKER)
+            while window:
+                page_num, future = window.popleft()
+                _submit_next(pool)
+                try:
+                    yield page_num, future.result()
+                except (OSError, http.client.HTTPException, ValueError,
+                        UnicodeDecodeError) as e:
+                    logger.error("Error fetching page %d: %s", page_num, e)
+                    yield page_num, None
+        finally:
+            # A consumer that stops early must not wait for queued pages
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class CrawlPacing:
+    """How a crawl spaces and retries its requests; the ``pacing`` option.
+
+    :ivar adaptive_min_delay: When set, tune the delay from the server's
+        responses with an :class:`rate_limiter.AdaptiveRateLimiter`,
+        starting at ``delay`` and never going below this many seconds or
+        the robots.txt ``Crawl-delay``. ``None`` keeps the delay fixed.
+    :vartype adaptive_min_delay: float or None
+    :ivar schedule: Slot schedule shared with other processes, e.g. a
+        :class:`rate_limiter.LockFileSchedule`, so that concurrent crawls
+        together keep one request per delay; ``None`` paces this crawl
+        on its own.
+    :vartype schedule: rate_limiter.LockFileSchedule or None
+    :ivar retry: How transient fetch errors (timeouts, resets, 429/5xx)
+        are retried; each retry waits a jittered backoff and then takes
+        a rate-limiter slot.
+    :vartype retry: fetch_retry.RetryPolicy
+    """
+    adaptive_min_delay: float | None = None
+    schedule: LockFileSchedule | None = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+
+
+@dataclass
+class CrawlRecords:
+    """What a crawl records besides its rows; the ``records`` option.
+
+    :ivar checkpoint: Progress record of a resumable crawl. A fresh one
+        is given the page count after page 1; a resumed one supplies that
+        count and the pages to skip.
+    :vartype checkpoint: crawl_output.CrawlCheckpoint or None
+    :ivar report: Records the pages that were retried, failed or skipped;
+        pass one in to read it once the crawl is over.
+    :vartype report: fetch_retry.CrawlReport
+    :ivar archive: Append-only archive that keeps the HTML of every
+        fetched page, so it can be re-parsed later without refetching.
+    :vartype archive: page_archive.PageArchive or None
+    """
+    checkpoint: CrawlCheckpoint | None = None
+    report: CrawlReport = field(default_factory=CrawlReport)
+    archive: PageArchive | None = None
+
+
+@dataclass
+class CrawlOptions:
+    """Tuning options accepted by :func:`iter_pages`, :func:`iter_results`
+    and :func:`scrape_data` as keyword arguments.
+
+    :ivar workers: Number of concurrent fetcher threads. With more than
+        one worker the remaining pages are fetched by a thread pool that
+        shares one :class:`rate_limiter.RateLimiter`, so request starts
+        stay ``delay`` seconds apart while responses overlap.
+    :vartype workers: int
+    :ivar session: Shared :class:`HttpSession` for keep-alive requests,
+        or ``None`` to open a new connection per page.
+    :vartype session: HttpSession or None
+    :ivar parser: Parser backend for :func:`parse_survey` and
+        :func:`get_max_pages`, one of :data:`survey_parser.BACKENDS`.
+    :vartype parser: str
+    :ivar parse_workers: Number of parse processes. With ``0`` pages are
+        parsed in the calling process; otherwise fetched HTML is handed
+        to a :class:`~concurrent.futures.ProcessPoolExecutor` so parsing
+        uses more than one core while the fetchers keep downloading.
+    :vartype parse_workers: int
+    :ivar pacing: Delay tuning, cross-process schedule and retry policy.
+    :vartype pacing: CrawlPacing
+    :ivar robots_cache: Shared robots.txt cache; without one robots.txt
+        is downloaded and parsed for every crawl.
+    :vartype robots_cache: robots_checker.RobotsCache or None
+    :ivar records: Checkpoint, crawl report and page archive.
+    :vartype records: CrawlRecords
+    """
+    workers: int = 1
+    session: HttpSession | None = None
+    parser: str = survey_parser.DEFAULT_BACKEND
+    parse_workers: int = 0
+    pacing: CrawlPacing = field(default_factory=CrawlPacing)
+    robots_cache: robots_checker.RobotsCache | None = None
+    records: CrawlRecords = field(default_factory=CrawlRecords)
+
+
+def _build_limiter(delay, robots, opts):
+    """Return the crawl's fixed or adaptive rate limiter.
+
+    :param delay: Starting delay in seconds (already robots-adjusted).
+    :param robots: A ``RobotsChecker``, or ``None`` when robots.txt is
+        ignored.
+    :rtype: rate_limiter.RateLimiter
+    """
+    pacing = opts.pacing
+    if pacing.adaptive_min_delay is None:
+        return RateLimiter(delay, pacing.schedule)
+    floor = pacing.adaptive_min_delay
+    if robots is not None:
+        floor = max(floor, robots.get_crawl_delay(0.0))
+    return AdaptiveRateLimiter(delay, min_interval=floor,
+                               schedule=pacing.schedule)
+
+
+def _fetch_remaining(page_urls, fetch, limiter, opts):
+    """Pick the serial or concurrent fetcher for pages 2..N.
+
+    :returns: Generator of ``(page_num, html)`` in page order.
+    """
+    if opts.workers > 1:
+        return _fetch_concurrently(page_urls, fetch, limiter, opts.workers)
+    return _fetch_serially(page_urls, fetch, limiter)
+
+
+def _fetch_first_page(base_url, fetch, limiter, max_pages, parser):
+    """Fetch and parse page 1, which also carries the pagination links.
+
+    :returns: ``(results, pages_to_fetch)``
+    :rtype: tuple[list[dict], int]
+    """
+    limiter.acquire()
+    results, total_pages = parse_page(fetch(base_url), parser)
+    finalize_comments(results)
+
+    pages_to_fetch = (min(total_pages, max_pages)
+                      if max_pages else total_pages)
+
+    logger.info("Found %d total pages. Fetching %d pages...",
+                 total_pages, pages_to_fetch)
+    logger.info("Page 1/%d - %d results", pages_to_fetch, len(results))
+    return results, pages_to_fetch
+
+
+def _start_crawl(base_url, fetch, limiter, max_pages, opts):
+    """Read page 1, or pick up where a resumed checkpoint left off.
+
+    :returns: ``(first_rows, pages_to_fetch)``; ``first_rows`` is ``None``
+        when an earlier run already completed page 1.
+    :rtype: tuple[list[dict] or None, int]
+    """
+    checkpoint = opts.records.checkpoint
+    resumed = checkpoint is not None and checkpoint.pages_to_fetch
+    if resumed:
+        logger.info("Resuming crawl: %d of %d pages already done",
+                    len(checkpoint.completed), checkpoint.pages_to_fetch)
+        if 1 in checkpoint.completed:
+            return None, checkpoint.pages_to_fetch
+
+    first_rows, pages_to_fetch = _fetch_first_page(
+        base_url, fetch, limiter, max_pages, opts.parser)
+    if resumed:
+        # Keep the page count fixed when the crawl first started
+        return first_rows, checkpoint.pages_to_fetch
+    if checkpoint is not None:
+        checkpoint.start(pages_to_fetch)
+    return first_rows, pages_to_fetch
+
+
+def _parse_rows(html, parser):
+    """Parse one fetched survey page into finalized applicant dicts.
+
+    Module-level so it can run in a parse worker process.
+
+    :rtype: list[dict]
+    """
+    results = parse_survey(html, parser)
+    finalize_comments(results)
+    return results
+
+
+def _parse_in_processes(pages, parser, parse_workers):
+    """Parse fetched pages in a process pool and yield them in page order.
+
+    At most ``parse_workers * _PREFETCH_PER_WORKER`` pages are queued for
+    parsing, so fetched HTML never piles up ahead of slow parsers. Pages
+    whose fetch failed pass through as ``None``.
+
+    The workers are started with ``spawn``: by the time the first page is
+    submitted the fetcher threads are running, and forking a process
+    that has threads can deadlock the child on a lock one of them held.
+
+    :param pages: Iterable of ``(page_num, html)`` in page order.
+    :param parser: Parser backend name.
+    :param parse_workers: Number of worker processes.
+    :returns: Generator of ``(page_num, rows)``; ``rows`` is ``None``
+        when the page could not be fetched.
+    """
+    remaining = iter(pages)
+    window = collections.deque()
+
+    def _submit_next(pool, count=1):
+        for page_num, html in itertools.islice(remaining, count):
+            future = (None if html is None
+                      else pool.submit(_parse_rows, html, parser))
+            window.append((page_num, future))
+
+    with ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=multiprocessing.get_context("spawn")) as pool:
+        try:
+            _submit_next(pool, parse_workers * _PREFETCH_PER_WORKER)
+            while window:
+                page_num, future = window.popleft()
+                _submit_next(pool)
+                yield page_num, None if future is None else future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_remaining(pages, opts):
+    """Parse pages 2..N in-process or in the parse worker pool.
+
+    :returns: Generator of ``(page_num, rows)`` in page order; ``rows``
+        is ``None`` when the page could not be fetched.
+    """
+    if opts.parse_workers > 0:
+        return _parse_in_processes(pages, opts.parser, opts.parse_workers)
+    return ((page_num, None if html is None else _parse_rows(html, opts.parser))
+            for page_num, html in pages)
+
+
+def iter_pages(
         base_url="https://www.thegradcafe.com/survey/",
         max_pages=None, delay=0.5,
         user_agent=robots_checker.DEFAULT_USER_AGENT,
-        ignore_robots=False):
-    """Scrape the GradCafe survey across multiple pages.
-
-    :param base_url: Base URL for GradCafe survey pages.
-    :type base_url: str
-    :param max_pages: Maximum number of pages to scrape, or ``None``.
-    :type max_pages: int or None
-    :param delay: Delay between page fetches in seconds.
-    :type delay: float
-    :param user_agent: User-Agent header string for requests.
-    :type user_agent: str
-    :param ignore_robots: If ``True``, skip the robots.txt check.
-    :type ignore_robots: bool
-    :returns: A list of dictionaries containing applicant survey data.
-    :rtype: list[dict]
+        ignore_robots=False, **options):
+    """Crawl the GradCafe survey and yield each page's rows as it arrives.
+
+    Pages are yielded in page order. Only the pages in flight are held in
+    memory, so a consumer can store or forward rows while later pages
+    are still downloading. Transient fetch errors are retried under
+    ``pacing.retry``; pages that still fail are logged, recorded in
+    ``records.report`` and skipped. Takes the same arguments as :func:`scrape_data`.
+
+    :returns: Generator of ``(page_num, rows)``, where ``rows`` is the
+        page's list of applicant dicts with comments finalized.
+    :rtype: collections.abc.Iterator[tuple[int, list[dict]]]
     """
-    all_results = []
+    opts = CrawlOptions(**options)
     robots = None
 
     # Check robots.txt
     if not ignore_robots:
-        check = _check_robots(base_url, user_agent, delay)
+        check = check_robots(base_url, user_agent, delay, opts.session,
+                             opts.robots_cache)
         if check is None:
-            return all_results
+            return
         robots, delay = check
 
     # Fetch first page to determine total pages
-    html = fetch_page(base_url, user_agent)
-    results = parse_survey(html)
-    _finalize_comments(results)
-    all_results.extend(results)
+    fetch = functools.partial(fetch_page, user_agent=user_agent,
+                              session=opts.session)
+    if opts.records.archive is not None:
+        fetch = opts.records.archive.record(fetch)
+    limiter = _build_limiter(delay, robots, opts)
+    if opts.pacing.adaptive_min_delay is not None:
+        fetch = limiter.observe(fetch)
+    fetch = opts.pacing.retry.wrap(fetch, opts.records.report,
+                                   limiter.acquire)
+    first_rows, pages_to_fetch = _start_crawl(
+        base_url, fetch, limiter, max_pages, opts)
+    if first_rows is not None:
+        yield 1, first_rows
+
+    # Parse remaining pages in page order
+    for page_num, rows in _parse_remaining(_fetch_remaining(
+            _page_urls(base_url, pages_to_fetch, robots,
+                       opts.records.checkpoint.completed
+                       if opts.records.checkpoint else (),
+                       opts.records.report),
+            fetch, limiter, opts), opts):
+        if rows is not None:
+            logger.info("Page %d/%d - %d results",
+                        page_num, pages_to_fetch, len(rows))
+            yield page_num, rows
+    if opts.pacing.adaptive_min_delay is not None:
+        logger.info("Pacing stats: %s", limiter.stats())
+    logger.info("Crawl report: %s", opts.records.report.as_dict())
 
-    total_pages = get_max_pages(html)
-    pages_to_fetch = (min(total_pages, max_pages)
-                      if max_pages else total_pages)
 
-    logger.info("Found %d total pages. Fetching %d pages...",
-                 total_pages, pages_to_fetch)
-    logger.info("Page 1/%d - %d results", pages_to_fetch, len(results))
+def iter_results(*args, **kwargs):
+    """Yield applicant dicts one at a time, in page order.
 
-    # Fetch remaining pages
-    for page_num in range(2, pages_to_fetch + 1):
-        time.sleep(delay)  # being respectful to the server
+    Accepts the same arguments as :func:`scrape_data`.
 
-        page_url = f"{base_url}?page={page_num}"
+    :rtype: collections.abc.Iterator[dict]
+    """
+    for _, rows in iter_pages(*args, **kwargs):
+        yield from rows
 
-        # Check robots.txt for each page URL
-        if not ignore_robots and not robots.can_fetch(page_url):
-            logger.warning("Skipping page %d: disallowed by robots.txt",
-                           page_num)
-            continue
 
-        try:
-            html = fetch_page(page_url, user_agent)
-            results = parse_survey(html)
-            _finalize_comments(results)
-            all_results.extend(results)
-            logger.info("Page %d/%d - %d results",
-                        page_num, pages_to_fetch, len(results))
-        except (OSError, ValueError, UnicodeDecodeError) as e:
-            logger.error("Error fetching page %d: %s", page_num, e)
-            continue
+def scrape_data(
+        base_url="https://www.thegradcafe.com/survey/",
+        max_pages=None, delay=0.5,
+        user_agent=robots_checker.DEFAULT_USER_AGENT,
+        ignore_robots=False, **options):
+    """Scrape the GradCafe survey across multiple pages.
+
+    Collects :func:`iter_results` into a list. Results are always
+    returned in page order, however many pages are fetched concurrently.
 
+    :param base_url: Base URL for GradCafe survey pages.
+    :type base_url: str
+    :param max_pages: Maximum number of pages to scrape, or ``None``.
+    :type max_pages: int or None
+    :param delay: Delay between page fetches in seconds.
+    :type delay: float
+    :param user_agent: User-Agent header string for requests.
+    :type user_agent: str
+    :param ignore_robots: If ``True``, skip the robots.txt check.
+    :type ignore_robots: bool
+    :param options: Keyword arguments for :class:`CrawlOptions`
+        (e.g. ``workers=4``, ``parser="stream"``, or
+        ``records=CrawlRecords()`` to read its ``report`` of the pages
+        that were retried, failed or skipped).
+    :returns: A list of dictionaries containing applicant survey data.
+    :rtype: list[dict]
+    """
+    all_results = list(iter_results(base_url, max_pages, delay, user_agent,
+                                    ignore_robots, **options))
     logger.info("Total results: %d", len(all_results))
     return all_results
 
-def main():
-    """Scrape the survey page and output results as JSON.
+DEFAULT_CACHE_DIR = ".page_cache"
+DEFAULT_ROBOTS_CACHE_DIR = ".robots_cache"
 
-    Parses CLI arguments for page count, delay, output file, user agent,
-    and robots.txt handling. Writes results to a file or stdout.
+
+def _build_arg_parser():
+    """Build the command-line parser for :func:`main`.
+
+    :rtype: argparse.ArgumentParser
     """
     parser = argparse.ArgumentParser(
         description="Scrape the survey page and parse its content. "
@@ -379,46 +658,240 @@ def main():
         default=0.5,
         help="delay between pages in seconds (default: 0.5)"
     )
+    add_output_arguments(parser)
+    add_request_arguments(parser)
     parser.add_argument(
-        "--output", "-o",
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="number of pages fetched concurrently (default: 1)"
+    )
+    parser.add_argument(
+        "--parse_workers",
+        type=int,
+        default=0,
+        help=("number of processes parsing fetched pages; 0 parses in the "
+              "main process (default: 0)")
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help=("adapt the delay to the server: speed up while responses are "
+              "fast, back off on 429/503, timeouts or rising latency "
+              "(default: False)")
+    )
+    parser.add_argument(
+        "--min_delay",
+        type=float,
+        default=0.25,
+        help=("fastest --adaptive delay in seconds; never below the "
+              "robots.txt Crawl-delay (default: 0.25)")
+    )
+    parser.add_argument(
+        "--cache_dir",
         type=str,
-        help="output JSON file (default: stdout)"
+        help=("cache fetched pages in this directory and revalidate them "
+              "with conditional GETs (default: no cache)")
     )
     parser.add_argument(
-        "--user_agent", "-u",
+        "--offline",
+        action="store_true",
+        help=("replay pages from the cache without any network access "
+              f"(default cache: {DEFAULT_CACHE_DIR})")
+    )
+    parser.add_argument(
+        "--archive_dir",
         type=str,
-        default=robots_checker.DEFAULT_USER_AGENT,
-        help=("User agent string to use for requests "
-              f"(default: {robots_checker.DEFAULT_USER_AGENT})")
+        help=("append every fetched page to a compressed archive in this "
+              "directory for re-parsing with reparse.py (default: none)")
+    )
+    parser.add_argument(
+        "--robots_cache_dir",
+        type=str,
+        default=DEFAULT_ROBOTS_CACHE_DIR,
+        help=("keep each host's robots.txt in this directory between runs "
+              f"(default: {DEFAULT_ROBOTS_CACHE_DIR})")
+    )
+    parser.add_argument(
+        "--robots_ttl",
+        type=float,
+        default=robots_checker.DEFAULT_ROBOTS_TTL,
+        help=("seconds a cached robots.txt is reused, unless its cache "
+              "headers say less; 0 disables the cache "
+              f"(default: {robots_checker.DEFAULT_ROBOTS_TTL})")
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=("json", "ndjson"),
+        default="json",
+        help=("output format: a JSON array written at the end, or one "
+              "JSON object per line written as pages arrive (default: json)")
     )
     parser.add_argument(
-        "--ignore_robots",
+        "--resume",
         action="store_true",
-        help="ignore robots.txt check (not recommended) (default: False)"
+        help=("continue an interrupted --format ndjson crawl from its "
+              "checkpoint file (<output>.checkpoint) (default: False)")
     )
-    args = parser.parse_args()
-    max_pages = args.pages if args.pages > 0 else None
-    results = scrape_data(
-        max_pages=max_pages,
-        delay=args.delay,
-        user_agent=args.user_agent,
-        ignore_robots=args.ignore_robots
+    parser.add_argument(
+        "--parser",
+        choices=survey_parser.BACKENDS,
+        default=survey_parser.DEFAULT_BACKEND,
+        help=("HTML parser backend; 'stream' skips building a parse tree "
+              f"(default: {survey_parser.DEFAULT_BACKEND})")
     )
+    return parser
+
 
-    # Output as formatted JSON
-    json_output = json.dumps(results, indent=2, ensure_ascii=False)
-    if args.output:
-        filename = os.path.basename(args.output)
-        if not filename:
-            logger.error("Invalid output filename")
-            return results
-        safe_path = os.path.join(os.getcwd(), filename)
-        with open(safe_path, "w", encoding="utf-8") as f:
-            f.write(json_output)
-        logger.info("Results saved to %s", safe_path)
+def _crawl_paths(args):
+    """Resolve and check the CLI crawl's output and directory paths.
+
+    :returns: ``(output_path, robots_cache_path, archive_path)``; the
+        output and archive paths are ``None`` when not requested.
+    :raises ValueError: If an argument is invalid.
+    """
+    output_path = resolve_output(args)
+    if args.resume and (args.format != "ndjson" or output_path is None):
+        raise ValueError("--resume requires --format ndjson and --output")
+    robots_cache_path = cwd_path(args.robots_cache_dir)
+    if robots_cache_path is None:
+        raise ValueError("Invalid robots cache directory")
+    archive_path = cwd_path(args.archive_dir) if args.archive_dir else None
+    if args.archive_dir and archive_path is None:
+        raise ValueError("Invalid archive directory")
+    return output_path, robots_cache_path, archive_path
+
+
+def _build_session(args):
+    """Create the crawl's :class:`HttpSession`, with a cache if requested.
+
+    :rtype: HttpSession
+    :raises ValueError: If the cache directory is invalid.
+    """
+    cache = None
+    if args.cache_dir or args.offline:
+        cache_path = cwd_path(args.cache_dir or DEFAULT_CACHE_DIR)
+        if cache_path is None:
+            raise ValueError("Invalid cache directory")
+        cache = PageCache(cache_path)
+    return HttpSession(args.user_agent,
+                       timeout=(args.connect_timeout, args.timeout),
+                       cache=cache, offline=args.offline)
+
+
+def _build_robots_cache(args, cache_path):
+    """Create the crawl's robots.txt cache in *cache_path*.
+
+    :returns: The cache, or ``None`` when caching is disabled or
+        robots.txt is not consulted at all.
+    :rtype: robots_checker.RobotsCache or None
+    """
+    if args.ignore_robots or args.offline or args.robots_ttl <= 0:
+        return None
+    return robots_checker.RobotsCache(cache_path, args.robots_ttl,
+                                      timeout=args.timeout)
+
+
+def _open_output(path, compress):
+    """Open the crawl output for writing text.
+
+    :param path: Output file path, or ``None`` for stdout.
+    :param compress: ``"gzip"`` to gzip-compress the file, else ``"none"``.
+    :returns: A context manager yielding a writable text stream.
+    """
+    if path is None:
+        return contextlib.nullcontext(sys.stdout)
+    if compress == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def _write_ndjson_output(crawl, output_path, args):
+    """Stream the crawl to stdout or *output_path* as NDJSON.
+
+    File output is checkpointed to ``<output>.checkpoint`` after every
+    page; ``--resume`` continues from it. A crawl that fetched every page
+    removes it; one with failed pages keeps it, so ``--resume`` fetches
+    just those pages again.
+    """
+    if output_path is None:
+        count = write_ndjson(iter_pages(**crawl), sys.stdout.buffer)
+        logger.info("Total results: %d", count)
+        return
+
+    checkpoint = crawl["records"].checkpoint = CrawlCheckpoint(
+        output_path + CHECKPOINT_SUFFIX)
+    resumed = args.resume and checkpoint.resume(output_path, args.compress)
+    if args.resume and not resumed:
+        logger.warning("No usable checkpoint for %s; starting over",
+                       output_path)
+    with open(output_path, "ab" if resumed else "wb") as out:
+        count = write_ndjson(iter_pages(**crawl), out, args.compress,
+                             checkpoint)
+    failed = crawl["records"].report.failed
+    if failed:
+        logger.warning("%d page(s) failed, keeping %s for --resume: %s",
+                       len(failed), checkpoint.path, ", ".join(sorted(failed)))
     else:
-        print(json_output)
+        checkpoint.clear()
+    logger.info("Total results: %d", count)
+
 
+def main():
+    """Scrape the survey page and output results as JSON.
+
+    Parses CLI arguments for page count, delay, output file and format,
+    user agent, robots.txt handling, concurrency, the page cache, and the
+    parser backend. ``--format json`` writes one pretty-printed array once
+    the crawl finishes; ``--format ndjson`` streams one row per line as
+    each page is parsed, and ``--resume`` continues such a crawl from its
+    checkpoint. ``--offline`` replays cached pages only and
+    skips the robots.txt check, since no request reaches the site.
+
+    :returns: The scraped rows for ``--format json``; in NDJSON mode rows
+        are streamed to the output rather than kept, and ``[]`` is
+        returned.
+    :rtype: list[dict]
+    """
+    args = _build_arg_parser().parse_args()
+    try:
+        output_path, robots_cache_path, archive_path = _crawl_paths(args)
+        rate_lock = resolve_rate_lock(args)
+        session = _build_session(args)
+    except ValueError as e:
+        logger.error("%s", e)
+        return []
+
+    crawl = {
+        "max_pages": args.pages if args.pages > 0 else None,
+        "delay": 0 if args.offline else args.delay,
+        "user_agent": args.user_agent,
+        "ignore_robots": args.ignore_robots or args.offline,
+        "workers": max(1, args.workers),
+        "parse_workers": max(0, args.parse_workers),
+        "pacing": CrawlPacing(
+            adaptive_min_delay=args.min_delay if args.adaptive else None,
+            schedule=(LockFileSchedule(rate_lock)
+                      if rate_lock and not args.offline else None),
+            retry=RetryPolicy(attempts=1 + max(0, args.retries))),
+        "session": session,
+        "parser": args.parser,
+        "robots_cache": _build_robots_cache(args, robots_cache_path),
+        "records": CrawlRecords(
+            archive=PageArchive(archive_path) if archive_path else None),
+    }
+    results = []
+    with session:
+        if args.format == "ndjson":
+            _write_ndjson_output(crawl, output_path, args)
+        else:
+            results = scrape_data(**crawl)
+            with _open_output(output_path, args.compress) as out:
+                out.write(json.dumps(results, indent=2, ensure_ascii=False,
+                                     default=json_default))
+                out.write("\n")
+    if output_path:
+        logger.info("Results saved to %s", output_path)
     return results
 
 
@@ -0,0 +1,346 @@
+"""
+Bulk loading through an unlogged staging table.
+
+:func:`copy_rows` streams insert parameters into :data:`STAGING_TABLE`
+with one ``COPY ... FROM STDIN`` and merges them into ``applicants`` with
+one ``INSERT ... SELECT`` (:func:`build_merge_query`).
+:func:`parallel_copy` fills the same staging table from worker
+processes, each with its own connection, before the single merge.
+"""
+from __future__ import annotations
+
+import collections
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from psycopg import OperationalError, sql
+
+from applicant_record import ApplicantRecord
+from applicant_rows import (
+    APPLICANT_COLUMNS, DEFAULT_BATCH_SIZE, HASH_COLUMN, SCRAPED_PARAM_KEYS,
+    build_scraped_params, iter_batches, iter_rows, upsert_assignments)
+
+logger = logging.getLogger(__name__)
+
+#: Unlogged table that :func:`copy_rows` streams rows into.
+STAGING_TABLE = "applicants_staging"
+
+# COPY BINARY needs every column's type up front
+_COPY_TYPES = {"date_added": "date", "gpa": "float4", "gre": "float4",
+               "gre_v": "float4", "gre_aw": "float4"}
+
+
+def build_merge_query(incremental=False, into=None):
+    """Build the INSERT … SELECT that merges the staging table.
+
+    Only the first staged row of each ``url`` is kept, and rows are
+    inserted in staging order, so the result matches inserting the rows
+    one by one with :func:`applicant_rows.build_insert_query`. Each row also stores
+    :data:`HASH_COLUMN`, an MD5 of its staged values.
+
+    With *incremental*, a stored ``url`` is updated as by
+    :func:`applicant_rows.build_upsert_query`, but only when its hash differs, so an
+    unchanged row is neither rewritten nor counted.
+
+    With *into*, rows go to that table instead: an empty one that has no
+    ``url`` index yet (see :func:`table_swap.swap_load`), so there is no
+    ``ON CONFLICT`` clause.
+
+    :param incremental: Update changed rows instead of skipping them.
+    :type incremental: bool
+    :param into: Name of an empty table to fill instead of ``applicants``.
+    :type into: str or None
+    :returns: A composed SQL query ready for ``cursor.execute``.
+    :rtype: psycopg.sql.Composed
+    """
+    table = sql.Identifier(into or "applicants")
+    columns = sql.SQL(", ").join(sql.Identifier(c) for c in APPLICANT_COLUMNS)
+    content_hash = sql.Identifier(HASH_COLUMN)
+    if into:
+        conflict = sql.SQL("")
+    elif incremental:
+        conflict = sql.SQL(
+            " ON CONFLICT ({url}) "
+            "DO UPDATE SET {updates}, {hash} = {excluded}.{hash} "
+            "WHERE {table}.{hash} IS DISTINCT FROM {excluded}.{hash}"
+        ).format(
+            url=sql.Identifier("url"),
+            updates=sql.SQL(", ").join(upsert_assignments()),
+            hash=content_hash,
+            excluded=sql.Identifier("excluded"),
+            table=table,
+        )
+    else:
+        conflict = sql.SQL(" ON CONFLICT ({}) DO NOTHING").format(
+            sql.Identifier("url"))
+    return sql.SQL(
+        "INSERT INTO {table} ({columns}, {hash}) "
+        "SELECT {columns}, {hash} FROM ("
+        "SELECT DISTINCT ON ({url}) {ordinal}, {columns}, "
+        "md5(ROW({columns})::text) AS {hash} FROM {staging} "
+        "ORDER BY {url}, {ordinal}) AS {first} "
+        "ORDER BY {ordinal}{conflict}"
+    ).format(
+        table=table,
+        columns=columns,
+        hash=content_hash,
+        url=sql.Identifier("url"),
+        ordinal=sql.Identifier("ordinal"),
+        staging=sql.Identifier(STAGING_TABLE),
+        first=sql.Identifier("first_rows"),
+        conflict=conflict,
+    )
+
+
+def _create_staging(cur, table="applicants"):
+    """(Re)create the empty unlogged staging table.
+
+    It takes its column types from *table* plus a leading ``ordinal``
+    column that records each row's position in the input.
+    """
+    staging = sql.Identifier(STAGING_TABLE)
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(staging))
+    cur.execute(sql.SQL(
+        "CREATE UNLOGGED TABLE {} AS SELECT 0::bigint AS {}, {} FROM {} "
+        "WITH NO DATA"
+    ).format(staging, sql.Identifier("ordinal"),
+             sql.SQL(", ").join(sql.Identifier(c) for c in APPLICANT_COLUMNS),
+             sql.Identifier(table)))
+
+
+def _copy_staged(cur, numbered_params, binary=False):
+    """Stream ``(ordinal, params)`` pairs into the staging table.
+
+    :returns: The number of rows copied.
+    :rtype: int
+    """
+    columns = [sql.Identifier(c) for c in ("ordinal", *APPLICANT_COLUMNS)]
+    copy_query = sql.SQL("COPY {} ({}) FROM STDIN{}").format(
+        sql.Identifier(STAGING_TABLE), sql.SQL(", ").join(columns),
+        sql.SQL(" (FORMAT BINARY)" if binary else ""))
+    count = 0
+    with cur.copy(copy_query) as copy:
+        if binary:
+            copy.set_types(["int8"] + [_COPY_TYPES.get(c, "text")
+                                       for c in APPLICANT_COLUMNS])
+        for ordinal, params in numbered_params:
+            copy.write_row([ordinal] + [params[k] for k in SCRAPED_PARAM_KEYS])
+            count += 1
+    return count
+
+
+def copy_rows(conn, params_list, binary=False, incremental=False, into=None):
+    """Bulk-load insert parameters through an unlogged staging table.
+
+    The staging table is filled with one ``COPY ... FROM STDIN`` and
+    merged with :func:`build_merge_query`. Everything runs in one
+    transaction (a savepoint inside an open one), so a failed load leaves
+    ``applicants`` untouched and no staging table behind.
+
+    :param conn: An open database connection.
+    :type conn: psycopg.Connection
+    :param params_list: Parameter dicts from
+        :func:`applicant_rows.build_scraped_params`.
+    :type params_list: collections.abc.Iterable[dict[str, Any]]
+    :param binary: Use ``COPY`` binary format instead of text.
+    :type binary: bool
+    :param incremental: Also update changed stored rows (see
+        :func:`build_merge_query`).
+    :type incremental: bool
+    :param into: Empty table to fill instead of ``applicants``.
+    :type into: str or None
+    :returns: The number of rows inserted (or updated) in ``applicants``.
+    :rtype: int
+    """
+    with conn.transaction():
+        cur = conn.cursor()
+        _create_staging(cur, into or "applicants")
+        _copy_staged(cur, enumerate(params_list), binary)
+        cur.execute(build_merge_query(incremental, into))
+        inserted = cur.rowcount
+        cur.execute(sql.SQL("DROP TABLE {}").format(
+            sql.Identifier(STAGING_TABLE)))
+    return inserted
+
+
+# Per-process state of parallel_copy workers: their own connection
+_WORKER = {}
+
+
+def _init_worker(connect):
+    """Open the load worker's connection (pool initializer)."""
+    _WORKER["conn"] = connect()
+
+
+def _worker_cursor():
+    """Return a cursor on the load worker's connection.
+
+    :raises psycopg.OperationalError: If the worker could not connect.
+    """
+    conn = _WORKER.get("conn")
+    if conn is None:
+        raise OperationalError("Load worker could not connect")
+    return conn.cursor()
+
+
+def ndjson_ranges(path, parts):
+    """Split a plain NDJSON file into *parts* byte ranges.
+
+    Ranges need not fall on line boundaries: a line belongs to the range
+    its first byte is in (see :func:`_iter_byte_range`).
+
+    :param path: The input file.
+    :type path: str
+    :param parts: Number of ranges wanted.
+    :type parts: int
+    :returns: ``(start, end)`` offsets, or ``None`` for a gzip file or a
+        JSON array, which can only be read from the start.
+    :rtype: list[tuple[int, int]] or None
+    """
+    with open(path, "rb") as f:
+        if f.read(2) == b"\x1f\x8b":
+            return None
+        f.seek(0)
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+    if head == b"[":
+        return None
+    size = os.path.getsize(path)
+    step = max(1, -(-size // max(1, parts)))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def _iter_byte_range(path, start, end):
+    """Yield ``(offset, record)`` for each line starting in ``[start, end)``.
+
+    The byte offset of a line doubles as its ordinal, so rows from all
+    ranges keep their file order in the staging table.
+    """
+    with open(path, "rb") as f:
+        if start:
+            # Skip the line that began in the previous range
+            f.seek(start - 1)
+            f.readline()
+        while True:
+            offset = f.tell()
+            line = f.readline() if offset < end else b""
+            if not line:
+                return
+            if line.strip():
+                yield offset, ApplicantRecord.from_json(line)
+
+
+def _copy_byte_range(path, start, end, binary):
+    """Worker task: transform and stage one NDJSON byte range.
+
+    :returns: The number of rows staged.
+    :rtype: int
+    """
+    return _copy_staged(_worker_cursor(), (
+        (offset, build_scraped_params(row))
+        for offset, row in _iter_byte_range(path, start, end)), binary)
+
+
+def _copy_batch(first_ordinal, rows, binary):
+    """Worker task: transform and stage one batch of rows.
+
+    :returns: The number of rows staged.
+    :rtype: int
+    """
+    return _copy_staged(_worker_cursor(), enumerate(
+        map(build_scraped_params, rows), first_ordinal), binary)
+
+
+def _stage_batches(pool, rows, batch_size, binary, jobs):
+    """Hand batches of *rows* to *pool*, at most ``2 * jobs`` at a time.
+
+    :returns: Generator of staged row counts, in submission order.
+    """
+    pending = collections.deque()
+    ordinal = 0
+    for batch in iter_batches(rows, batch_size):
+        if len(pending) >= 2 * jobs:
+            yield pending.popleft().result()
+        pending.append(pool.submit(_copy_batch, ordinal, batch, binary))
+        ordinal += len(batch)
+    while pending:
+        yield pending.popleft().result()
+
+
+@dataclass
+class CopyOptions:
+    """How :func:`parallel_copy` stages and merges its rows.
+
+    :ivar batch_size: Rows per batch for gzip and JSON array input.
+    :vartype batch_size: int
+    :ivar binary: Use ``COPY`` binary format instead of text.
+    :vartype binary: bool
+    :ivar incremental: Also update changed stored rows (see
+        :func:`build_merge_query`).
+    :vartype incremental: bool
+    :ivar into: Empty table to fill instead of ``applicants``.
+    :vartype into: str or None
+    """
+    batch_size: int = DEFAULT_BATCH_SIZE
+    binary: bool = False
+    incremental: bool = False
+    into: str | None = None
+
+
+def parallel_copy(conn, path, jobs, connect, options=None):
+    """Stage *path* from *jobs* worker processes, then merge once.
+
+    A plain NDJSON file is split into byte ranges (:func:`ndjson_ranges`)
+    that each worker reads, transforms and copies on its own connection.
+    A gzip file or a JSON array is decoded here and its batches are
+    transformed and copied by the workers, with at most ``2 * jobs``
+    batches queued. Workers commit their ``COPY`` into the shared
+    staging table themselves; ``applicants`` only changes in the final
+    merge, so a failed load leaves it untouched.
+
+    :param conn: Autocommit connection for the staging table and merge.
+    :type conn: psycopg.Connection
+    :param path: The input file.
+    :type path: str
+    :param jobs: Number of worker processes and connections.
+    :type jobs: int
+    :param connect: Picklable callable run once in each worker; returns
+        an autocommit connection, or ``None`` when it cannot connect.
+    :type connect: collections.abc.Callable[[], psycopg.Connection or None]
+    :param options: Batching, format and merge settings; the defaults
+        when ``None``.
+    :type options: CopyOptions or None
+    :returns: The number of rows inserted (or updated) in ``applicants``.
+    :rtype: int
+    """
+    if options is None:
+        options = CopyOptions()
+    cur = conn.cursor()
+    _create_staging(cur, options.into or "applicants")
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(connect,)) as pool:
+            ranges = ndjson_ranges(path, jobs)
+            if ranges is None:
+                counts = _stage_batches(pool, iter_rows(path),
+                                        options.batch_size, options.binary,
+                                        jobs)
+            else:
+                counts = (future.result() for future in [
+                    pool.submit(_copy_byte_range, path, start, end,
+                                options.binary)
+                    for start, end in ranges])
+            staged = 0
+            for count in counts:
+                staged += count
+                logger.info("Staged %d rows", staged)
+        with conn.transaction():
+            cur.execute(build_merge_query(options.incremental, options.into))
+            inserted = cur.rowcount
+    finally:
+        cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(
+            sql.Identifier(STAGING_TABLE)))
+    return inserted
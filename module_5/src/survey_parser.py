@@ -0,0 +1,150 @@
+"""
+Tree-free extractor for GradCafe survey pages.
+
+BeautifulSoup builds a full element tree before :func:`scrape.parse_survey`
+looks at a single row. :func:`extract` skips the tree: one streaming
+:class:`html.parser.HTMLParser` pass collects the ``<td>`` cells of the
+first table's ``<tbody>`` and every ``<a>`` on the page. The cells it
+returns provide the small part of the ``bs4.element.Tag`` interface that
+:func:`survey_rows.parse_main_row` and :func:`survey_rows.parse_detail_row` use
+(``get_text`` and ``find("a", href=...)``), so both backends feed the same
+row parsers and produce identical dicts.
+"""
+
+from collections import namedtuple
+from html.parser import HTMLParser
+
+#: Parser backends accepted by ``scrape.parse_survey`` and ``--parser``.
+BACKENDS = ("html.parser", "lxml", "stream")
+DEFAULT_BACKEND = "html.parser"
+STREAM_BACKEND = "stream"
+
+SurveyDocument = namedtuple("SurveyDocument", ["rows", "links"])
+
+# Elements whose content bs4 does not return from get_text()
+_SKIPPED_TEXT = ("script", "style", "template")
+
+
+class SurveyCell:
+    """A ``<td>`` captured by :class:`_SurveyTableParser`.
+
+    Holds the cell's text nodes in document order and the attributes of
+    every ``<a>`` nested in it.
+    """
+
+    __slots__ = ("strings", "links")
+
+    def __init__(self):
+        self.strings = []
+        self.links = []
+
+    def get_text(self, separator="", strip=False):
+        """Join the cell's text like ``bs4.element.Tag.get_text``.
+
+        :param separator: String placed between text nodes.
+        :type separator: str
+        :param strip: Strip each text node and drop the empty ones.
+        :type strip: bool
+        :rtype: str
+        """
+        strings = self.strings
+        if strip:
+            strings = [s.strip() for s in strings if s.strip()]
+        return separator.join(strings)
+
+    def find(self, name, href):
+        """Return the first nested ``<a>`` whose href matches *href*.
+
+        :param name: Tag name; only ``"a"`` is captured.
+        :type name: str
+        :param href: Compiled pattern searched in the ``href`` attribute.
+        :type href: re.Pattern
+        :returns: The link's attributes, or ``None`` if nothing matches.
+        :rtype: dict or None
+        """
+        if name != "a":
+            return None
+        for attrs in self.links:
+            if href.search(attrs.get("href", "")):
+                return attrs
+        return None
+
+
+class _SurveyTableParser(HTMLParser):
+    """Streaming parser that keeps only survey rows and links.
+
+    Table elements of the first ``<table>`` are tracked on a small stack
+    so that unclosed or nested ``<tr>``/``<td>`` tags close the way
+    BeautifulSoup closes them: an end tag pops every element opened after
+    its matching start tag, and a cell belongs to every open row.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.links = []
+        self._stack = []           # open (tag, SurveyCell/row/None) pairs
+        self._tables_seen = 0
+        self._tbody_seen = False
+        self._skip_text = 0
+
+    def _open(self, kind):
+        """Return the objects of every open element of *kind*."""
+        return [obj for tag, obj in self._stack if tag == kind]
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            link = {name: value or "" for name, value in attrs}
+            self.links.append(link)
+            for cell in self._open("td"):
+                cell.links.append(link)
+        elif tag in _SKIPPED_TEXT:
+            self._skip_text += 1
+        elif tag == "table":
+            self._tables_seen += 1
+            if self._stack or self._tables_seen == 1:
+                self._stack.append(("table", None))
+        elif tag == "tbody" and self._stack:
+            # Only the first <tbody> of the first table holds survey rows
+            self._stack.append(("tbody", not self._tbody_seen))
+            self._tbody_seen = True
+        elif tag == "tr" and True in self._open("tbody"):
+            row = []
+            self.rows.append(row)
+            self._stack.append(("tr", row))
+        elif tag == "td" and self._open("tr"):
+            cell = SurveyCell()
+            for row in self._open("tr"):
+                row.append(cell)
+            self._stack.append(("td", cell))
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TEXT:
+            self._skip_text = max(0, self._skip_text - 1)
+            return
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data):
+        if self._skip_text:
+            return
+        for cell in self._open("td"):
+            cell.strings.append(data)
+
+
+def extract(html):
+    """Collect the survey rows and page links from *html* in one pass.
+
+    :param html: The raw HTML content of a survey page.
+    :type html: str
+    :returns: ``rows`` — one list of :class:`SurveyCell` per ``<tr>`` in
+        the first table's ``<tbody>`` — and ``links`` — the attribute dict
+        of every ``<a>`` on the page.
+    :rtype: SurveyDocument
+    """
+    parser = _SurveyTableParser()
+    parser.feed(html)
+    parser.close()
+    return SurveyDocument(parser.rows, parser.links)
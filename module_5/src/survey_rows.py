@@ -0,0 +1,215 @@
+"""
+Row parsers for GradCafe survey tables.
+
+A survey table interleaves three kinds of ``<tr>``: a five-cell main row
+(school, program, date, decision, link), an optional one-cell detail row
+(term, nationality, GPA, GRE scores, decision) and optional one-cell
+comment rows. :func:`build_results` groups them into one
+:class:`applicant_record.ApplicantRecord` per main row. The cells may be
+``bs4`` tags or :class:`survey_parser.SurveyCell` objects; both expose
+the same ``get_text``/``find`` interface.
+"""
+
+import re
+
+from applicant_record import ApplicantRecord
+
+
+def build_results(rows):
+    """Group main, detail, and comment rows into applicant records.
+
+    :param rows: The cells of each survey table row.
+    :type rows: list[list]
+    :rtype: list[applicant_record.ApplicantRecord]
+    """
+    results = []
+
+    current_result = None
+    for cells in rows:
+        if len(cells) == 5:
+            # Main data row - save previous result and start new one
+            if current_result:
+                results.append(current_result)
+            current_result = parse_main_row(cells)
+        elif len(cells) == 1 and current_result:
+            # This could be a detail row or a comment row
+            parse_detail_row(cells[0], current_result)
+
+    # Remember the last result
+    if current_result:
+        results.append(current_result)
+
+    return results
+
+
+def normalize_degree(degree):
+    """Map a degree label to ``"PhD"``, ``"Masters"``, or itself.
+
+    :param degree: Degree text, e.g. ``"PhD"``, ``"MS"`` or ``"Masters"``.
+    :type degree: str
+    :rtype: str
+    """
+    degree = degree.strip()
+    if "phd" in degree.lower():
+        return "PhD"
+    if ("master" in degree.lower()
+            or degree in ["MS", "MA", "MFA", "MBA", "MEng"]):
+        return "Masters"
+    return degree
+
+
+def parse_main_row(cells):
+    """Parse a main table row into an applicant record.
+
+    :param cells: The list of ``<td>`` elements from a main data row.
+    :type cells: list[bs4.element.Tag] or list[survey_parser.SurveyCell]
+    :returns: The parsed applicant fields.
+    :rtype: applicant_record.ApplicantRecord
+    """
+    # Cell 0: university name
+    school = cells[0].get_text(strip=True)
+
+    # Cell 1: program and degree (eg, "Physics | PhD")
+    program_cell = cells[1].get_text(separator=" | ", strip=True)
+    program_parts = program_cell.split(" | ")
+    program_name = program_parts[0] if program_parts else ""
+
+    # Combine school and program; GPA/GRE default to empty, and comments
+    # start as a list that collects multiple comment rows
+    result = ApplicantRecord(
+        program=f"{program_name}, {school}", school=school,
+        program_name=program_name, gpa="", gre_v="", gre_aw="", gre_q="",
+        gre="", comments=[])
+
+    # Extract degree from program cell
+    if len(program_parts) > 1:
+        result.degree = normalize_degree(program_parts[1])
+
+    # Cell 2: date added
+    date_text = cells[2].get_text(strip=True)
+    result.date_added = f"Added on {date_text}"
+
+    # Cell 3: decision/status
+    result.status = cells[3].get_text(strip=True)
+
+    # Cell 4: links - extract URL
+    link = cells[4].find("a", href=re.compile(r"/result/"))
+    if link:
+        href = link.get("href", "")
+        if href.startswith("/"):
+            result.url = f"https://www.thegradcafe.com{href}"
+        else:
+            result.url = href
+    return result
+
+_NATIONALITY_MAP = {
+    "international": ("US/International", "International"),
+    "american": ("US/International", "American"),
+}
+
+# One anchored pattern for every prefix-classified detail fragment,
+# matched against the lower-cased fragment. Alternatives are tried in
+# order, so the specific GRE sections win over the bare "gre" prefix.
+_DETAIL_PART_RE = re.compile(r"""
+    (?P<term>(?:fall|spring|summer|winter)\s+\d{4}$)
+  | (?P<nationality>(?:international|american)\Z)
+  | (?P<gpa>gpa\s+\d+(?:\.\d+)?$)
+  | (?P<gre_v>gre\ v)
+  | (?P<gre_aw>gre\ aw)
+  | (?P<gre_q>gre\ q)
+  | (?P<gre>gre)
+""", re.VERBOSE)
+
+_DETAIL_PART_FIELDS = {
+    "term": "term",
+    "gpa": "GPA",
+    "gre_v": "GRE V",
+    "gre_aw": "GRE AW",
+    "gre_q": "GRE Q",
+    "gre": "GRE",
+}
+
+_STATUS_RE = re.compile(r"accepted|rejected|interview|wait")
+
+
+def _classify_part(part):
+    """Classify a single pipe-separated part from a detail row.
+
+    :param part: A trimmed text fragment from the detail row.
+    :type part: str
+    :returns: ``(field_name, value)`` for structured data, or ``None``
+        if the part is unstructured (i.e. a comment fragment).
+    :rtype: tuple[str, str] or None
+    """
+    part_lower = part.lower()
+
+    match = _DETAIL_PART_RE.match(part_lower)
+    if match:
+        group = match.lastgroup
+        if group == "nationality":
+            return _NATIONALITY_MAP[part_lower]
+        return (_DETAIL_PART_FIELDS[group], part)
+
+    if len(part) < 50 and _STATUS_RE.search(part_lower):
+        return ("_status", part)
+    return None
+
+
+def parse_detail_row(cell, result):
+    """Parse a detail or comment row and update the result in place.
+
+    Handles two types of rows:
+
+    1. Detail rows containing structured data (GPA, GRE, status, etc.)
+    2. Comment rows containing free-form text.
+
+    :param cell: The single ``<td>`` element from the detail row.
+    :type cell: bs4.element.Tag or survey_parser.SurveyCell
+    :param result: The applicant record (or dict) to update.
+    :type result: applicant_record.ApplicantRecord or dict
+    """
+    text = cell.get_text(separator=" | ", strip=True)
+
+    # Skip empty cells
+    if not text:
+        return
+
+    parts = [p.strip() for p in text.split(" | ")]
+
+    found_structured_data = False
+    comment_parts = []
+
+    for part in parts:
+        classified = _classify_part(part)
+        if classified is None:
+            comment_parts.append(part)
+            continue
+
+        field, value = classified
+        if field == "_status":
+            if "status" not in result or not result["status"]:
+                result["status"] = value
+                found_structured_data = True
+        else:
+            result[field] = value
+            found_structured_data = True
+
+    # If we have comment parts, add them to the comments list
+    if comment_parts:
+        comment_text = " ".join(comment_parts)
+        result["comments"].append(comment_text)
+
+    # If this entire row had no structured data, it's a pure comment row
+    if not found_structured_data and text:
+        if text not in result["comments"]:
+            result["comments"].append(text)
+
+def finalize_comments(results):
+    """Convert comment lists to joined strings in place.
+
+    :param results: Applicant records or dicts.
+    :type results: list[applicant_record.ApplicantRecord] or list[dict]
+    """
+    for result in results:
+        if isinstance(result.get("comments"), list):
+            result["comments"] = " ".join(result["comments"]).strip()
@@ -0,0 +1,134 @@
+"""
+Reload ``applicants`` in a new table and rename it into place.
+
+:func:`swap_load` backs ``load_data.py --mode swap``: the rows are
+loaded into :data:`NEW_TABLE` while the dashboard keeps reading the old
+table, and one short transaction swaps the two. Rows written to
+``applicants`` during the load, such as those a ``/pull-data`` inserts,
+are not in the new table and are gone after the swap.
+"""
+import logging
+
+from psycopg import sql
+
+from applicant_rows import column_defs
+from query_data import MAX_QUERY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+#: Table a ``--mode swap`` load fills before it replaces ``applicants``.
+NEW_TABLE = "applicants_new"
+
+#: Name the replaced ``applicants`` has from the swap until it is dropped.
+OLD_TABLE = "applicants_old"
+
+#: Longest the swap waits for its lock on ``applicants``. New queries
+#: queue behind a waiting ``ACCESS EXCLUSIVE`` lock, so the wait is kept
+#: short; on timeout the load fails and ``applicants`` is unchanged.
+SWAP_LOCK_TIMEOUT = "5s"
+
+# Objects named after their table, renamed with it: (kind, name suffix)
+_TABLE_OBJECTS = (("INDEX", "pkey"), ("INDEX", "url_key"),
+                  ("SEQUENCE", "p_id_seq"))
+
+# Privileges _copy_grants may repeat on the new table and sequence
+_GRANTABLE = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "TRUNCATE",
+                        "REFERENCES", "TRIGGER", "USAGE"))
+
+
+def _create_new_table(cur):
+    """(Re)create :data:`NEW_TABLE` unlogged and without indexes.
+
+    A leftover :data:`OLD_TABLE` from an interrupted swap is dropped too.
+    """
+    for name in (NEW_TABLE, OLD_TABLE):
+        cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(
+            sql.Identifier(name)))
+    cur.execute(sql.SQL("CREATE UNLOGGED TABLE {} ({})").format(
+        sql.Identifier(NEW_TABLE), column_defs(constraints=False)))
+
+
+def _finish_new_table(cur):
+    """Make the loaded :data:`NEW_TABLE` logged, indexed and analyzed."""
+    table = sql.Identifier(NEW_TABLE)
+    cur.execute(sql.SQL("ALTER TABLE {} SET LOGGED").format(table))
+    for suffix, constraint, column in (("pkey", "PRIMARY KEY", "p_id"),
+                                       ("url_key", "UNIQUE", "url")):
+        cur.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {} ({})").format(
+            table, sql.Identifier(f"{NEW_TABLE}_{suffix}"),
+            sql.SQL(constraint), sql.Identifier(column)))
+    cur.execute(sql.SQL("ANALYZE {}").format(table))
+
+
+def _copy_grants(cur, source, target):
+    """Grant on *target* what other roles hold on *source*.
+
+    The table and its ``p_id`` sequence are both covered, so
+    ``app_user`` keeps its access across a swap. Nothing is granted when
+    *source* does not exist.
+    """
+    query = sql.SQL(
+        "SELECT pg_get_userbyid({acl}.grantee), {acl}.privilege_type "
+        "FROM pg_class AS {rel}, aclexplode({rel}.relacl) AS {acl} "
+        "WHERE {rel}.oid = to_regclass(%s) "
+        "AND {acl}.grantee NOT IN (0, {rel}.relowner) LIMIT %s"
+    ).format(acl=sql.Identifier("acl"), rel=sql.Identifier("rel"))
+    for kind, suffix in (("TABLE", ""), ("SEQUENCE", "_p_id_seq")):
+        cur.execute(query, (source + suffix, MAX_QUERY_LIMIT))
+        for grantee, privilege in cur.fetchall():
+            if privilege not in _GRANTABLE:
+                continue
+            cur.execute(sql.SQL("GRANT {} ON {} {} TO {}").format(
+                sql.SQL(privilege), sql.SQL(kind),
+                sql.Identifier(target + suffix), sql.Identifier(grantee)))
+
+
+def _rename_table(cur, old, new, if_exists=False):
+    """Rename table *old* to *new* along with its index and sequence names."""
+    exists = sql.SQL(" IF EXISTS" if if_exists else "")
+    cur.execute(sql.SQL("ALTER TABLE{} {} RENAME TO {}").format(
+        exists, sql.Identifier(old), sql.Identifier(new)))
+    for kind, suffix in _TABLE_OBJECTS:
+        cur.execute(sql.SQL("ALTER {}{} {} RENAME TO {}").format(
+            sql.SQL(kind), exists, sql.Identifier(f"{old}_{suffix}"),
+            sql.Identifier(f"{new}_{suffix}")))
+
+
+def swap_load(conn, load):
+    """Reload ``applicants`` in a new table and swap it into place.
+
+    *load* fills the unlogged, index-free :data:`NEW_TABLE` while
+    readers keep querying the current ``applicants``. The new table is
+    then set logged, indexed and analyzed. One short transaction renames
+    ``applicants`` to :data:`OLD_TABLE` and the new table to
+    ``applicants``; :data:`OLD_TABLE` is dropped after it commits.
+    Readers see either the old rows or the new ones, never a partial
+    table. Privileges other roles held on ``applicants`` are granted on
+    the new table first.
+
+    :param conn: An autocommit database connection.
+    :type conn: psycopg.Connection
+    :param load: Called with the name of the table to fill; returns the
+        number of rows loaded.
+    :type load: collections.abc.Callable[[str], int]
+    :returns: The value returned by *load*.
+    :rtype: int
+    """
+    cur = conn.cursor()
+    _create_new_table(cur)
+    try:
+        loaded = load(NEW_TABLE)
+        _finish_new_table(cur)
+        with conn.transaction():
+            cur.execute(sql.SQL("SELECT set_config('lock_timeout', %s, true)"),
+                        (SWAP_LOCK_TIMEOUT,))
+            _copy_grants(cur, "applicants", NEW_TABLE)
+            _rename_table(cur, "applicants", OLD_TABLE, if_exists=True)
+            _rename_table(cur, NEW_TABLE, "applicants")
+    finally:
+        cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(
+            sql.Identifier(NEW_TABLE)))
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(
+        sql.Identifier(OLD_TABLE)))
+    logger.info("Swapped the reloaded table into 'applicants'")
+    return loaded
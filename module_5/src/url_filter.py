@@ -0,0 +1,119 @@
+"""
+In-memory Bloom filter of the result URLs stored in ``applicants``.
+
+``/pull-data`` looks up each scraped page's URLs in one query before
+inserting anything, and only sends the rows it does not find to the
+``INSERT``. A :class:`UrlFilter` in front of that lookup answers
+"definitely not stored" without a round trip, so only URLs the filter
+may contain are looked up. A false positive costs one lookup. A URL
+stored by another process after :meth:`UrlFilter.warm` is a false
+negative: its row reaches the ``INSERT``, whose ``ON CONFLICT (url) DO
+NOTHING`` still drops it, and is then added to the filter. The filter
+is best-effort, so the boundary search never trusts its negatives.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+
+from psycopg import sql
+
+from query_data import MAX_QUERY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+#: Number of URLs the filter is sized for at its error rate.
+DEFAULT_CAPACITY = 200_000
+
+#: Chance that a URL never added is reported as present.
+DEFAULT_ERROR_RATE = 0.01
+
+
+class UrlFilter:
+    """Bloom filter over URL strings.
+
+    The bit array and hash count are sized from *capacity* and
+    *error_rate*; adding more URLs than *capacity* raises the error rate
+    but never causes a false negative.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY,
+                 error_rate=DEFAULT_ERROR_RATE):
+        """Create an empty filter.
+
+        :param capacity: Expected number of URLs.
+        :type capacity: int
+        :param error_rate: Target false-positive rate, between 0 and 1.
+        :type error_rate: float
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    def _positions(self, url):
+        """Return the bit positions of *url* (double hashing)."""
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, url):
+        """Add *url* to the filter.
+
+        :type url: str
+        """
+        positions = self._positions(url)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, url):
+        return all(self._bits[position >> 3] >> (position & 7) & 1
+                   for position in self._positions(url))
+
+    def warm(self, conn, batch_size=MAX_QUERY_LIMIT):
+        """Add every URL stored in ``applicants``, once per filter.
+
+        Rows are read in ``p_id`` order with keyset pagination. Later
+        calls return at once; a call that fails leaves the filter
+        unwarmed, so the next one starts over.
+
+        :param conn: An open database connection.
+        :type conn: psycopg.Connection
+        :param batch_size: URLs per query, at most
+            :data:`query_data.MAX_QUERY_LIMIT`.
+        :type batch_size: int
+        :returns: The number of URLs added by this call.
+        :rtype: int
+        """
+        if self.warmed:
+            return 0
+        query = sql.SQL(
+            "SELECT {p_id}, {url} FROM {table} "
+            "WHERE {p_id} > %s AND {url} <> '' ORDER BY {p_id} LIMIT %s"
+        ).format(
+            p_id=sql.Identifier("p_id"),
+            url=sql.Identifier("url"),
+            table=sql.Identifier("applicants"),
+        )
+        batch_size = max(1, min(batch_size, MAX_QUERY_LIMIT))
+        cur = conn.cursor()
+        last_id = 0
+        count = 0
+        while True:
+            cur.execute(query, (last_id, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            for _, url in rows:
+                self.add(url)
+            last_id = rows[-1][0]
+            count += len(rows)
+        self.warmed = True
+        logger.info("URL filter warmed with %d stored URLs", count)
+        return count
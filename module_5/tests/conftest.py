@@ -88,6 +88,36 @@ class FakeResponse:
         pass
 
 
+class FakeHttpResponse:
+    """Stub for ``http_session.HttpResponse`` returned by ``HttpSession.get``."""
+    def __init__(self, body, status=200, headers=None):
+        self.status = status
+        self.reason = "OK" if status < 400 else "Error"
+        self.headers = headers or {}
+        self.body = body.encode("utf-8")
+
+
+class FakeSession:
+    """Stub for ``http_session.HttpSession`` serving the same HTML for every URL."""
+    def __init__(self, html, status=200):
+        self._html = html
+        self._status = status
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url, headers))
+        return FakeHttpResponse(self._html, self._status)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
 class NoCloseConn:
     """Wraps a real connection for both context-manager and direct usage.
 
@@ -131,6 +161,9 @@ class FakeCursor:
     def execute(self, *args, **kwargs):
         pass
 
+    def fetchall(self):
+        return []
+
 
 class FakeInsertCursor:
     """Cursor stub that reports ``rowcount=1`` (successful insert)."""
@@ -139,6 +172,9 @@ class FakeInsertCursor:
     def execute(self, *args, **kwargs):
         pass
 
+    def fetchall(self):
+        return []
+
 
 class FakePullConn:
     """Connection stub returning ``FakeCursor`` (rowcount=0)."""
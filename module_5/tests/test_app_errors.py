@@ -1,6 +1,8 @@
 """Tests for app.py error handling paths."""
 
+import time
 import uuid
+from http.client import IncompleteRead
 from urllib.error import URLError
 
 import pytest
@@ -9,6 +11,7 @@ from psycopg import OperationalError
 
 import app as app_module
 import scrape
+from scrape import ParsedPage
 from conftest import FakeResponse, FakePullConn, FakeInsertConn, NoCloseConn
 
 
@@ -41,8 +44,7 @@ def test_pull_data_invalid_max_pages_defaults(monkeypatch):
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakePullConn())
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([], 1))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -81,6 +83,7 @@ def test_pull_data_network_error_500(monkeypatch):
         app_module, "fetch_page",
         lambda url, *a, **kw: (_ for _ in ()).throw(URLError("timeout")),
     )
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -89,6 +92,35 @@ def test_pull_data_network_error_500(monkeypatch):
     assert "Network error" in resp.get_json()["error"]
 
 
+@pytest.mark.buttons
+def test_pull_data_incomplete_read_rolls_back_500(monkeypatch):
+    class _Conn(FakePullConn):
+        rolled_back = closed = False
+
+        def rollback(self):
+            self.rolled_back = True
+
+        def close(self):
+            self.closed = True
+
+    conn = _Conn()
+    monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: conn)
+    monkeypatch.setattr(
+        app_module, "fetch_page",
+        lambda url, *a, **kw: (_ for _ in ()).throw(
+            IncompleteRead(b"<html>", 4096)),
+    )
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
+
+    test_app = app_module.create_app(testing=True)
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"max_pages": 1})
+    assert resp.status_code == 500
+    assert resp.get_json()["error"] == "Network error during scrape"
+    assert conn.rolled_back and conn.closed
+
+
 # =====================================================================
 # POST /pull-data — DB error during scrape returns 500
 # =====================================================================
@@ -116,8 +148,7 @@ def test_pull_data_db_error_during_scrape_500(monkeypatch):
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _ErrorConn())
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [{"url": "x", "program": "y", "comments": "z"}])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([{"url": "x", "program": "y", "comments": "z"}], 1))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -154,8 +185,7 @@ def test_pull_data_comments_list_joined(monkeypatch):
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [fake_row])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([fake_row], 1))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -189,8 +219,7 @@ def test_pull_data_cleanup_message_unit(monkeypatch):
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [fake_row])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([fake_row], 1))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -221,7 +250,7 @@ def test_pull_data_cleanup_message_with_counts(db_conn, monkeypatch):
 
     wrapper = NoCloseConn(conn)
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: wrapper)
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(html))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(html))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -253,6 +282,8 @@ def test_pull_data_caught_up_breaks(monkeypatch):
         rowcount = 0  # All inserts are duplicates
         def execute(self, *a, **kw):
             pass
+        def fetchall(self):
+            return [("u",)]  # Every URL is already stored
 
     class _DupConn:
         autocommit = True
@@ -270,8 +301,7 @@ def test_pull_data_caught_up_breaks(monkeypatch):
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _DupConn())
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 2)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [{"url": "u", "program": "p", "comments": "c"}])
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([{"url": "u", "program": "p", "comments": "c"}], 2))
     monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
 
     test_app = app_module.create_app(testing=True)
@@ -312,6 +342,8 @@ def test_pull_data_fetches_multiple_pages(monkeypatch):
         rowcount = 1
         def execute(self, *a, **kw):
             pass
+        def fetchall(self):
+            return []
 
     class _InsertConn:
         autocommit = True
@@ -329,8 +361,7 @@ def test_pull_data_fetches_multiple_pages(monkeypatch):
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _InsertConn())
     monkeypatch.setattr(app_module, "fetch_page", _fake_fetch)
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 2)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [{"url": f"u{call_n['n']}", "program": "p", "comments": "c"}])
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([{"url": f"u{call_n['n']}", "program": "p", "comments": "c"}], 2))
     monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
 
     test_app = app_module.create_app(testing=True)
@@ -367,6 +398,8 @@ def test_pull_data_network_error_page2_rolls_back(monkeypatch):
         rowcount = 1
         def execute(self, *a, **kw):
             pass
+        def fetchall(self):
+            return []
 
     class _TrackConn:
         autocommit = True
@@ -387,8 +420,7 @@ def test_pull_data_network_error_page2_rolls_back(monkeypatch):
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _TrackConn())
     monkeypatch.setattr(app_module, "fetch_page", _fake_fetch)
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 2)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [{"url": "u", "program": "p", "comments": "c"}])
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([{"url": "u", "program": "p", "comments": "c"}], 2))
     monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
 
     test_app = app_module.create_app(testing=True)
@@ -418,6 +450,8 @@ def test_pull_data_cleanup_error_returns_500(monkeypatch):
         rowcount = 1
         def execute(self, *a, **kw):
             pass
+        def fetchall(self):
+            return []
 
     class _CleanConn:
         autocommit = True
@@ -439,8 +473,7 @@ def test_pull_data_cleanup_error_returns_500(monkeypatch):
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _CleanConn())
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [{"url": "u", "program": "p", "comments": "c"}])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([{"url": "u", "program": "p", "comments": "c"}], 1))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
@@ -472,6 +505,8 @@ def test_pull_data_insert_error_rolls_back(monkeypatch):
             _BombCursor._call_count += 1
             if _BombCursor._call_count >= 3:
                 raise psycopg.Error("disk full on 3rd execute")
+        def fetchall(self):
+            return []
 
     class _BombConn:
         autocommit = True
@@ -493,16 +528,495 @@ def test_pull_data_insert_error_rolls_back(monkeypatch):
     monkeypatch.setattr(app_module, "run_queries", lambda _c: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _BombConn())
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([
         {"url": "u1", "program": "p", "comments": "c"},
         {"url": "u2", "program": "p", "comments": "c"},
         {"url": "u3", "program": "p", "comments": "c"},
-    ])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    ], 1))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as c:
         resp = c.post("/pull-data", json={"max_pages": 1})
     assert resp.status_code == 500
     assert "Database error" in resp.get_json()["error"]
-    assert _BombConn.rolled_back is True
\ No newline at end of file
+    assert _BombConn.rolled_back is True
+
+# =====================================================================
+# POST /pull-data — shared keep-alive session
+# =====================================================================
+
+@pytest.mark.buttons
+def test_pull_data_passes_http_session_to_fetch(monkeypatch):
+    seen = []
+    session = object()
+
+    def _fake_fetch(url, *a, **kw):
+        seen.append(kw.get("session"))
+        return "<html></html>"
+
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakePullConn())
+    monkeypatch.setattr(app_module, "fetch_page", _fake_fetch)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([], 1))
+
+    test_app = app_module.create_app(
+        testing=True,
+        resources=app_module.PullResources(http_session=session))
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"max_pages": 1})
+    assert resp.status_code == 200
+    assert seen == [session]
+
+
+@pytest.mark.buttons
+def test_pull_data_parses_each_page_once(monkeypatch):
+    parsed = []
+
+    def _fake_parse_page(html):
+        parsed.append(html)
+        return ParsedPage([{"url": html, "program": "p", "comments": "c"}], 2)
+
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
+
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=lambda url: url,
+        parse_page_fn=_fake_parse_page)
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"max_pages": 5})
+    assert resp.get_json()["pages_fetched"] == 2
+    assert parsed == ["https://www.thegradcafe.com/survey/",
+                      "https://www.thegradcafe.com/survey/?page=2"]
+
+
+@pytest.mark.buttons
+def test_pull_data_backs_off_and_reports_pacing(monkeypatch):
+    import rate_limiter
+
+    clock = type("Clock", (), {"now": 0.0, "monotonic": lambda self: self.now})()
+    sleeps = []
+
+    def _slow_page_two(url):
+        clock.now += 5.0 if url.endswith("page=2") else 0.1
+        return url
+
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(sleeps.append)})())
+
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=_slow_page_two,
+        parse_page_fn=lambda html: ParsedPage(
+            [{"url": html, "program": "p", "comments": "c"}], 3))
+    with test_app.test_client() as c:
+        pacing = c.post("/pull-data", json={"max_pages": 3}).get_json()["pacing"]
+    # Page 1's 0.1s fetch counts toward the 0.5s gap; the slow page 2
+    # doubles the interval but has already used up the wait for page 3
+    assert sleeps == [0, pytest.approx(0.4), 0]
+    assert (pacing["requests"], pacing["backoff"]) == (3, 1)
+    assert pacing["interval"] == 1.0
+
+
+@pytest.mark.buttons
+def test_pull_data_books_requests_in_shared_lock_file(monkeypatch, tmp_path):
+    lock_path = tmp_path / "rate.lock"
+    monkeypatch.setenv("SCRAPE_RATE_LOCK", str(lock_path))
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda s: None)})())
+
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=lambda url: url,
+        parse_page_fn=lambda html: ParsedPage([], 2))
+    with test_app.test_client() as c:
+        assert c.post("/pull-data", json={"max_pages": 2}).status_code == 200
+    # The next shared slot lies ahead, so other workers queue behind it
+    assert float(lock_path.read_text().split()[-1]) > time.time()
+
+
+class _StubRobotsCache:
+    """RobotsCache stand-in returning a fixed policy."""
+    def __init__(self, allowed=True, crawl_delay=None, fetch_error=None):
+        self.allowed = allowed
+        self.crawl_delay = crawl_delay
+        self.fetch_error = fetch_error
+        self.calls = []
+
+    def get(self, url, user_agent, session):
+        self.calls.append((url, session))
+        return self
+
+    def can_fetch(self, url):
+        return self.allowed
+
+    def get_crawl_delay(self, default):
+        return self.crawl_delay if self.crawl_delay is not None else default
+
+
+@pytest.mark.buttons
+def test_pull_data_refused_by_robots_txt(monkeypatch):
+    monkeypatch.setattr(app_module.psycopg, "connect",
+                        lambda **kw: pytest.fail("must not connect"))
+    test_app = app_module.create_app(
+        testing=True, resources=app_module.PullResources(
+            robots_cache=_StubRobotsCache(allowed=False)))
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"max_pages": 1})
+    assert resp.status_code == 403
+    assert "robots.txt" in resp.get_json()["error"]
+
+
+@pytest.mark.buttons
+def test_pull_data_unreadable_robots_txt_is_unavailable(monkeypatch):
+    monkeypatch.setattr(app_module.psycopg, "connect",
+                        lambda **kw: pytest.fail("must not connect"))
+    test_app = app_module.create_app(
+        testing=True, resources=app_module.PullResources(
+            robots_cache=_StubRobotsCache(
+                allowed=False, fetch_error="connection refused")))
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"max_pages": 1})
+    assert resp.status_code == 503
+    assert resp.get_json() == {"error": "robots.txt unavailable",
+                               "cause": "connection refused"}
+
+
+@pytest.mark.buttons
+def test_pull_data_honours_robots_crawl_delay(monkeypatch):
+    session = object()
+    robots = _StubRobotsCache(crawl_delay=2.0)
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakePullConn())
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([], 1))
+
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=lambda url: "",
+        resources=app_module.PullResources(http_session=session,
+                                           robots_cache=robots))
+    with test_app.test_client() as c:
+        pacing = c.post("/pull-data", json={"max_pages": 1}).get_json()["pacing"]
+    assert pacing["interval"] == 2.0
+    assert robots.calls == [("https://www.thegradcafe.com/survey/", session)]
+
+
+@pytest.mark.buttons
+def test_pull_data_retries_transient_errors_and_reports(monkeypatch):
+    calls = []
+    sleeps = []
+
+    def _flaky_fetch(url):
+        calls.append(url)
+        if len(calls) == 1:
+            raise TimeoutError("read timed out")
+        return url
+
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(sleeps.append)})())
+
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=_flaky_fetch,
+        parse_page_fn=lambda html: ParsedPage(
+            [{"url": html, "program": "p", "comments": "c"}], 1))
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={"max_pages": 1}).get_json()
+    base = "https://www.thegradcafe.com/survey/"
+    assert calls == [base, base]
+    assert len(sleeps) == 2 and sleeps[1] > 0
+    assert body["report"]["retried"] == {base: 1}
+    assert body["report"]["failed"] == {}
+
+
+@pytest.mark.buttons
+def test_pull_data_timeout_after_retries_rolls_back(monkeypatch):
+    conn = FakePullConn()
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: conn)
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
+
+    def _hung_fetch(url):
+        raise TimeoutError("read timed out")
+
+    test_app = app_module.create_app(testing=True, fetch_page_fn=_hung_fetch)
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"max_pages": 1})
+    assert resp.status_code == 500
+    report = resp.get_json()["report"]
+    assert report["retries"] == 2
+    assert report["failed"] == {
+        "https://www.thegradcafe.com/survey/": "read timed out"}
+
+
+@pytest.mark.buttons
+def test_pull_data_enriches_inserted_rows(monkeypatch):
+    import rate_limiter
+
+    updates = []
+
+    class _Cursor:
+        rowcount = 1
+
+        def execute(self, *args, **kwargs):
+            pass
+
+        def fetchall(self):
+            return []
+
+        def executemany(self, query, params_list):
+            updates.extend(params_list)
+
+    class _Conn(FakeInsertConn):
+        def cursor(self):
+            return _Cursor()
+
+    detail = "<dl><dt>Undergrad GPA</dt><dd>3.9</dd></dl>"
+    robots = _StubRobotsCache()
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _Conn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+
+    test_app = app_module.create_app(
+        testing=True,
+        resources=app_module.PullResources(robots_cache=robots),
+        fetch_page_fn=lambda url: detail if "/result/" in url else url,
+        parse_page_fn=lambda html: ParsedPage(
+            [{"url": "https://www.thegradcafe.com/result/1", "program": "p"},
+             {"url": "", "program": "no link"}], 1))
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={"max_pages": 1, "enrich": True}).get_json()
+    assert body["enriched"] == 1
+    assert [(u["url"], u["gpa"]) for u in updates] == [
+        ("https://www.thegradcafe.com/result/1", 3.9)]
+    assert body["report"]["fetched"] == 2
+    # The survey robots.txt answer is reused for the enrichment fetches.
+    assert len(robots.calls) == 1
+
+
+@pytest.mark.buttons
+def test_pull_data_without_enrich_skips_result_pages(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
+
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=lambda url: fetched.append(url) or url,
+        parse_page_fn=lambda html: ParsedPage(
+            [{"url": "https://www.thegradcafe.com/result/1", "program": "p"}], 1))
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={"max_pages": 1}).get_json()
+    assert body["enriched"] == 0
+    assert fetched == ["https://www.thegradcafe.com/survey/"]
+
+
+# =====================================================================
+# POST /pull-data — boundary search ("search": true)
+# =====================================================================
+
+@pytest.mark.buttons
+def test_find_boundary_probes_exponentially_then_bisects():
+    probes = []
+
+    def _is_known(page_num):
+        probes.append(page_num)
+        return page_num >= 37
+
+    assert app_module._find_boundary(_is_known, 500) == 37
+    assert probes == [1, 2, 4, 8, 16, 32, 64, 48, 40, 36, 38, 37]
+
+
+@pytest.mark.buttons
+def test_find_boundary_without_known_pages_returns_last_page():
+    probes = []
+    assert app_module._find_boundary(
+        lambda n: probes.append(n) or False, 10) == 10
+    assert probes == [1, 2, 4, 8, 9]
+    assert app_module._find_boundary(lambda n: False, 1) == 1
+    assert app_module._find_boundary(lambda n: True, 10) == 1
+
+
+class _SearchCursor:
+    """Cursor over an in-memory set of stored URLs."""
+    def __init__(self, stored):
+        self.stored = stored
+        self.lookups = 0
+        self.rowcount = 0
+        self._found = []
+
+    def execute(self, query, params):
+        if isinstance(params, dict):
+            self.rowcount = int(params["url"] not in self.stored)
+            self.stored.add(params["url"])
+        else:
+            self.lookups += 1
+            self._found = [(u,) for u in params[0] if u in self.stored]
+
+    def fetchall(self):
+        return self._found
+
+
+def _search_app(monkeypatch, cur, page_rows, max_page, resources=None):
+    fetched = []
+
+    class _Conn(FakeInsertConn):
+        def cursor(self):
+            return cur
+
+    def _parse(url):
+        page_num = int(url.split("=")[1]) if "=" in url else 1
+        return ParsedPage(page_rows(page_num), max_page)
+
+    monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
+    monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _Conn())
+    monkeypatch.setattr(app_module, "time", type("T", (), {"sleep": staticmethod(lambda d: None)})())
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=lambda url: fetched.append(url) or url,
+        parse_page_fn=_parse, resources=resources)
+    return test_app, fetched
+
+
+@pytest.mark.buttons
+def test_pull_data_search_fetches_only_new_pages(monkeypatch):
+    # Pages 1-5 are new; page 6 starts with a new entry, then stored ones
+    stored = {f"/result/{n}-{s}" for n in range(7, 21) for s in "ab"}
+    stored.add("/result/6-b")
+    cur = _SearchCursor(stored)
+    test_app, fetched = _search_app(
+        monkeypatch, cur,
+        lambda n: [{"url": f"/result/{n}-{s}", "program": "p",
+                    "comments": ["c"]} for s in "ab"], 20)
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={"max_pages": 20,
+                                          "search": True}).get_json()
+
+    pages = sorted(int(u.split("=")[1]) if "=" in u else 1 for u in fetched)
+    assert pages == [1, 2, 3, 4, 5, 6, 8]
+    # Six probes, then one prefilter lookup for the boundary page
+    assert cur.lookups == 7
+    assert (body["pages_fetched"], body["scraped"], body["inserted"]) == (
+        7, 12, 11)
+
+
+@pytest.mark.buttons
+def test_pull_data_search_stops_at_an_empty_page(monkeypatch):
+    cur = _SearchCursor(set())
+    test_app, fetched = _search_app(
+        monkeypatch, cur,
+        lambda n: [{"url": "", "program": "p"}] if n < 3 else [], 8)
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={"search": True}).get_json()
+    # Probes 1, 2, 4 and then 3; an empty URL can only be stored once
+    assert (body["pages_fetched"], body["scraped"], body["inserted"]) == (
+        4, 2, 1)
+    assert cur.lookups == 0
+
+
+@pytest.mark.buttons
+def test_pull_data_search_network_error_rolls_back(monkeypatch):
+    rolled_back = []
+    cur = _SearchCursor(set())
+    _search_app(monkeypatch, cur, lambda n: [], 4)
+
+    class _Conn(FakeInsertConn):
+        def cursor(self):
+            return cur
+
+        def rollback(self):
+            rolled_back.append(True)
+
+    def _fetch(url):
+        if url.endswith("=3"):
+            raise URLError("connection reset")
+        return url
+
+    monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: _Conn())
+    monkeypatch.setattr(app_module.RetryPolicy, "wrap",
+                        lambda self, fetch, report, wait: fetch)
+    test_app = app_module.create_app(
+        testing=True, fetch_page_fn=_fetch,
+        parse_page_fn=lambda url: ParsedPage(
+            [{"url": url, "program": "p"}], 4))
+    with test_app.test_client() as c:
+        resp = c.post("/pull-data", json={"search": True})
+    assert resp.status_code == 500
+    assert rolled_back
+
+
+@pytest.mark.buttons
+def test_pull_data_url_filter_spares_lookups_for_new_pages(monkeypatch):
+    from url_filter import UrlFilter
+
+    url_filter = UrlFilter(capacity=100)
+    url_filter.warmed = True
+    url_filter.add("/result/1-b")
+    cur = _SearchCursor({"/result/1-b"})
+    _search_app(monkeypatch, cur, lambda n: [], 1)
+    test_app = app_module.create_app(
+        testing=True,
+        resources=app_module.PullResources(url_filter=url_filter),
+        fetch_page_fn=lambda url: url,
+        parse_page_fn=lambda url: ParsedPage(
+            [{"url": f"/result/{n}-{s}", "program": "p"}
+             for n in (2, 1) for s in "ab"], 1))
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={}).get_json()
+    # Only /result/1-b might be stored, so it is the only URL looked up
+    # and never reaches the INSERT
+    assert cur.lookups == 1
+    assert (body["scraped"], body["inserted"]) == (4, 3)
+    assert "/result/2-a" in url_filter
+
+
+@pytest.mark.buttons
+def test_pull_data_url_filter_learns_urls_stored_elsewhere(monkeypatch):
+    from url_filter import UrlFilter
+
+    # Warmed before another process stored /result/1-a
+    url_filter = UrlFilter(capacity=100)
+    url_filter.warmed = True
+    cur = _SearchCursor({"/result/1-a"})
+    _search_app(monkeypatch, cur, lambda n: [], 1)
+    test_app = app_module.create_app(
+        testing=True,
+        resources=app_module.PullResources(url_filter=url_filter),
+        fetch_page_fn=lambda url: url,
+        parse_page_fn=lambda url: ParsedPage(
+            [{"url": "/result/1-a", "program": "p"}], 1))
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={}).get_json()
+    # The filter skipped the lookup, ON CONFLICT rejected the row and
+    # the filter now knows the URL
+    assert (cur.lookups, body["inserted"]) == (0, 0)
+    assert "/result/1-a" in url_filter
+
+
+@pytest.mark.buttons
+def test_pull_data_search_ignores_url_filter_misses(monkeypatch):
+    from url_filter import UrlFilter
+
+    url_filter = UrlFilter(capacity=100)
+    url_filter.warmed = True
+    stored = {f"/result/{n}-{s}" for n in range(3, 9) for s in "ab"}
+    cur = _SearchCursor(stored)
+    test_app, _ = _search_app(
+        monkeypatch, cur,
+        lambda n: [{"url": f"/result/{n}-{s}", "program": "p"}
+                   for s in "ab"], 8,
+        resources=app_module.PullResources(url_filter=url_filter))
+    with test_app.test_client() as c:
+        body = c.post("/pull-data", json={"search": True}).get_json()
+    # The probes (1, 2, 4, then 3) ask the database despite the filter
+    # missing every stored URL, and the filter learns the URLs found
+    assert (body["pages_fetched"], body["inserted"]) == (4, 4)
+    assert "/result/4-a" in url_filter
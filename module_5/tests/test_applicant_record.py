@@ -0,0 +1,122 @@
+"""Tests for applicant_record — the slotted applicant row type."""
+
+import json
+import pickle
+
+import pytest
+
+from applicant_record import FIELDS, ApplicantRecord, json_default
+from applicant_rows import build_scraped_params
+
+
+def _record():
+    return ApplicantRecord(program="Physics, MIT", school="MIT",
+                           program_name="Physics", gre_v="GRE V 160",
+                           comments="")
+
+
+@pytest.mark.web
+def test_item_access_uses_json_keys():
+    record = _record()
+    assert record["GRE V"] == "GRE V 160"
+    assert record.gre_v == "GRE V 160"
+    record["US/International"] = "American"
+    assert record.us_or_international == "American"
+    assert record.get("GPA") is None
+    assert "GPA" not in record
+    assert "comments" in record
+
+
+@pytest.mark.web
+def test_absent_fields_are_left_out_of_the_mapping():
+    record = _record()
+    assert list(record) == ["program", "school", "program_name", "GRE V",
+                            "comments"]
+    assert len(record) == 5
+    assert record == {"program": "Physics, MIT", "school": "MIT",
+                      "program_name": "Physics", "GRE V": "GRE V 160",
+                      "comments": ""}
+    with pytest.raises(KeyError):
+        record["url"]  # pylint: disable=pointless-statement
+
+
+@pytest.mark.web
+def test_delete_makes_a_field_absent():
+    record = _record()
+    del record["GRE V"]
+    assert record.gre_v is None
+    with pytest.raises(KeyError):
+        del record["GRE V"]
+
+
+@pytest.mark.web
+def test_unknown_names_are_rejected():
+    with pytest.raises(TypeError, match="favourite_colour"):
+        ApplicantRecord(favourite_colour="blue")
+    with pytest.raises(KeyError):
+        _record()["favourite colour"] = "blue"
+
+
+@pytest.mark.web
+def test_records_have_no_instance_dict():
+    assert not hasattr(_record(), "__dict__")
+    assert len(ApplicantRecord.__slots__) == len(FIELDS)
+
+
+@pytest.mark.web
+def test_json_round_trip_drops_unknown_keys():
+    line = json.dumps({"program": "Physics, MIT", "GPA": "GPA 3.9",
+                       "extra": 1})
+    record = ApplicantRecord.from_json(line)
+    assert record.to_dict() == {"program": "Physics, MIT", "GPA": "GPA 3.9"}
+    assert ApplicantRecord.from_json(record.to_json()) == record
+    assert repr(record) == ("ApplicantRecord({'program': 'Physics, MIT', "
+                            "'GPA': 'GPA 3.9'})")
+
+
+@pytest.mark.web
+def test_unknown_input_keys_are_logged_once(caplog):
+    with caplog.at_level("WARNING", logger="applicant_record"):
+        for _ in range(3):
+            ApplicantRecord.from_dict({"program": "x", "rank_2027": 1})
+    assert caplog.text.count("rank_2027") == 1
+    record = ApplicantRecord.from_dict({"program": "x"})
+    with pytest.raises(KeyError):
+        record["rank_2027"] = 1
+    with pytest.raises(AttributeError):
+        record.rank_2027 = 1
+
+
+@pytest.mark.web
+def test_json_default_serializes_records_only():
+    assert json.loads(json.dumps([_record()], default=json_default)) == [
+        _record().to_dict()]
+    with pytest.raises(TypeError, match="set"):
+        json.dumps({1, 2}, default=json_default)
+
+
+@pytest.mark.web
+def test_records_pickle_for_worker_processes():
+    record = _record()
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+@pytest.mark.web
+def test_scraped_params_leave_missing_llm_names_empty():
+    params = build_scraped_params(_record())
+    assert (params["llm_program"], params["llm_university"]) == ("", "")
+
+
+@pytest.mark.web
+def test_scraped_params_fall_back_to_scraped_names():
+    params = build_scraped_params(_record(), name_fallback=True)
+    assert (params["llm_program"], params["llm_university"]) == (
+        "Physics", "MIT")
+    record = _record()
+    record["llm-generated-program"] = "Physics (LLM)"
+    record["llm-generated-university"] = ""
+    params = build_scraped_params(record, name_fallback=True)
+    assert (params["llm_program"], params["llm_university"]) == (
+        "Physics (LLM)", "")
+    assert params["gre_v"] == 160.0
+    assert params["gpa"] is None
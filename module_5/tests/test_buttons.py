@@ -9,6 +9,7 @@ import os
 import pytest
 
 from conftest import FakePullConn, FakeInsertConn
+from scrape import ParsedPage
 
 
 def _patch_pull_data(monkeypatch):
@@ -21,8 +22,7 @@ def _patch_pull_data(monkeypatch):
     monkeypatch.setattr(app_module, "fix_uc_universities", lambda _conn: 0)
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakePullConn())
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([], 1))
 
 
 # ---- POST /pull-data ----
@@ -75,8 +75,7 @@ def test_pull_data_triggers_loader_with_scraped_rows(client, monkeypatch):
     monkeypatch.setattr(app_module, "fix_uc_universities", lambda _conn: 0)
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: FakeInsertConn())
     monkeypatch.setattr(app_module, "fetch_page", lambda url, *a, **kw: fake_html)
-    monkeypatch.setattr(app_module, "parse_survey", lambda html: [fake_row])
-    monkeypatch.setattr(app_module, "get_max_pages", lambda html: 1)
+    monkeypatch.setattr(app_module, "parse_page", lambda html: ParsedPage([fake_row], 1))
 
     resp = client.post("/pull-data", json={"max_pages": 1})
     assert resp.status_code == 200
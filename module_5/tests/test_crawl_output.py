@@ -0,0 +1,63 @@
+"""Tests for crawl_output — NDJSON page writer and resumable checkpoints."""
+
+import gzip
+import io
+import json
+
+import pytest
+
+from crawl_output import CrawlCheckpoint, encode_rows, write_ndjson
+
+
+@pytest.mark.web
+def test_encode_rows_gzip_page_is_a_complete_member():
+    data = encode_rows([{"url": "a"}], "gzip") + encode_rows([{"url": "b"}], "gzip")
+    lines = gzip.decompress(data).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"url": "a"}, {"url": "b"}]
+    assert encode_rows([], "gzip") == b""
+
+
+@pytest.mark.web
+def test_write_ndjson_records_each_page(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / "c.checkpoint"))
+    out = io.BytesIO()
+    pages = [(1, [{"url": "a"}, {"url": "b"}]), (2, [{"url": "b"}, {"url": "c"}])]
+    assert write_ndjson(pages, out, checkpoint=checkpoint) == 3
+    assert checkpoint.completed == {1, 2}
+    assert checkpoint.output_bytes == len(out.getvalue())
+    saved = json.loads((tmp_path / "c.checkpoint").read_text())
+    assert saved["completed_pages"] == [1, 2]
+
+
+@pytest.mark.web
+def test_checkpoint_resume_truncates_partial_page(tmp_path):
+    output = tmp_path / "out.ndjson"
+    checkpoint = CrawlCheckpoint(str(tmp_path / "out.ndjson.checkpoint"))
+    with open(output, "wb") as out:
+        write_ndjson([(1, [{"url": "a"}])], out, checkpoint=checkpoint)
+        out.write(b'{"url": "half')
+
+    resumed = CrawlCheckpoint(checkpoint.path)
+    assert resumed.resume(str(output), "none") is True
+    assert output.read_bytes() == b'{"url": "a"}\n'
+    assert resumed.completed == {1}
+    assert resumed.new_rows([{"url": "a"}, {"url": "b"}, {}]) == [
+        {"url": "b"}, {}]
+
+
+@pytest.mark.web
+def test_checkpoint_resume_without_files_returns_false(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / "missing.checkpoint"))
+    assert checkpoint.resume(str(tmp_path / "missing.ndjson"), "none") is False
+    assert checkpoint.pages_to_fetch is None
+    assert checkpoint.completed == set()
+
+
+@pytest.mark.web
+def test_checkpoint_clear_is_idempotent(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / "c.checkpoint"))
+    checkpoint.start(4)
+    assert (tmp_path / "c.checkpoint").exists()
+    checkpoint.clear()
+    checkpoint.clear()
+    assert not (tmp_path / "c.checkpoint").exists()
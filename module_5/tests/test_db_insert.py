@@ -9,7 +9,7 @@ import uuid
 from datetime import date
 
 import pytest
-from load_data import clean_text, parse_float, parse_date
+from applicant_rows import clean_text, parse_float, parse_date
 from conftest import FakeResponse, NoCloseConn
 
 
@@ -308,7 +308,7 @@ def test_pull_data_inserts_into_empty_table(db_conn, monkeypatch):
     wrapper = NoCloseConn(conn)
     monkeypatch.setattr(app_module, "run_queries", lambda _conn: {})
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: wrapper)
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(html))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(html))
 
     test_app = app_module.create_app(testing=True)
     with test_app.test_client() as client:
@@ -333,3 +333,106 @@ def test_pull_data_inserts_into_empty_table(db_conn, monkeypatch):
     assert degree is not None
     assert llm_prog == "Computer Science"
     assert llm_uni == "Stanford University"
+
+
+@pytest.mark.db
+def test_upsert_updates_fields_but_keeps_stored_values(db_conn):
+    conn, cur = db_conn
+    from app import insert_row
+    from applicant_rows import (
+        SCRAPED_PARAM_KEYS, build_scraped_params, build_upsert_query)
+    row = _sample_row()
+    insert_row(cur, row)
+
+    reparsed = _sample_row(url=row["url"], status="Rejected", GPA="")
+    cur.execute(build_upsert_query(SCRAPED_PARAM_KEYS),
+                build_scraped_params(reparsed))
+    cur.execute("SELECT status, gpa FROM applicants WHERE url = %s",
+                (row["url"],))
+    status, gpa = cur.fetchone()
+    assert status == "Rejected"
+    assert gpa == pytest.approx(3.85)
+
+
+@pytest.mark.db
+def test_known_urls_returns_stored_subset(db_conn):
+    conn, cur = db_conn
+    from app import _known_urls, insert_row
+    row = _sample_row()
+    insert_row(cur, row)
+
+    missing = f"https://test.example.com/result/{uuid.uuid4()}"
+    assert _known_urls(cur, [row["url"], missing, ""]) == {row["url"]}
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("binary", [False, True])
+def test_copy_rows_merges_new_rows_once(db_conn, binary):
+    conn, cur = db_conn
+    from app import insert_row
+    from applicant_rows import build_scraped_params
+    from staged_copy import copy_rows
+    stored = _sample_row()
+    insert_row(cur, stored)
+
+    new = _sample_row(status="Accepted")
+    later_duplicate = _sample_row(url=new["url"], status="Rejected")
+    params = [build_scraped_params(r) for r in (stored, new, later_duplicate)]
+    assert copy_rows(conn, params, binary=binary) == 1
+
+    cur.execute("SELECT status, gpa, date_added FROM applicants WHERE url = %s",
+                (new["url"],))
+    status, gpa, date_added = cur.fetchone()
+    assert status == "Accepted"
+    assert gpa == pytest.approx(3.85)
+    assert date_added.isoformat() == "2026-01-15"
+
+
+@pytest.mark.db
+def test_incremental_copy_skips_unchanged_rows(db_conn):
+    conn, cur = db_conn
+    from applicant_rows import build_scraped_params
+    from load_data import _migrate_table
+    from staged_copy import copy_rows
+    _migrate_table(conn)
+    rows = [_sample_row(), _sample_row()]
+    assert copy_rows(conn, [build_scraped_params(r) for r in rows]) == 2
+    cur.execute("UPDATE applicants SET llm_generated_university = %s "
+                "WHERE url = %s", ("Stanford", rows[0]["url"]))
+
+    def reload():
+        return copy_rows(conn, [build_scraped_params(r) for r in rows],
+                         incremental=True)
+
+    assert reload() == 0
+    rows[0]["status"] = "Rejected"
+    assert reload() == 1
+    cur.execute("SELECT status, llm_generated_university FROM applicants "
+                "WHERE url = %s", (rows[0]["url"],))
+    assert cur.fetchone() == ("Rejected", "Stanford")
+
+
+@pytest.mark.db
+def test_swap_load_replaces_the_table_with_indexes(db_conn):
+    conn, cur = db_conn
+    from app import insert_row
+    from applicant_rows import build_scraped_params
+    from staged_copy import copy_rows
+    from table_swap import swap_load
+    stored = _sample_row()
+    insert_row(cur, stored)
+
+    rows = [_sample_row(), _sample_row()]
+    rows.append(_sample_row(url=rows[0]["url"], status="Rejected"))
+    assert swap_load(conn, lambda into: copy_rows(
+        conn, [build_scraped_params(r) for r in rows], into=into)) == 2
+
+    cur.execute("SELECT url, status FROM applicants ORDER BY p_id LIMIT 10")
+    assert cur.fetchall() == [(rows[0]["url"], "Accepted"),
+                              (rows[1]["url"], "Accepted")]
+    cur.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s "
+                "ORDER BY indexname LIMIT 10", ("applicants",))
+    assert cur.fetchall() == [("applicants_pkey",), ("applicants_url_key",)]
+    cur.execute("SELECT to_regclass('applicants_new'), "
+                "to_regclass('applicants_old')")
+    assert cur.fetchone() == (None, None)
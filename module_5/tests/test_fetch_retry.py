@@ -0,0 +1,140 @@
+"""Tests for fetch_retry — jittered retries and the crawl report."""
+
+from http.client import BadStatusLine, IncompleteRead
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+import fetch_retry
+from fetch_retry import CrawlReport, RetryPolicy, is_transient
+from page_cache import CacheMiss
+
+
+def _http_error(code, headers=None):
+    return HTTPError("https://example.com/", code, "err", headers or {}, None)
+
+
+@pytest.fixture()
+def no_jitter(monkeypatch):
+    """Make every backoff its full cap."""
+    monkeypatch.setattr(fetch_retry.random, "uniform", lambda low, high: high)
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("error, expected", [
+    (_http_error(503), True),
+    (_http_error(429), True),
+    (_http_error(404), False),
+    (URLError("reset"), True),
+    (TimeoutError("timed out"), True),
+    (ConnectionResetError(), True),
+    (IncompleteRead(b"partial", 100), True),
+    (BadStatusLine(""), True),
+    (CacheMiss("not cached"), False),
+    (UnicodeDecodeError("utf-8", b"\xff", 0, 1, "bad"), False),
+])
+def test_is_transient(error, expected):
+    assert is_transient(error) is expected
+
+
+@pytest.mark.web
+def test_backoff_doubles_up_to_max_delay(no_jitter):
+    policy = RetryPolicy(attempts=6, base_delay=0.5, max_delay=3.0)
+    assert [policy.backoff(n) for n in range(4)] == [0.5, 1.0, 2.0, 3.0]
+
+
+@pytest.mark.web
+def test_backoff_is_jittered_below_cap(monkeypatch):
+    seen = []
+
+    def _uniform(low, high):
+        seen.append((low, high))
+        return high / 4
+
+    monkeypatch.setattr(fetch_retry.random, "uniform", _uniform)
+    assert RetryPolicy(base_delay=1.0).backoff(1) == 0.5
+    assert seen == [(0.0, 2.0)]
+
+
+@pytest.mark.web
+def test_backoff_honours_retry_after(no_jitter):
+    policy = RetryPolicy(base_delay=0.5, max_delay=10.0)
+    assert policy.backoff(0, _http_error(429, {"Retry-After": "4"})) == 4.0
+    assert policy.backoff(0, _http_error(429, {"Retry-After": "60"})) == 10.0
+    assert policy.backoff(0, _http_error(429, {"Retry-After": "soon"})) == 0.5
+    assert policy.backoff(0, URLError("reset")) == 0.5
+
+
+@pytest.mark.web
+def test_wrap_retries_transient_errors_then_succeeds(no_jitter):
+    calls = []
+    waits = []
+
+    def _fetch(url):
+        calls.append(url)
+        if len(calls) < 3:
+            raise _http_error(503)
+        return "ok"
+
+    report = CrawlReport()
+    fetch = RetryPolicy(attempts=3, base_delay=0.5).wrap(
+        _fetch, report, waits.append)
+    assert fetch("u") == "ok"
+    assert waits == [0.5, 1.0]
+    assert report.as_dict() == {
+        "fetched": 1, "retries": 2, "retried": {"u": 2},
+        "failed": {}, "skipped": {}}
+
+
+@pytest.mark.web
+def test_wrap_retries_an_incomplete_read(no_jitter):
+    calls = []
+
+    def _fetch(url):
+        calls.append(url)
+        if len(calls) == 1:
+            raise IncompleteRead(b"<html>", 4096)
+        return "ok"
+
+    report = CrawlReport()
+    fetch = RetryPolicy(attempts=2, base_delay=0.5).wrap(
+        _fetch, report, lambda delay: None)
+    assert fetch("u") == "ok"
+    assert report.retried == {"u": 1}
+
+
+@pytest.mark.web
+def test_wrap_gives_up_after_attempts(no_jitter, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fetch_retry.time, "sleep", sleeps.append)
+    report = CrawlReport()
+
+    def _fetch(url):
+        raise TimeoutError("read timed out")
+
+    fetch = RetryPolicy(attempts=2, base_delay=0.25).wrap(_fetch, report)
+    with pytest.raises(TimeoutError):
+        fetch("u")
+    assert sleeps == [0.25]
+    assert report.failed == {"u": "read timed out"}
+    assert report.retried == {"u": 1}
+
+
+@pytest.mark.web
+def test_wrap_does_not_retry_permanent_errors():
+    calls = []
+
+    def _fetch(url):
+        calls.append(url)
+        raise _http_error(404)
+
+    with pytest.raises(HTTPError):
+        RetryPolicy().wrap(_fetch, wait=pytest.fail)("u")
+    assert calls == ["u"]
+
+
+@pytest.mark.web
+def test_report_records_skips():
+    report = CrawlReport()
+    report.record_skip("u", "robots.txt")
+    assert report.as_dict()["skipped"] == {"u": "robots.txt"}
@@ -0,0 +1,277 @@
+"""Tests for http_session.HttpSession — keep-alive pooling and decompression.
+
+Requests go to a throwaway ``http.server`` bound to 127.0.0.1, so the real
+``http.client`` code paths run without touching the internet.
+"""
+
+import gzip
+import socket
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+import http_session
+from conftest import FakeSession
+from http_session import HttpSession, _decompress
+from page_cache import CacheMiss, PageCache
+from robots_checker import RobotsChecker
+from scrape import fetch_page
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Tiny keep-alive server with one route per behaviour under test."""
+    protocol_version = "HTTP/1.1"
+    peers = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # noqa: N802 (http.server naming)
+        _Handler.peers.append(self.client_address[1])
+        path = self.path
+        if path == "/gzip" and "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._send(200, gzip.compress(b"zipped"),
+                       {"Content-Encoding": "gzip"})
+        elif path == "/deflate":
+            self._send(200, zlib.compress(b"deflated"),
+                       {"Content-Encoding": "deflate"})
+        elif path == "/redirect":
+            self._send(302, headers={"Location": "/plain?x=1"})
+        elif path == "/loop":
+            self._send(302, headers={"Location": "/loop"})
+        elif path == "/missing":
+            self._send(404, b"nope")
+        elif path == "/bye":
+            self._send(200, b"bye", {"Connection": "close"})
+        elif path == "/drop":
+            # Respond, then hang up without announcing Connection: close
+            self._send(200, b"dropped")
+            self.close_connection = True
+        elif path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304)
+            else:
+                self._send(200, b"fresh", {"ETag": '"v1"'})
+        elif path == "/ua":
+            self._send(200, self.headers.get("User-Agent", "").encode())
+        else:
+            self._send(200, f"hello {path}".encode())
+
+
+@pytest.fixture()
+def server():
+    _Handler.peers = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.web
+def test_session_reuses_connection(server):
+    with HttpSession() as session:
+        first = session.get(f"{server}/a")
+        second = session.get(f"{server}/b")
+    assert first.status == 200
+    assert first.body == b"hello /a"
+    assert second.body == b"hello /b"
+    assert len(set(_Handler.peers)) == 1
+
+
+@pytest.mark.web
+def test_session_decompresses_gzip_and_deflate(server):
+    with HttpSession() as session:
+        assert session.get(f"{server}/gzip").body == b"zipped"
+        assert session.get(f"{server}/deflate").body == b"deflated"
+
+
+@pytest.mark.web
+def test_session_follows_redirects(server):
+    with HttpSession() as session:
+        response = session.get(f"{server}/redirect")
+    assert response.status == 200
+    assert response.body == b"hello /plain?x=1"
+
+
+@pytest.mark.web
+def test_session_redirect_loop_raises(server):
+    with HttpSession() as session:
+        with pytest.raises(HTTPError):
+            session.get(f"{server}/loop")
+
+
+@pytest.mark.web
+def test_session_returns_error_status(server):
+    with HttpSession() as session:
+        response = session.get(f"{server}/missing")
+    assert response.status == 404
+
+
+@pytest.mark.web
+def test_session_connection_close_not_pooled(server):
+    with HttpSession() as session:
+        session.get(f"{server}/bye")
+        session.get(f"{server}/a")
+    assert len(set(_Handler.peers)) == 2
+
+
+@pytest.mark.web
+def test_session_retries_stale_keepalive(server):
+    with HttpSession() as session:
+        assert session.get(f"{server}/drop").body == b"dropped"
+        assert session.get(f"{server}/a").body == b"hello /a"
+    assert len(set(_Handler.peers)) == 2
+
+
+@pytest.mark.web
+def test_session_fresh_connection_error_raises():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with HttpSession(timeout=1) as session:
+        with pytest.raises(OSError):
+            session.get(f"http://127.0.0.1:{port}/")
+
+
+@pytest.mark.web
+def test_session_applies_connect_then_read_timeout(server):
+    with HttpSession(timeout=(1.5, 4.0)) as session:
+        conn, _ = session._checkout(("http", server.split("//")[1]))
+        assert conn.timeout == 1.5
+        session.get(f"{server}/a")
+        [pooled] = next(iter(session._idle.values()))
+        assert pooled.sock.gettimeout() == 4.0
+
+
+@pytest.mark.web
+def test_split_timeout():
+    assert http_session.split_timeout(3.0) == (3.0, 3.0)
+    assert http_session.split_timeout((1.0, 2.0)) == (1.0, 2.0)
+    assert http_session.split_timeout(None) == (None, None)
+
+
+@pytest.mark.web
+def test_session_https_uses_tls_connection():
+    session = HttpSession()
+    conn, reused = session._checkout(("https", "example.com"))
+    assert isinstance(conn, http_session.http.client.HTTPSConnection)
+    assert reused is False
+
+
+@pytest.mark.web
+def test_decompress_raw_deflate_and_identity():
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    raw = compressor.compress(b"raw") + compressor.flush()
+    assert _decompress(raw, "deflate") == b"raw"
+    assert _decompress(b"plain", None) == b"plain"
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("body, encoding", [
+    (b"\xff\xfenot deflate", "deflate"),
+    (gzip.compress(b"zipped")[:-12], "gzip"),
+    (gzip.compress(b"zipped")[:10] + b"\xff" * 8, "gzip"),
+])
+def test_decompress_corrupt_body_raises_value_error(body, encoding):
+    with pytest.raises(ValueError, match=f"Undecodable {encoding}"):
+        _decompress(body, encoding)
+
+
+@pytest.mark.web
+def test_fetch_page_with_session(server):
+    with HttpSession() as session:
+        html = fetch_page(f"{server}/ua", "SessionBot", session=session)
+    assert html == "SessionBot"
+
+
+@pytest.mark.web
+def test_fetch_page_with_session_raises_on_error_status(server):
+    with HttpSession() as session:
+        with pytest.raises(HTTPError) as excinfo:
+            fetch_page(f"{server}/missing", session=session)
+    assert excinfo.value.code == 404
+
+
+# =====================================================================
+# RobotsChecker over a shared session
+# =====================================================================
+
+_ROBOTS = "User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"
+
+
+@pytest.mark.web
+def test_robots_checker_reads_through_session():
+    session = FakeSession(_ROBOTS)
+    checker = RobotsChecker("https://example.com/survey/", "Bot",
+                            session=session)
+    assert session.requests[0][0] == "https://example.com/robots.txt"
+    assert checker.can_fetch("https://example.com/survey/") is True
+    assert checker.can_fetch("https://example.com/private") is False
+    assert checker.get_crawl_delay(0.5) == 2
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("status, expected", [
+    (403, False),
+    (404, True),
+    (503, False),
+])
+def test_robots_checker_session_error_statuses(status, expected):
+    checker = RobotsChecker("https://example.com/", "Bot",
+                            session=FakeSession("", status=status))
+    assert checker.can_fetch("https://example.com/page") is expected
+
+
+# =====================================================================
+# HttpSession + PageCache — conditional GETs and offline replay
+# =====================================================================
+
+@pytest.mark.web
+def test_cached_session_revalidates_with_etag(server, tmp_path):
+    cache = PageCache(str(tmp_path))
+    with HttpSession(cache=cache) as session:
+        first = session.get(f"{server}/etag")
+        second = session.get(f"{server}/etag")
+    assert first.body == second.body == b"fresh"
+    assert second.status == 200
+    assert second.reason == "Not Modified"
+    assert cache.load(f"{server}/etag").etag == '"v1"'
+
+
+@pytest.mark.web
+def test_cached_session_stores_pages_without_validators(server, tmp_path):
+    cache = PageCache(str(tmp_path))
+    with HttpSession(cache=cache) as session:
+        session.get(f"{server}/a")
+        session.get(f"{server}/missing")
+    assert cache.load(f"{server}/a").body == b"hello /a"
+    assert cache.load(f"{server}/missing") is None
+
+
+@pytest.mark.web
+def test_offline_session_replays_cache_without_network(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.store("http://127.0.0.1:9/page", b"cached", {})
+    with HttpSession(cache=cache, offline=True) as session:
+        assert fetch_page("http://127.0.0.1:9/page", session=session) == "cached"
+        with pytest.raises(CacheMiss):
+            session.get("http://127.0.0.1:9/other")
+
+
+@pytest.mark.web
+def test_offline_session_requires_cache():
+    with pytest.raises(ValueError):
+        HttpSession(offline=True)
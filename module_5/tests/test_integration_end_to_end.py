@@ -103,7 +103,7 @@ def test_pull_then_render(db_conn, monkeypatch):
 
     wrapper = NoCloseConn(conn)
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: wrapper)
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(html))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(html))
 
     test_app = app_module.create_app(testing=True)
 
@@ -216,7 +216,7 @@ def test_duplicate_pull_preserves_uniqueness(db_conn, monkeypatch):
 
     call_count = {"n": 0}
 
-    def _urlopen_switch(req):
+    def _urlopen_switch(req, timeout=None):
         """Return batch_1 HTML on first pull, batch_2 on second."""
         call_count["n"] += 1
         if call_count["n"] <= 1:
@@ -291,7 +291,7 @@ def test_update_analysis_reload_reflects_new_data(db_conn, monkeypatch):
 
     wrapper = NoCloseConn(conn)
     monkeypatch.setattr(app_module.psycopg, "connect", lambda **kw: wrapper)
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(html))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(html))
 
     test_app = app_module.create_app(testing=True)
 
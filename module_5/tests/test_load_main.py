@@ -5,7 +5,10 @@ import json
 import pytest
 import psycopg
 
+import applicant_rows
 import load_data
+import staged_copy
+import table_swap
 
 pytestmark = pytest.mark.db
 
@@ -37,10 +40,32 @@ def test_create_connection_success_with_host(monkeypatch):
 # main() — mock all DB interactions
 # =====================================================================
 
+class _FakeCopy:
+    """``cursor.copy()`` / ``conn.transaction()`` stand-in."""
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def set_types(self, types):
+        self._cursor.copy_types = types
+
+    def write_row(self, row):
+        self._cursor.copied.append(row)
+
+
 class _FakeCursor:
     """Records SQL calls for verification."""
     def __init__(self):
         self.calls = []
+        self.copied = []
+        self.copy_types = None
+        self.rowcount = 2
+        self.fetched = []
 
     def execute(self, sql, params=None):
         self.calls.append(("execute", sql, params))
@@ -48,18 +73,30 @@ class _FakeCursor:
     def executemany(self, sql, params_list):
         self.calls.append(("executemany", sql, len(list(params_list))))
 
+    def copy(self, query):
+        self.calls.append(("copy", query.as_string(None), None))
+        return _FakeCopy(self)
+
     def fetchone(self):
         return (None,)
 
+    def fetchall(self):
+        return self.fetched.pop(0) if self.fetched else []
+
 
 class _FakeConn:
     def __init__(self):
         self._cursor = _FakeCursor()
         self.autocommit = True
+        self.transactions = 0
 
     def cursor(self):
         return self._cursor
 
+    def transaction(self):
+        self.transactions += 1
+        return _FakeCopy(self._cursor)
+
     def close(self):
         pass
 
@@ -160,7 +197,7 @@ def test_main_loads_and_inserts_json(monkeypatch, tmp_path):
     monkeypatch.setattr(load_data, "create_connection", _fake_create)
     monkeypatch.setattr(load_data, "JSON_PATH", str(json_file))
 
-    load_data.main()
+    load_data.main(["--method", "insert"])
 
     # Verify executemany was called
     has_executemany = any(
@@ -266,6 +303,519 @@ def test_main_executemany_error(monkeypatch, tmp_path):
     monkeypatch.setattr(load_data, "create_connection", _fake_create)
     monkeypatch.setattr(load_data, "JSON_PATH", str(json_file))
 
-    load_data.main()  # Should not crash
+    load_data.main(["--method", "insert"])  # Should not crash
+
+    assert second_conn.closed is True
+
+# =====================================================================
+# Input formats — JSON array, NDJSON, gzip (scrape.py --format/--compress)
+# =====================================================================
+
+_ROWS = [{"url": f"https://example.com/{n}", "program": "CS, MIT"}
+         for n in range(3)]
+
+
+def _ndjson(rows):
+    return "".join(json.dumps(r) + "\n" for r in rows)
+
+
+@pytest.mark.parametrize("name, payload", [
+    ("rows.json", json.dumps(_ROWS, indent=2)),
+    ("rows.ndjson", _ndjson(_ROWS)),
+    ("rows.ndjson.gz", _ndjson(_ROWS)),
+    ("rows.json.gz", "\n  " + json.dumps(_ROWS)),
+    ("blank-lines.ndjson", "\n" + _ndjson(_ROWS[:2]) + "\n\n" + _ndjson(_ROWS[2:])),
+])
+def test_iter_rows_reads_array_and_ndjson(tmp_path, name, payload):
+    import gzip
+
+    path = tmp_path / name
+    data = payload.encode("utf-8")
+    path.write_bytes(gzip.compress(data) if name.endswith(".gz") else data)
+    assert list(applicant_rows.iter_rows(str(path))) == _ROWS
+
+
+def test_iter_rows_empty_file(tmp_path):
+    path = tmp_path / "empty.ndjson"
+    path.write_text("")
+    assert list(applicant_rows.iter_rows(str(path))) == []
+
+
+def test_iter_rows_truncated_gzip_keeps_complete_lines(tmp_path, caplog):
+    import zlib
+
+    # Simulate a crawl killed mid-write: flushed pages, no gzip trailer
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    data = compressor.compress(_ndjson(_ROWS[:2]).encode("utf-8"))
+    data += compressor.flush(zlib.Z_SYNC_FLUSH)
+    path = tmp_path / "partial.ndjson.gz"
+    path.write_bytes(data)
+
+    with caplog.at_level("WARNING", logger="applicant_rows"):
+        assert list(applicant_rows.iter_rows(str(path))) == _ROWS[:2]
+    assert "Truncated" in caplog.text
+
+
+def test_main_logs_a_corrupt_gzip_input(monkeypatch, tmp_path, caplog):
+    path = tmp_path / "bad.json.gz"
+    path.write_bytes(b"\x1f\x8bnot really gzip")
+    conn = _FakeConn()
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection", lambda *a, **kw: conn)
+    monkeypatch.setattr(load_data, "_create_table", lambda c: None)
+    with caplog.at_level("ERROR", logger="load_data"):
+        load_data.main(["--input", str(path), "--method", "insert"])
+    assert "Could not read" in caplog.text
+    assert not [c for c in conn._cursor.calls if c[0] == "executemany"]
+
+
+def test_main_input_flag_overrides_default(monkeypatch, tmp_path):
+    path = tmp_path / "rows.ndjson"
+    path.write_text(_ndjson(_ROWS))
+    seen = []
+
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection",
+                        lambda *a, **kw: _FakeConn())
+    monkeypatch.setattr(load_data, "_create_table", lambda conn: None)
+    monkeypatch.setattr(load_data, "iter_rows",
+                        lambda p: seen.append(p) or iter(()))
+    load_data.main(["--input", str(path)])
+    assert seen == [str(path)]
 
-    assert second_conn.closed is True
\ No newline at end of file
+
+# =====================================================================
+# copy_rows / --method copy — COPY into a staging table, then merge
+# =====================================================================
+
+def _sql_calls(conn):
+    return [c[1] if c[0] == "copy" else c[1].as_string(None)
+            for c in conn._cursor.calls if c[0] in ("execute", "copy")]
+
+
+def test_copy_rows_stages_and_merges_in_one_transaction():
+    conn = _FakeConn()
+    params = [applicant_rows.build_scraped_params(r) for r in _ROWS]
+    assert staged_copy.copy_rows(conn, params) == 2
+    assert conn.transactions == 1
+
+    statements = _sql_calls(conn)
+    assert statements[0] == 'DROP TABLE IF EXISTS "applicants_staging"'
+    assert statements[1].startswith('CREATE UNLOGGED TABLE "applicants_staging"')
+    assert statements[2].startswith('COPY "applicants_staging" ("ordinal", "program"')
+    assert statements[2].endswith("FROM STDIN")
+    assert statements[3] == staged_copy.build_merge_query().as_string(None)
+    assert statements[4] == 'DROP TABLE "applicants_staging"'
+
+    copied = conn._cursor.copied
+    assert [row[0] for row in copied] == [0, 1, 2]
+    assert copied[1][4] == "https://example.com/1"   # ordinal, then columns
+    assert conn._cursor.copy_types is None
+
+
+def test_copy_rows_binary_declares_column_types():
+    conn = _FakeConn()
+    staged_copy.copy_rows(conn, [applicant_rows.build_scraped_params(_ROWS[0])],
+                        binary=True)
+    assert _sql_calls(conn)[2].endswith("FROM STDIN (FORMAT BINARY)")
+    types = conn._cursor.copy_types
+    assert types[:4] == ["int8", "text", "text", "date"]
+    assert types.count("float4") == 4
+    assert len(types) == len(applicant_rows.APPLICANT_COLUMNS) + 1
+
+
+def test_merge_query_keeps_first_row_per_url_in_file_order():
+    text = staged_copy.build_merge_query().as_string(None)
+    assert 'SELECT DISTINCT ON ("url") "ordinal"' in text
+    assert text.endswith('ORDER BY "ordinal" ON CONFLICT ("url") DO NOTHING')
+
+
+def test_merge_query_stores_a_content_hash():
+    text = staged_copy.build_merge_query().as_string(None)
+    assert text.startswith('INSERT INTO "applicants" ("program"')
+    assert '"llm_generated_university", "content_hash") SELECT' in text
+    assert ('md5(ROW("program", "comments", "date_added", "url"' in text)
+    assert '"llm_generated_university")::text) AS "content_hash"' in text
+
+
+def test_incremental_merge_only_updates_changed_rows():
+    text = staged_copy.build_merge_query(incremental=True).as_string(None)
+    assert 'ON CONFLICT ("url") DO UPDATE SET "program" = COALESCE(' in text
+    assert text.endswith(
+        '"content_hash" = "excluded"."content_hash" '
+        'WHERE "applicants"."content_hash" IS DISTINCT FROM '
+        '"excluded"."content_hash"')
+    assert '"url" = ' not in text
+    assert '"llm_generated_program" = ' not in text
+
+
+def test_copy_rows_incremental_uses_the_upsert_merge():
+    conn = _FakeConn()
+    staged_copy.copy_rows(conn, [applicant_rows.build_scraped_params(_ROWS[0])],
+                        incremental=True)
+    assert _sql_calls(conn)[3] == staged_copy.build_merge_query(
+        incremental=True).as_string(None)
+
+
+def test_migrate_table_keeps_the_existing_table():
+    conn = _FakeConn()
+    load_data._migrate_table(conn)
+    statements = _sql_calls(conn)
+    assert statements[0].startswith(
+        'CREATE TABLE IF NOT EXISTS "applicants" ("p_id" SERIAL PRIMARY KEY')
+    assert statements[0].endswith(
+        '"content_hash" TEXT, "enriched_at" TIMESTAMPTZ)')
+    assert statements[1:] == [
+        'ALTER TABLE "applicants" ADD COLUMN IF NOT EXISTS "content_hash" TEXT',
+        'ALTER TABLE "applicants" ADD COLUMN IF NOT EXISTS "enriched_at" '
+        'TIMESTAMPTZ']
+    assert not any("DROP" in statement for statement in statements)
+
+
+def test_create_table_drops_and_recreates():
+    conn = _FakeConn()
+    load_data._create_table(conn)
+    statements = _sql_calls(conn)
+    assert statements[0] == 'DROP TABLE IF EXISTS "applicants"'
+    assert statements[1].startswith('CREATE TABLE "applicants" (')
+    assert '"content_hash" TEXT' in statements[1]
+
+
+@pytest.mark.parametrize("argv, warned", [
+    ([], False), (["--method", "insert"], True)])
+def test_main_incremental_mode_migrates_and_upserts(monkeypatch, tmp_path,
+                                                    caplog, argv, warned):
+    path = tmp_path / "rows.ndjson"
+    path.write_text(_ndjson(_ROWS))
+    calls = []
+    tables = []
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection",
+                        lambda *a, **kw: _FakeConn())
+    monkeypatch.setattr(load_data, "_create_table",
+                        lambda c: tables.append("rebuild"))
+    monkeypatch.setattr(load_data, "_migrate_table",
+                        lambda c: tables.append("migrate"))
+    monkeypatch.setattr(
+        load_data, "copy_rows",
+        lambda c, params, binary, incremental, into: calls.append(
+            (len(list(params)), incremental)) or 1)
+
+    with caplog.at_level("INFO", logger="load_data"):
+        load_data.main(["--input", str(path), "--mode", "incremental", *argv])
+    assert tables == ["migrate"]
+    assert calls == [(3, True)]
+    assert "Inserted or updated 1 rows" in caplog.text
+    assert ("always uses --method copy" in caplog.text) is warned
+
+
+@pytest.mark.parametrize("argv, binary", [
+    ([], False), (["--copy_format", "binary"], True)])
+def test_main_copies_by_default(monkeypatch, tmp_path, argv, binary):
+    path = tmp_path / "rows.ndjson"
+    path.write_text(_ndjson(_ROWS))
+    conn = _FakeConn()
+    calls = []
+
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection", lambda *a, **kw: conn)
+    monkeypatch.setattr(load_data, "_create_table", lambda c: None)
+    monkeypatch.setattr(
+        load_data, "copy_rows",
+        lambda c, params, binary, incremental, into: calls.append(
+            (len(list(params)), binary, incremental)) or 3)
+    load_data.main(["--input", str(path), *argv])
+    assert calls == [(3, binary, False)]
+    assert not any(c[0] == "executemany" for c in conn._cursor.calls)
+
+
+# =====================================================================
+# Streaming input — iter_rows / iter_batches / --batch_size
+# =====================================================================
+
+@pytest.mark.parametrize("read_size", [4, 16, 64 * 1024])
+def test_iter_rows_streams_array_across_read_pieces(monkeypatch, tmp_path,
+                                                    read_size):
+    monkeypatch.setattr(applicant_rows, "_READ_SIZE", read_size)
+    path = tmp_path / "rows.json"
+    path.write_text(json.dumps(_ROWS, indent=2))
+    rows = applicant_rows.iter_rows(str(path))
+    assert next(rows) == _ROWS[0]
+    assert list(rows) == _ROWS[1:]
+
+
+def test_iter_rows_empty_array(tmp_path):
+    path = tmp_path / "rows.json"
+    path.write_text(" [ ] ")
+    assert list(applicant_rows.iter_rows(str(path))) == []
+
+
+@pytest.mark.parametrize("payload, message", [
+    ('[{"url": "a"}', "Unterminated array"),
+    ('[{"url": "a"} {"url": "b"}]', "Expecting ','"),
+    ('[{"url": "a"}, {"url": ]', "Expecting value"),
+])
+def test_iter_rows_rejects_malformed_arrays(monkeypatch, tmp_path, payload,
+                                            message):
+    monkeypatch.setattr(applicant_rows, "_READ_SIZE", 8)
+    path = tmp_path / "bad.json"
+    path.write_text(payload)
+    with pytest.raises(json.JSONDecodeError, match=message):
+        list(applicant_rows.iter_rows(str(path)))
+
+
+def test_iter_batches_groups_lazily():
+    source = iter(range(5))
+    batches = applicant_rows.iter_batches(source, 2)
+    assert next(batches) == [0, 1]
+    assert next(source) == 2        # nothing read ahead
+    assert list(batches) == [[3, 4]]
+    assert list(applicant_rows.iter_batches([1, 2], 0)) == [[1], [2]]
+
+
+def test_main_inserts_and_logs_each_batch(monkeypatch, tmp_path, caplog):
+    path = tmp_path / "rows.ndjson"
+    path.write_text(_ndjson(_ROWS))
+    conn = _FakeConn()
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection", lambda *a, **kw: conn)
+    monkeypatch.setattr(load_data, "_create_table", lambda c: None)
+
+    with caplog.at_level("INFO", logger="load_data"):
+        load_data.main(["--input", str(path), "--method", "insert",
+                        "--batch_size", "2"])
+    assert [c[2] for c in conn._cursor.calls if c[0] == "executemany"] == [
+        2, 1]
+    assert "Read 2 rows" in caplog.text
+    assert "Read 3 rows" in caplog.text
+    assert "Inserted 3 rows" in caplog.text
+
+
+# =====================================================================
+# --jobs — partitioned input, one connection per worker
+# =====================================================================
+
+def _write_ndjson_with_blanks(tmp_path):
+    path = tmp_path / "rows.ndjson"
+    path.write_text("\n" + _ndjson(_ROWS[:2]) + "\n" + _ndjson(_ROWS[2:]))
+    return path
+
+
+def test_ndjson_ranges_only_split_plain_ndjson(tmp_path):
+    import gzip
+
+    plain = _write_ndjson_with_blanks(tmp_path)
+    size = plain.stat().st_size
+    ranges = staged_copy.ndjson_ranges(str(plain), 4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == 0 and ranges[-1][1] == size
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+    array = tmp_path / "rows.json"
+    array.write_text("  " + json.dumps(_ROWS))
+    packed = tmp_path / "rows.ndjson.gz"
+    packed.write_bytes(gzip.compress(_ndjson(_ROWS).encode("utf-8")))
+    assert staged_copy.ndjson_ranges(str(array), 4) is None
+    assert staged_copy.ndjson_ranges(str(packed), 4) is None
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 500])
+def test_byte_ranges_read_every_line_once_in_order(tmp_path, parts):
+    path = _write_ndjson_with_blanks(tmp_path)
+    rows = [row for start, end in staged_copy.ndjson_ranges(str(path), parts)
+            for row in staged_copy._iter_byte_range(str(path), start, end)]
+    assert [row for _, row in rows] == _ROWS
+    offsets = [offset for offset, _ in rows]
+    assert offsets == sorted(offsets) and offsets[0] == 1
+
+
+class _WorkerConns:
+    """create_connection stand-in handing out one fake per worker."""
+    def __init__(self):
+        self.conns = []
+
+    def __call__(self, *args, **kwargs):
+        conn = _FakeConn()
+        self.conns.append(conn)
+        return conn
+
+    def copied(self):
+        return sorted(row[0] for conn in self.conns
+                      for row in conn._cursor.copied)
+
+
+@pytest.fixture()
+def worker_conns(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    conns = _WorkerConns()
+    monkeypatch.setattr(staged_copy, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return conns
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_parallel_copy_stages_byte_ranges_then_merges(tmp_path, worker_conns,
+                                                      jobs):
+    path = _write_ndjson_with_blanks(tmp_path)
+    conn = _FakeConn()
+    assert staged_copy.parallel_copy(conn, str(path), jobs, worker_conns) == 2
+
+    statements = _sql_calls(conn)
+    assert statements[0] == 'DROP TABLE IF EXISTS "applicants_staging"'
+    assert statements[1].startswith('CREATE UNLOGGED TABLE')
+    assert statements[2] == staged_copy.build_merge_query().as_string(None)
+    assert statements[3] == 'DROP TABLE IF EXISTS "applicants_staging"'
+    assert len(worker_conns.copied()) == 3
+    assert 1 <= len(worker_conns.conns) <= jobs
+
+
+def test_parallel_copy_batches_json_arrays(tmp_path, worker_conns):
+    path = tmp_path / "rows.json"
+    path.write_text(json.dumps(_ROWS * 3))
+    staged_copy.parallel_copy(_FakeConn(), str(path), 1, worker_conns,
+                            staged_copy.CopyOptions(batch_size=2, binary=True))
+    assert worker_conns.copied() == list(range(9))
+    assert worker_conns.conns[0]._cursor.copy_types[0] == "int8"
+
+
+def test_parallel_copy_drops_staging_when_a_worker_cannot_connect(
+        tmp_path, worker_conns):
+    conn = _FakeConn()
+    with pytest.raises(psycopg.OperationalError, match="could not connect"):
+        staged_copy.parallel_copy(
+            conn, str(_write_ndjson_with_blanks(tmp_path)), 2, lambda: None)
+    assert _sql_calls(conn)[-1] == 'DROP TABLE IF EXISTS "applicants_staging"'
+
+
+@pytest.mark.parametrize("method, parallel", [("copy", True),
+                                              ("insert", False)])
+def test_main_jobs_flag(monkeypatch, tmp_path, caplog, method, parallel):
+    path = _write_ndjson_with_blanks(tmp_path)
+    calls = []
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection",
+                        lambda *a, **kw: _FakeConn())
+    monkeypatch.setattr(load_data, "_create_table", lambda c: None)
+    monkeypatch.setattr(load_data, "parallel_copy",
+                        lambda *args: calls.append(
+                            (*args[1:3], args[3].args)) or 3)
+
+    with caplog.at_level("WARNING", logger="load_data"):
+        load_data.main(["--input", str(path), "--method", method,
+                        "--jobs", "4"])
+    assert calls == ([(str(path), 4, ("", "", None))] if parallel else [])
+    assert ("--jobs only applies" in caplog.text) is not parallel
+
+
+# =====================================================================
+# --mode swap — load a new table, then rename it into place
+# =====================================================================
+
+def test_merge_into_a_new_table_has_no_conflict_clause():
+    text = staged_copy.build_merge_query(into="applicants_new").as_string(None)
+    assert text.startswith('INSERT INTO "applicants_new" ("program"')
+    assert text.endswith('ORDER BY "ordinal"')
+
+
+def test_swap_load_builds_then_renames_in_one_transaction():
+    conn = _FakeConn()
+    conn._cursor.fetched = [[("app_user", "SELECT"), ("app_user", "UPDATE"),
+                             ("app_user", "MAINTAIN")],
+                            [("app_user", "USAGE")]]
+    loads = []
+
+    def load(into):
+        loads.append(len(_sql_calls(conn)))
+        return staged_copy.copy_rows(
+            conn, [applicant_rows.build_scraped_params(_ROWS[0])], into=into)
+
+    assert table_swap.swap_load(conn, load) == 2
+    statements = _sql_calls(conn)
+    before, after = statements[:loads[0]], statements[loads[0]:]
+    assert before == [
+        'DROP TABLE IF EXISTS "applicants_new"',
+        'DROP TABLE IF EXISTS "applicants_old"',
+        'CREATE UNLOGGED TABLE "applicants_new" ("p_id" SERIAL, '
+        + before[2].split(", ", 1)[1]]
+    assert '"url" TEXT,' in before[2] and "UNIQUE" not in before[2]
+    assert after[1].endswith('FROM "applicants_new" WITH NO DATA')
+    assert after[3] == staged_copy.build_merge_query(
+        into="applicants_new").as_string(None)
+
+    finish = after.index('ALTER TABLE "applicants_new" SET LOGGED')
+    assert after[finish + 1:finish + 4] == [
+        'ALTER TABLE "applicants_new" ADD CONSTRAINT "applicants_new_pkey" '
+        'PRIMARY KEY ("p_id")',
+        'ALTER TABLE "applicants_new" ADD CONSTRAINT "applicants_new_url_key" '
+        'UNIQUE ("url")',
+        'ANALYZE "applicants_new"']
+    swap = after[finish + 4:]
+    assert swap[0] == "SELECT set_config('lock_timeout', %s, true)"
+    grants = [s for s in swap if s.startswith("GRANT")]
+    assert grants == [
+        'GRANT SELECT ON TABLE "applicants_new" TO "app_user"',
+        'GRANT UPDATE ON TABLE "applicants_new" TO "app_user"',
+        'GRANT USAGE ON SEQUENCE "applicants_new_p_id_seq" TO "app_user"']
+    renames = [s for s in swap if " RENAME TO " in s]
+    assert renames == [
+        'ALTER TABLE IF EXISTS "applicants" RENAME TO "applicants_old"',
+        'ALTER INDEX IF EXISTS "applicants_pkey" RENAME TO '
+        '"applicants_old_pkey"',
+        'ALTER INDEX IF EXISTS "applicants_url_key" RENAME TO '
+        '"applicants_old_url_key"',
+        'ALTER SEQUENCE IF EXISTS "applicants_p_id_seq" RENAME TO '
+        '"applicants_old_p_id_seq"',
+        'ALTER TABLE "applicants_new" RENAME TO "applicants"',
+        'ALTER INDEX "applicants_new_pkey" RENAME TO "applicants_pkey"',
+        'ALTER INDEX "applicants_new_url_key" RENAME TO "applicants_url_key"',
+        'ALTER SEQUENCE "applicants_new_p_id_seq" RENAME TO '
+        '"applicants_p_id_seq"']
+    assert swap[-2:] == ['DROP TABLE IF EXISTS "applicants_new"',
+                         'DROP TABLE IF EXISTS "applicants_old"']
+    assert conn.transactions == 2
+
+
+def test_swap_load_failure_leaves_applicants_alone():
+    conn = _FakeConn()
+
+    def load(into):
+        raise psycopg.DataError("bad row")
+
+    with pytest.raises(psycopg.DataError):
+        table_swap.swap_load(conn, load)
+    statements = _sql_calls(conn)
+    assert statements[-1] == 'DROP TABLE IF EXISTS "applicants_new"'
+    assert not any("RENAME" in s or "applicants_old" in s
+                   for s in statements[2:])
+
+
+@pytest.mark.parametrize("argv, warned", [
+    ([], False), (["--method", "insert"], True), (["--jobs", "2"], False)])
+def test_main_swap_mode_loads_the_new_table(monkeypatch, tmp_path, caplog,
+                                            argv, warned):
+    path = tmp_path / "rows.ndjson"
+    path.write_text(_ndjson(_ROWS))
+    conn = _FakeConn()
+    loads = []
+    tables = []
+    monkeypatch.setattr(load_data, "_ensure_database", lambda *a: True)
+    monkeypatch.setattr(load_data, "create_connection", lambda *a, **kw: conn)
+    monkeypatch.setattr(load_data, "_create_table",
+                        lambda c: tables.append("rebuild"))
+    monkeypatch.setattr(load_data, "_migrate_table",
+                        lambda c: tables.append("migrate"))
+    monkeypatch.setattr(
+        load_data, "copy_rows",
+        lambda c, params, binary, incremental, into: loads.append(
+            (len(list(params)), into)) or 3)
+    monkeypatch.setattr(
+        load_data, "parallel_copy",
+        lambda *args: loads.append((args[2], args[-1].into)) or 3)
+
+    with caplog.at_level("INFO", logger="load_data"):
+        load_data.main(["--input", str(path), "--mode", "swap", *argv])
+    assert tables == []
+    assert loads == [(2 if "--jobs" in argv else 3, "applicants_new")]
+    assert "Swapped the reloaded table into 'applicants'" in caplog.text
+    assert "Inserted 3 rows" in caplog.text
+    assert ("--mode swap always uses --method copy" in caplog.text) is warned
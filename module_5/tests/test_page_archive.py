@@ -0,0 +1,112 @@
+"""Tests for page_archive — append-only page segments and offset index."""
+
+import os
+import threading
+import uuid
+
+import pytest
+
+from page_archive import INDEX_NAME, ArchiveEntry, PageArchive, segment_path
+
+
+@pytest.mark.web
+def test_store_and_load_round_trip(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    entry = archive.store("https://example.com/survey/", "<html>é</html>")
+    assert (entry.segment, entry.offset) == (0, 0)
+    assert archive.load("https://example.com/survey/") == "<html>é</html>"
+    assert archive.load("https://example.com/other") is None
+
+
+@pytest.mark.web
+def test_latest_record_wins_and_survives_reopening(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.store("u1", "first")
+    archive.store("u2", "other")
+    second = archive.store("u1", "second")
+
+    reopened = PageArchive(str(tmp_path))
+    assert len(reopened) == 2
+    assert [e.url for e in reopened.entries()] == ["u2", "u1"]
+    assert reopened.entries()[1] == second
+    assert reopened.load("u1") == "second"
+
+
+@pytest.mark.web
+def test_records_keep_every_copy_of_a_url(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    first = archive.store("u1", "first")
+    archive.store("u2", "other")
+    second = archive.store("u1", "second")
+    assert PageArchive(str(tmp_path)).records() == [
+        first, archive.entries()[0], second]
+
+
+@pytest.mark.web
+def test_opening_does_not_create_the_archive(tmp_path):
+    archive = PageArchive(str(tmp_path / "archive"))
+    assert archive.records() == []
+    assert not (tmp_path / "archive").exists()
+    archive.store("u1", "page")
+    assert (tmp_path / "archive" / INDEX_NAME).exists()
+
+
+@pytest.mark.web
+def test_segments_roll_over_at_max_size(tmp_path):
+    pages = [uuid.uuid4().hex for _ in range(3)]
+    archive = PageArchive(str(tmp_path), max_segment_bytes=60)
+    entries = [archive.store(f"u{n}", page) for n, page in enumerate(pages)]
+    assert [e.segment for e in entries] == [0, 1, 2]
+    assert os.path.exists(segment_path(str(tmp_path), 2))
+
+    reopened = PageArchive(str(tmp_path), max_segment_bytes=60)
+    assert reopened.store("u3", "y").segment == 2
+    assert reopened.load("u0") == pages[0]
+
+
+@pytest.mark.web
+def test_index_ignores_torn_and_malformed_lines(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.store("u1", "page one")
+    with open(tmp_path / INDEX_NAME, "a", encoding="utf-8") as f:
+        f.write("not\tan entry\n")
+        f.write("x\t0\t1\t0\tbad-number\n")
+        f.write("0\t999\t12\t0.0\tu2")  # crash before the newline
+
+    reopened = PageArchive(str(tmp_path))
+    assert [e.url for e in reopened.entries()] == ["u1"]
+    # Reading leaves the torn line alone; the next store cuts it off
+    assert (tmp_path / INDEX_NAME).read_text().endswith("\tu2")
+    # Appends continue after the torn record
+    assert reopened.store("u2", "page two").url == "u2"
+    assert PageArchive(str(tmp_path)).load("u2") == "page two"
+
+
+@pytest.mark.web
+def test_record_archives_every_fetched_page_from_many_threads(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    fetch = archive.record(lambda url: f"<html>{url}</html>")
+    threads = [threading.Thread(target=fetch, args=(f"u{n}",))
+               for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reopened = PageArchive(str(tmp_path))
+    assert len(reopened) == 8
+    assert all(reopened.load(e.url) == f"<html>{e.url}</html>"
+               for e in reopened.entries())
+    assert isinstance(reopened.entries()[0], ArchiveEntry)
+
+
+@pytest.mark.web
+def test_record_does_not_archive_failed_fetches(tmp_path):
+    archive = PageArchive(str(tmp_path))
+
+    def _fail(url):
+        raise TimeoutError("timed out")
+
+    with pytest.raises(TimeoutError):
+        archive.record(_fail)("u1")
+    assert len(archive) == 0
@@ -0,0 +1,61 @@
+"""Tests for page_cache — on-disk page bodies and HTTP validators."""
+
+import pytest
+
+from page_cache import CacheMiss, PageCache, cache_from_env
+
+
+@pytest.mark.web
+def test_store_and_load_roundtrip(tmp_path):
+    cache = PageCache(str(tmp_path / "cache"))
+    cache.store("https://example.com/a", b"<html>a</html>",
+                {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"})
+    entry = cache.load("https://example.com/a")
+    assert entry.body == b"<html>a</html>"
+    assert entry.etag == '"abc"'
+    assert entry.last_modified == "Mon, 01 Jan 2026 00:00:00 GMT"
+
+
+@pytest.mark.web
+def test_load_missing_returns_none(tmp_path):
+    assert PageCache(str(tmp_path)).load("https://example.com/none") is None
+
+
+@pytest.mark.web
+def test_load_corrupt_entry_returns_none(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.store("https://example.com/a", b"body", {})
+    with open(cache._path("https://example.com/a", ".json"), "w") as f:
+        f.write("{not json")
+    assert cache.load("https://example.com/a") is None
+
+
+@pytest.mark.web
+def test_entries_are_keyed_by_url(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.store("https://example.com/?page=1", b"one", {})
+    cache.store("https://example.com/?page=2", b"two", {})
+    assert cache.load("https://example.com/?page=1").body == b"one"
+    assert cache.load("https://example.com/?page=2").body == b"two"
+
+
+@pytest.mark.web
+def test_conditional_headers():
+    assert PageCache.conditional_headers(None) == {}
+    entry = PageCache.conditional_headers(
+        type("E", (), {"etag": '"x"', "last_modified": "yesterday"})())
+    assert entry == {"If-None-Match": '"x"', "If-Modified-Since": "yesterday"}
+
+
+@pytest.mark.web
+def test_cache_miss_is_a_network_error():
+    assert issubclass(CacheMiss, OSError)
+
+
+@pytest.mark.web
+def test_cache_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("SCRAPE_CACHE_DIR", raising=False)
+    assert cache_from_env() is None
+    monkeypatch.setenv("SCRAPE_CACHE_DIR", str(tmp_path / "pages"))
+    assert cache_from_env().directory == str(tmp_path / "pages")
+    assert (tmp_path / "pages").is_dir()
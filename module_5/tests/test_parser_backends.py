@@ -0,0 +1,199 @@
+"""Parity suite for the scraper's HTML parser backends.
+
+Every page in ``_CORPUS`` is parsed with each backend in
+``survey_parser.BACKENDS``; ``parse_survey`` and ``get_max_pages`` must
+return exactly what the reference ``html.parser`` backend returns, and
+``parse_main_row`` / ``parse_detail_row`` must build identical dicts from
+each backend's cells.
+"""
+
+import re
+
+import pytest
+
+import scrape
+import survey_parser
+from scrape import get_max_pages, parse_survey, scrape_data, _parse_document
+from survey_rows import parse_detail_row, parse_main_row
+from test_scrape import SAMPLE_HTML
+
+_REFERENCE = "html.parser"
+
+
+def _backends():
+    """All backends, with ``lxml`` skipped when it is not installed."""
+    params = []
+    for name in survey_parser.BACKENDS:
+        marks = []
+        if name == "lxml":
+            try:
+                import lxml  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+            except ImportError:
+                marks = [pytest.mark.skip(reason="lxml not installed")]
+        params.append(pytest.param(name, marks=marks))
+    return params
+
+
+def _row(school, program, date, status, href, extra=""):
+    return (f"<tr><td>{school}</td><td>{program}</td><td>{date}</td>"
+            f"<td>{status}</td><td>{extra}<a href=\"{href}\">View</a></td></tr>")
+
+
+_CORPUS = {
+    "sample": SAMPLE_HTML,
+    "entities_and_markup": (
+        "<table><tbody>"
+        + _row("Texas A&amp;M", "<span>Physics</span><span>PhD</span>",
+               "March&nbsp;3, 2026", "<b>Wait</b> listed", "/result/7")
+        + "<tr><td><span class=\"tag\">Fall 2026</span>"
+          "<span>International</span><span>GPA 3.90</span>"
+          "<span>GRE V 165</span></td></tr>"
+        + "<tr><td>Loved it &mdash; &quot;great&quot; <i>visit</i>!</td></tr>"
+        + "</tbody></table>"
+    ),
+    "degree_variants": (
+        "<table><tbody>"
+        + _row("UCLA", "History | MA", "Jan 1, 2026", "Rejected", "/result/1")
+        + _row("NYU", "Art | MFA", "Jan 2, 2026", "Accepted", "/result/2")
+        + _row("Yale", "Law | JD", "Jan 3, 2026", "Interview", "/result/3")
+        + _row("Duke", "Economics", "Jan 4, 2026", "", "/result/4")
+        + _row("Rice", "Math | Master of Science", "Jan 5, 2026",
+               "Accepted", "https://www.thegradcafe.com/result/5")
+        + "</tbody></table>"
+    ),
+    "detail_status_and_comments": (
+        "<table><tbody>"
+        + _row("Penn", "Biology | PhD", "Feb 1, 2026", "", "/result/9")
+        + "<tr><td>Accepted via email | Spring 2027 | American</td></tr>"
+        + "<tr><td>Rejected</td></tr>"
+        + "<tr><td>   </td></tr>"
+        + "<tr><td>Just a comment | with a pipe</td></tr>"
+        + "</tbody></table>"
+    ),
+    "header_and_noise": (
+        "<!DOCTYPE html><html><head><title>x</title>"
+        "<script>var t = '<td>nope</td>';</script>"
+        "<style>td { color: red }</style></head><body>"
+        "<table><thead><tr><th>School</th><th>Program</th><th>Added</th>"
+        "<th>Decision</th><th></th></tr></thead><tbody>"
+        + _row("Brown", "CS | PhD", "Feb 2, 2026", "Accepted", "/result/11",
+               extra="<a>no href</a><a href=\"/survey/?q=x\">x</a>")
+        + "<tr><td><!-- hidden -->GPA 3.50<script>ignored()</script></td></tr>"
+        + "<tr><td>a</td><td>b</td></tr>"
+        + "</tbody></table>"
+        "<table><tbody>"
+        + _row("Other", "Table | PhD", "Feb 3, 2026", "Accepted", "/result/12")
+        + "</tbody></table>"
+        "<nav><a href=\"?page=12\">12</a><a href=\"/survey/?page=7&x=1\">7</a>"
+        "<a href=\"?page=abc\">bad</a></nav></body></html>"
+    ),
+    "orphan_detail_rows": (
+        "<table><tbody>"
+        "<tr><td>Fall 2026 | GPA 3.1</td></tr>"
+        + _row("Cornell", "Physics | PhD", "Feb 4, 2026", "Accepted",
+               "/result/13")
+        + "</tbody></table>"
+    ),
+    "nested_table": (
+        "<table><tbody><tr><td>outer<table><tr><td>inner</td></tr>"
+        "</table></td></tr></tbody></table>"
+    ),
+    "no_tbody": (
+        "<table><tr><td>A</td><td>B</td><td>C</td><td>D</td>"
+        "<td><a href=\"/result/1\">v</a></td></tr></table>"
+        "<a href=\"?page=3\">3</a>"
+    ),
+    "no_table": "<html><body><p>Nothing here</p></body></html>",
+    "empty": "",
+}
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("backend", _backends())
+@pytest.mark.parametrize("page", sorted(_CORPUS))
+def test_parse_survey_matches_reference(backend, page):
+    html = _CORPUS[page]
+    assert parse_survey(html, backend) == parse_survey(html, _REFERENCE)
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("backend", _backends())
+@pytest.mark.parametrize("page", sorted(_CORPUS))
+def test_get_max_pages_matches_reference(backend, page):
+    html = _CORPUS[page]
+    assert get_max_pages(html, backend) == get_max_pages(html, _REFERENCE)
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("backend", _backends())
+@pytest.mark.parametrize("page", sorted(_CORPUS))
+def test_row_parsers_match_reference(backend, page):
+    html = _CORPUS[page]
+    expected = _parse_document(html, _REFERENCE).rows
+    actual = _parse_document(html, backend).rows
+    assert [len(cells) for cells in actual] == [len(c) for c in expected]
+    for cells, ref_cells in zip(actual, expected):
+        if len(cells) == 5:
+            assert parse_main_row(cells) == parse_main_row(ref_cells)
+        for cell, ref_cell in zip(cells, ref_cells):
+            result = {"comments": []}
+            ref_result = {"comments": []}
+            parse_detail_row(cell, result)
+            parse_detail_row(ref_cell, ref_result)
+            assert result == ref_result
+
+
+@pytest.mark.web
+def test_corpus_exercises_real_rows():
+    assert len(parse_survey(_CORPUS["header_and_noise"], "stream")) == 1
+    assert get_max_pages(_CORPUS["header_and_noise"], "stream") == 12
+    assert parse_survey(_CORPUS["sample"], "stream")[1]["GPA"] == "GPA 3.60"
+
+
+@pytest.mark.web
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        parse_survey(SAMPLE_HTML, "html5lib")
+    with pytest.raises(ValueError):
+        get_max_pages(SAMPLE_HTML, "nope")
+
+
+@pytest.mark.web
+def test_survey_cell_find_only_captures_links():
+    cell = survey_parser.extract(SAMPLE_HTML).rows[0][4]
+    assert cell.find("span", re.compile("/result/")) is None
+    assert cell.find("a", re.compile("/nothing/")) is None
+    assert cell.find("a", re.compile("/result/")) == {"href": "/result/11111"}
+
+
+@pytest.mark.web
+def test_scrape_data_uses_parser_option(monkeypatch):
+    seen = []
+    real = scrape._parse_document
+
+    def _spy(html, parser):
+        seen.append(parser)
+        return real(html, parser)
+
+    monkeypatch.setattr(scrape, "_parse_document", _spy)
+    monkeypatch.setattr(scrape, "fetch_page", lambda url, **kw: SAMPLE_HTML)
+    results = scrape_data(max_pages=2, delay=0, ignore_robots=True,
+                          parser="stream")
+    assert seen == ["stream", "stream"]
+    assert len(results) == 4
+
+
+@pytest.mark.web
+def test_main_parser_flag(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(
+        "sys.argv", ["scrape.py", "--ignore_robots", "--parser", "stream"])
+    scrape.main()
+    assert seen["parser"] == "stream"
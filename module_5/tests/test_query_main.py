@@ -47,6 +47,7 @@ def test_pull_data_with_injected_scrapers(monkeypatch):
     """Dependency-injected scrapers bypass the network without monkeypatching scrape."""
     import app as app_module
     from conftest import FakePullConn
+    from scrape import ParsedPage
 
     monkeypatch.setattr(app_module, "fix_gre_aw", lambda _c: 0)
     monkeypatch.setattr(app_module, "fix_uc_universities", lambda _c: 0)
@@ -56,8 +57,7 @@ def test_pull_data_with_injected_scrapers(monkeypatch):
     test_app = app_module.create_app(
         testing=True,
         fetch_page_fn=lambda url: fake_html,
-        parse_survey_fn=lambda html: [],
-        get_max_pages_fn=lambda html: 1,
+        parse_page_fn=lambda html: ParsedPage([], 1),
     )
 
     with test_app.test_client() as c:
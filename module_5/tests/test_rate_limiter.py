@@ -0,0 +1,310 @@
+"""Tests for rate_limiter — shared request pacing."""
+
+import importlib.util
+import sys
+from http.client import IncompleteRead
+from urllib.error import HTTPError
+
+import pytest
+
+import rate_limiter
+from rate_limiter import (
+    AdaptiveRateLimiter, LockFileSchedule, RateLimiter, schedule_from_env)
+
+
+class _FakeClock:
+    """Deterministic stand-in for the ``time`` module."""
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.web
+def test_first_acquire_does_not_wait(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    limiter = RateLimiter(0.5)
+    assert limiter.acquire() == 0
+    assert clock.sleeps == []
+
+
+@pytest.mark.web
+def test_back_to_back_acquires_are_spaced(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    limiter = RateLimiter(0.5)
+    limiter.acquire()
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == [0.5, 0.5]
+
+
+@pytest.mark.web
+def test_elapsed_time_counts_toward_interval(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    limiter = RateLimiter(0.5)
+    limiter.acquire()
+    clock.now += 0.2
+    assert limiter.acquire() == pytest.approx(0.3)
+
+
+@pytest.mark.web
+def test_negative_interval_clamped():
+    assert RateLimiter(-1).interval == 0.0
+
+
+@pytest.mark.web
+def test_reserve_does_not_sleep(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    limiter = RateLimiter(2.0)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 2.0
+    assert limiter.reserve() == 4.0
+    assert clock.sleeps == []
+
+
+# =====================================================================
+# AdaptiveRateLimiter — AIMD pacing
+# =====================================================================
+
+@pytest.fixture()
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+@pytest.mark.web
+def test_adaptive_speeds_up_additively_to_floor(clock):
+    limiter = AdaptiveRateLimiter(1.0, min_interval=0.5)
+    decision = limiter.record(200, 0.1)
+    assert decision.action == "increase"
+    assert limiter.interval == pytest.approx(1 / 1.1)
+    for _ in range(50):
+        limiter.record(200, 0.1)
+    assert limiter.interval == 0.5
+    assert limiter.record(200, 0.1).action == "hold"
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("status", [429, 503, None])
+def test_adaptive_backs_off_multiplicatively(clock, status):
+    limiter = AdaptiveRateLimiter(0.5)
+    assert limiter.record(status, 0.1).action == "backoff"
+    assert limiter.interval == 1.0
+    # A burst of in-flight failures within one interval counts once
+    assert limiter.record(status, 0.1).action == "hold"
+    clock.now += 1.0
+    limiter.record(status, 0.1)
+    assert limiter.interval == 2.0
+
+
+@pytest.mark.web
+def test_adaptive_backoff_from_zero_and_ceiling(clock):
+    limiter = AdaptiveRateLimiter(0.0, max_interval=0.3)
+    assert limiter.record(200, 0.1).action == "hold"
+    limiter.record(503, 0.1)
+    assert limiter.interval == 0.25
+    clock.now += 1
+    limiter.record(503, 0.1)
+    assert limiter.interval == 0.3
+
+
+@pytest.mark.web
+def test_adaptive_backs_off_on_rising_latency(clock):
+    limiter = AdaptiveRateLimiter(1.0)
+    for _ in range(3):
+        limiter.record(200, 0.1)
+    before = limiter.interval
+    assert limiter.record(200, 2.0).action == "backoff"
+    assert limiter.interval == pytest.approx(before * 2)
+
+
+@pytest.mark.web
+def test_adaptive_holds_on_other_errors(clock):
+    limiter = AdaptiveRateLimiter(1.0)
+    assert limiter.record(404, 0.1).action == "hold"
+    assert limiter.interval == 1.0
+
+
+@pytest.mark.web
+def test_adaptive_start_is_clamped_to_bounds():
+    assert AdaptiveRateLimiter(0.1, min_interval=2.0).interval == 2.0
+    assert AdaptiveRateLimiter(9.0, max_interval=3.0).interval == 3.0
+
+
+@pytest.mark.web
+def test_adaptive_observe_records_statuses(clock):
+    limiter = AdaptiveRateLimiter(1.0)
+
+    def _fetch(url):
+        clock.now += 0.2
+        if url == "throttled":
+            raise HTTPError(url, 429, "Too Many Requests", {}, None)
+        if url == "timeout":
+            raise TimeoutError("timed out")
+        if url == "truncated":
+            raise IncompleteRead(b"<html>", 4096)
+        return "body"
+
+    fetch = limiter.observe(_fetch)
+    assert fetch("ok") == "body"
+    with pytest.raises(HTTPError):
+        fetch("throttled")
+    clock.now += 5
+    with pytest.raises(TimeoutError):
+        fetch("timeout")
+    clock.now += 10
+    with pytest.raises(IncompleteRead):
+        fetch("truncated")
+    assert [(d.status, d.action) for d in limiter.decisions] == [
+        (200, "increase"), (429, "backoff"), (None, "backoff"),
+        (None, "backoff")]
+    assert limiter.decisions[0].latency == pytest.approx(0.2)
+
+
+@pytest.mark.web
+def test_adaptive_stats_summarize_decisions(clock):
+    limiter = AdaptiveRateLimiter(1.0)
+    assert limiter.stats() == {
+        "requests": 0, "increase": 0, "backoff": 0, "hold": 0,
+        "interval": 1.0, "min_interval": 1.0, "max_interval": 1.0}
+    limiter.record(200, 0.1)
+    limiter.record(503, 0.1)
+    stats = limiter.stats()
+    assert (stats["requests"], stats["increase"], stats["backoff"]) == (2, 1, 1)
+    assert stats["max_interval"] == stats["interval"] > 1.0 > stats["min_interval"]
+
+
+@pytest.mark.web
+def test_adaptive_history_is_capped(clock, monkeypatch):
+    monkeypatch.setattr(AdaptiveRateLimiter, "history", 3)
+    limiter = AdaptiveRateLimiter(1.0)
+    limiter.record(503, 0.1)
+    for _ in range(5):
+        limiter.record(429, 0.1)
+    # The back-off fell out of the history but still holds the interval
+    assert [d.action for d in limiter.decisions] == ["hold"] * 3
+    assert limiter.interval == 2.0
+    stats = limiter.stats()
+    assert (stats["requests"], stats["backoff"], stats["hold"]) == (6, 1, 5)
+    assert (stats["min_interval"], stats["max_interval"]) == (1.0, 2.0)
+
+
+@pytest.mark.web
+def test_adaptive_interval_change_moves_the_pending_slot(clock):
+    limiter = AdaptiveRateLimiter(0.5)
+    assert limiter.reserve() == 0
+    limiter.record(503, 0.1)
+    # The next request waits the new interval from the last start
+    assert limiter.reserve() == 1.0
+
+
+@pytest.mark.web
+def test_adaptive_speed_up_pulls_the_pending_slot_in(clock):
+    limiter = AdaptiveRateLimiter(1.0, min_interval=0.5)
+    assert limiter.reserve() == 0
+    limiter.record(200, 0.1)
+    assert limiter.reserve() == pytest.approx(1.0 / 1.1)
+
+
+# =====================================================================
+# LockFileSchedule — pacing shared across processes
+# =====================================================================
+
+@pytest.mark.web
+def test_lock_file_schedule_chains_slots_between_limiters(clock, tmp_path):
+    path = str(tmp_path / "rate.lock")
+    first = RateLimiter(0.5, LockFileSchedule(path))
+    second = RateLimiter(0.5, LockFileSchedule(path))
+    assert first.reserve() == 0
+    assert second.reserve() == 0.5
+    assert first.reserve() == 1.0
+    clock.now += 5
+    assert second.reserve() == 0
+
+
+@pytest.mark.web
+def test_lock_file_schedule_resets_stale_slot(clock, tmp_path):
+    path = tmp_path / "rate.lock"
+    path.write_text(repr(clock.now + 3600.0))
+    assert LockFileSchedule(str(path)).book(0.5) == 0
+    assert path.read_text().split() == [repr(clock.now),
+                                        repr(clock.now + 0.5)]
+
+
+@pytest.mark.web
+def test_lock_file_schedule_ignores_garbage(clock, tmp_path):
+    path = tmp_path / "rate.lock"
+    path.write_text("not a time")
+    assert LockFileSchedule(str(path)).book(0.5) == 0
+
+
+@pytest.mark.web
+def test_lock_file_schedule_reads_a_lone_next_slot(clock, tmp_path):
+    path = tmp_path / "rate.lock"
+    path.write_text(repr(clock.now + 2.0))
+    assert LockFileSchedule(str(path)).book(0.5) == 2.0
+
+
+@pytest.mark.web
+def test_adaptive_backoff_shifts_shared_slot(clock, tmp_path):
+    path = str(tmp_path / "rate.lock")
+    limiter = AdaptiveRateLimiter(0.5, schedule=LockFileSchedule(path))
+    other = RateLimiter(0.5, LockFileSchedule(path))
+    assert limiter.reserve() == 0
+    limiter.record(503, 0.1)
+    assert other.reserve() == 1.0
+
+
+@pytest.mark.web
+def test_adaptive_speed_up_never_pulls_shared_slot_in(clock, tmp_path):
+    path = str(tmp_path / "rate.lock")
+    limiter = AdaptiveRateLimiter(1.0, min_interval=0.5,
+                                  schedule=LockFileSchedule(path))
+    other = RateLimiter(1.0, LockFileSchedule(path))
+    assert limiter.reserve() == 0
+    assert other.reserve() == 1.0
+    limiter.record(200, 0.1)
+    # The other process booked the last slot at its own 1s interval
+    assert limiter.reserve() == 2.0
+
+
+@pytest.mark.web
+def test_lock_file_schedule_requires_fcntl(monkeypatch, tmp_path):
+    monkeypatch.setattr(rate_limiter, "fcntl", None)
+    with pytest.raises(NotImplementedError):
+        LockFileSchedule(str(tmp_path / "rate.lock"))
+
+
+@pytest.mark.web
+def test_rate_limiter_imports_without_fcntl(monkeypatch, tmp_path):
+    # A None entry makes ``import fcntl`` raise ImportError, as on Windows
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    spec = importlib.util.spec_from_file_location(
+        "rate_limiter_without_fcntl", rate_limiter.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.fcntl is None
+    with pytest.raises(NotImplementedError):
+        module.LockFileSchedule(str(tmp_path / "rate.lock"))
+
+
+@pytest.mark.web
+def test_schedule_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv(rate_limiter.RATE_LOCK_ENV, raising=False)
+    assert schedule_from_env() is None
+    monkeypatch.setenv(rate_limiter.RATE_LOCK_ENV, str(tmp_path / "r.lock"))
+    assert schedule_from_env().path == str(tmp_path / "r.lock")
@@ -0,0 +1,179 @@
+"""Tests for reparse — re-parsing archived pages to NDJSON or the DB."""
+
+import gzip
+import json
+import sys
+
+import pytest
+import psycopg
+
+import reparse
+from page_archive import PageArchive
+
+
+def _survey_html(*result_ids, status="Accepted"):
+    rows = "".join(f"""
+  <tr>
+    <td>School {n}</td><td>CS | PhD</td><td>January 2, 2026</td>
+    <td>{status}</td><td><a href="/result/{n}">V</a></td>
+  </tr>
+  <tr><td>Fall 2026 | GPA 3.{n}</td></tr>""" for n in result_ids)
+    return f"<html><body><table><tbody>{rows}</tbody></table></body></html>"
+
+
+@pytest.fixture()
+def archive(tmp_path):
+    archive = PageArchive(str(tmp_path / "archive"))
+    base = "https://www.thegradcafe.com/survey/"
+    archive.store(base, _survey_html(2, 3))
+    archive.store(f"{base}?page=2", _survey_html(4, 5))
+    # A later crawl saw entry 1 arrive and shift the others along
+    archive.store(f"{base}?page=2", _survey_html(3, 4, status="Rejected"))
+    archive.store(base, _survey_html(1, 2, status="Rejected"))
+    return archive
+
+
+@pytest.mark.web
+def test_page_number():
+    assert reparse.page_number("https://x/survey/") == 1
+    assert reparse.page_number("https://x/survey/?page=12") == 12
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("workers", [0, 2])
+def test_iter_reparsed_keeps_every_record_without_repeats(archive, workers):
+    pages = list(reparse.iter_reparsed(archive, workers=workers))
+    assert [num for num, _ in pages] == [1, 2, 2, 1]
+    # Entry 5 is only in the older copy of page 2
+    assert [[r["url"].rsplit("/", 1)[1] for r in rows]
+            for _, rows in pages] == [["1", "2"], ["3", "4"], ["5"], []]
+    assert pages[0][1][1]["GPA"] == "GPA 3.2"
+    assert pages[0][1][1]["comments"] == ""
+    # The newest record's status wins for every repeated entry
+    statuses = {r["url"].rsplit("/", 1)[1]: r["status"]
+                for _, rows in pages for r in rows}
+    assert statuses == {"1": "Rejected", "2": "Rejected", "3": "Rejected",
+                        "4": "Rejected", "5": "Accepted"}
+
+
+class _Cursor:
+    def __init__(self):
+        self.params = []
+
+    def executemany(self, query, params_list):
+        self.params.extend(params_list)
+
+
+class _Conn:
+    def __init__(self):
+        self.cur = _Cursor()
+        self.committed = False
+        self.rolled_back = False
+        self.closed = False
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.web
+def test_upsert_pages_skips_rows_without_url():
+    conn = _Conn()
+    count = reparse.upsert_pages(conn, [
+        (1, [{"url": "https://www.thegradcafe.com/result/1", "GPA": "GPA 3.5",
+              "date_added": "Added on January 2, 2026"},
+             {"program": "no link"}]),
+        (2, []),
+    ])
+    assert count == 1
+    assert conn.cur.params[0]["gpa"] == 3.5
+    assert str(conn.cur.params[0]["date_added"]) == "2026-01-02"
+
+
+@pytest.mark.web
+def test_main_writes_gzip_ndjson(archive, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert reparse.main(["-a", archive.directory, "-o", "reparsed.ndjson.gz",
+                         "--compress", "gzip"]) == 5
+    with gzip.open(tmp_path / "reparsed.ndjson.gz", "rt",
+                   encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 5
+
+
+@pytest.mark.web
+def test_main_writes_stdout(archive, capsysbinary):
+    assert reparse.main(["-a", archive.directory]) == 5
+    assert len(capsysbinary.readouterr().out.splitlines()) == 5
+
+
+@pytest.mark.web
+def test_main_reads_sys_argv(archive, capsysbinary, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["reparse.py", "-a", archive.directory])
+    assert reparse.main() == 5
+    assert len(capsysbinary.readouterr().out.splitlines()) == 5
+
+
+@pytest.mark.web
+def test_main_keeps_output_in_working_directory(archive, tmp_path,
+                                                monkeypatch):
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    assert reparse.main(["-a", archive.directory,
+                         "-o", str(tmp_path / "elsewhere.ndjson")]) == 5
+    assert (workdir / "elsewhere.ndjson").exists()
+    assert not (tmp_path / "elsewhere.ndjson").exists()
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("argv", [
+    ["-a", "missing-dir"],
+    ["-a", ".", "--compress", "gzip"],
+    ["-a", ".", "-o", "/"],
+])
+def test_main_rejects_bad_arguments(argv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert reparse.main(argv) == 0
+
+
+@pytest.mark.web
+def test_main_db_upserts_and_cleans_up(archive, monkeypatch):
+    conn = _Conn()
+    cleaned = []
+    monkeypatch.setattr(reparse.psycopg, "connect", lambda **kw: conn)
+    monkeypatch.setattr(reparse, "fix_gre_aw", cleaned.append)
+    monkeypatch.setattr(reparse, "fix_uc_universities", cleaned.append)
+    assert reparse.main(["-a", archive.directory, "--db"]) == 5
+    assert conn.committed and conn.closed
+    assert cleaned == [conn, conn]
+
+
+@pytest.mark.web
+def test_main_db_error_rolls_back(archive, monkeypatch):
+    conn = _Conn()
+
+    def _fail(query, params_list):
+        raise psycopg.Error("upsert failed")
+
+    conn.cur.executemany = _fail
+    monkeypatch.setattr(reparse.psycopg, "connect", lambda **kw: conn)
+    assert reparse.main(["-a", archive.directory, "--db"]) == 0
+    assert conn.rolled_back and not conn.committed
+
+
+@pytest.mark.web
+def test_main_db_connect_error(archive, monkeypatch):
+    def _raise(**kw):
+        raise psycopg.OperationalError("db down")
+
+    monkeypatch.setattr(reparse.psycopg, "connect", _raise)
+    assert reparse.main(["-a", archive.directory, "--db"]) == 0
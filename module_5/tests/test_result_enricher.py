@@ -0,0 +1,327 @@
+"""Tests for result_enricher — parallel /result/ page enrichment."""
+
+import threading
+import uuid
+
+import pytest
+import psycopg
+
+import result_enricher
+import robots_checker
+from fetch_retry import CrawlReport
+from rate_limiter import RateLimiter
+from result_enricher import (
+    EnrichedBatch, allowed_urls, build_update_query, enrich_batches,
+    iter_incomplete, parse_result_page)
+
+RESULT_HTML = """
+<html><body><main>
+<dl>
+  <dt>Institution</dt><dd>Stanford University</dd>
+  <dt>Degree Type</dt><dd>PhD</dd>
+  <dt>Degree's Country of Origin</dt><dd>International</dd>
+  <dt>Undergrad GPA</dt><dd>3.85</dd>
+  <dt>GRE General:</dt><dd>325</dd>
+  <dt>GRE Verbal:</dt><dd>160</dd>
+  <dt>Analytical Writing:</dt><dd>0.00</dd>
+  <dt>Notes</dt><dd><p>Funded &amp; <b>thrilled</b></p></dd>
+</dl>
+</main></body></html>
+"""
+
+
+class _FakeCursor:
+    """Records executemany calls and serves queued fetchall pages."""
+    def __init__(self, pages=()):
+        self.pages = list(pages)
+        self.queries = []
+        self.executed = []
+        self.updates = []
+        self.rowcount = -1
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        self.executed.append(params)
+
+    def fetchall(self):
+        return self.pages.pop(0) if self.pages else []
+
+    def executemany(self, query, params_list):
+        self.updates.append(list(params_list))
+        self.rowcount = len(self.updates[-1])
+
+
+class _FakeConn:
+    def __init__(self, cur):
+        self._cur = cur
+        self.commits = 0
+        self.rolled_back = False
+        self.closed = False
+
+    def cursor(self):
+        return self._cur
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+class _StubRobots:
+    fetch_error = None
+
+    def __init__(self, disallowed=()):
+        self.disallowed = set(disallowed)
+
+    def can_fetch(self, url):
+        return url not in self.disallowed
+
+
+# =====================================================================
+# parse_result_page / build_update_query
+# =====================================================================
+
+@pytest.mark.web
+def test_parse_result_page_maps_labels_to_columns():
+    assert parse_result_page(RESULT_HTML) == {
+        "gpa": 3.85,
+        "gre": 325.0,
+        "gre_v": 160.0,
+        "gre_aw": None,      # 0 means the score was left blank
+        "degree": "PhD",
+        "us_or_international": "International",
+        "comments": "Funded & thrilled",
+    }
+
+
+@pytest.mark.web
+def test_parse_result_page_without_details():
+    params = parse_result_page("<html><dd>orphan</dd><dt>Notes</dt></html>")
+    assert params == {
+        "gpa": None, "gre": None, "gre_v": None, "gre_aw": None,
+        "degree": "", "us_or_international": "", "comments": "",
+    }
+
+
+@pytest.mark.web
+def test_update_query_only_fills_empty_columns():
+    text = build_update_query().as_string(None)
+    assert text.startswith('UPDATE "applicants" SET "gpa" = COALESCE("gpa", %(gpa)s)')
+    assert "\"degree\" = COALESCE(NULLIF(\"degree\", ''), %(degree)s)" in text
+    assert text.endswith('"enriched_at" = now() WHERE "url" = %(url)s')
+
+
+# =====================================================================
+# enrich_batches
+# =====================================================================
+
+@pytest.mark.web
+def test_enrich_batches_fetches_concurrently_and_updates_per_batch():
+    cur = _FakeCursor()
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    both_started = threading.Barrier(2, timeout=5)
+
+    def _fetch(url):
+        with lock:
+            in_flight.append(url)
+            peak.append(len(in_flight))
+        if url.endswith(("/1", "/2")):
+            both_started.wait()
+        with lock:
+            in_flight.remove(url)
+        if url.endswith("/3"):
+            raise TimeoutError("read timed out")
+        return RESULT_HTML
+
+    urls = [f"https://www.thegradcafe.com/result/{n}" for n in range(1, 5)]
+    batches = list(enrich_batches(cur, [urls[:2], urls[2:]], _fetch,
+                                  RateLimiter(0), workers=2))
+
+    assert batches == [EnrichedBatch(2, 2, 2), EnrichedBatch(2, 1, 1)]
+    assert max(peak) >= 2
+    assert [[p["url"] for p in update] for update in cur.updates] == [
+        urls[:2], urls[3:]]
+    assert cur.updates[0][0]["gpa"] == 3.85
+
+
+@pytest.mark.web
+def test_enrich_batches_skips_update_when_every_fetch_fails():
+    cur = _FakeCursor()
+
+    def _fetch(url):
+        raise ValueError("undecodable")
+
+    batches = list(enrich_batches(cur, [["u1", "u2"]], _fetch, RateLimiter(0)))
+    assert batches == [EnrichedBatch(2, 0, 0)]
+    assert cur.updates == []
+
+
+@pytest.mark.web
+def test_enrich_batches_with_no_batches():
+    assert list(enrich_batches(_FakeCursor(), [], str, RateLimiter(0))) == []
+
+
+@pytest.mark.web
+def test_enrich_batches_takes_a_limiter_slot_per_request():
+    acquired = []
+    limiter = type("L", (), {"acquire": lambda self: acquired.append(1)})()
+    list(enrich_batches(_FakeCursor(), [["a", "b"], ["c"]],
+                        lambda url: "", limiter))
+    assert len(acquired) == 3
+
+
+# =====================================================================
+# iter_incomplete / allowed_urls
+# =====================================================================
+
+@pytest.mark.web
+def test_iter_incomplete_pages_by_p_id_up_to_limit():
+    cur = _FakeCursor(pages=[[(3, "u3"), (7, "u7")], [(9, "u9")]])
+    batches = list(iter_incomplete(_FakeConn(cur), batch_size=2, from_id=1,
+                                   limit=3))
+    assert batches == [["u3", "u7"], ["u9"]]
+    assert cur.executed == [(1, "%/result/%", 2), (7, "%/result/%", 1)]
+    assert '"enriched_at" IS NULL' in cur.queries[0].as_string(None)
+
+
+@pytest.mark.web
+def test_iter_incomplete_stops_when_no_rows_are_left():
+    cur = _FakeCursor(pages=[[(1, "u1")]])
+    assert list(iter_incomplete(_FakeConn(cur), batch_size=5000)) == [["u1"]]
+    # batch_size is capped at MAX_QUERY_LIMIT
+    assert cur.executed[0][2] == 1000
+    assert len(cur.executed) == 2
+
+
+@pytest.mark.web
+def test_allowed_urls_records_robots_skips():
+    report = CrawlReport()
+    kept = allowed_urls(["a", "b", "c"], _StubRobots({"b"}), report)
+    assert kept == ["a", "c"]
+    assert report.as_dict()["skipped"] == {"b": "robots.txt"}
+    assert allowed_urls(["b"], _StubRobots({"b"})) == []
+    assert allowed_urls(("a",), None) == ["a"]
+
+
+# =====================================================================
+# main()
+# =====================================================================
+
+@pytest.fixture()
+def fake_db(monkeypatch):
+    cur = _FakeCursor(pages=[[(1, "https://www.thegradcafe.com/result/1"),
+                              (2, "https://www.thegradcafe.com/result/2")]])
+    conn = _FakeConn(cur)
+    monkeypatch.setattr(result_enricher.psycopg, "connect", lambda **kw: conn)
+    monkeypatch.setattr(result_enricher, "fetch_page",
+                        lambda url, **kw: RESULT_HTML)
+    return conn
+
+
+@pytest.mark.web
+def test_main_enriches_and_commits_each_batch(fake_db):
+    assert result_enricher.main(["--ignore_robots", "--delay", "0",
+                                 "--limit", "0"]) == 2
+    assert fake_db.commits == 1
+    assert fake_db.closed
+
+
+@pytest.mark.web
+def test_main_honours_robots_txt(fake_db, monkeypatch, tmp_path):
+    class _Robots(_StubRobots):
+        def __init__(self, url, user_agent, session=None):
+            super().__init__({"https://www.thegradcafe.com/result/2"})
+
+        def get_crawl_delay(self, default):
+            return 0.0
+
+    monkeypatch.setattr(robots_checker, "RobotsChecker", _Robots)
+    monkeypatch.chdir(tmp_path)
+    assert result_enricher.main(["--delay", "0", "--rate_lock",
+                                 "/elsewhere/rate.lock"]) == 1
+    assert (tmp_path / "rate.lock").exists()
+
+
+@pytest.mark.web
+def test_main_rejects_invalid_rate_lock(fake_db, caplog):
+    with caplog.at_level("ERROR", logger="result_enricher"):
+        assert result_enricher.main(["--rate_lock", "locks/"]) == 0
+    assert "Invalid rate lock filename" in caplog.text
+    assert fake_db.commits == 0
+
+
+@pytest.mark.web
+def test_main_refused_by_robots_txt(fake_db, monkeypatch):
+    class _Robots(_StubRobots):
+        def __init__(self, url, user_agent, session=None):
+            super().__init__({result_enricher.RESULT_BASE_URL})
+
+    monkeypatch.setattr(robots_checker, "RobotsChecker", _Robots)
+    assert result_enricher.main([]) == 0
+    assert fake_db.commits == 0
+    assert fake_db.closed
+
+
+@pytest.mark.web
+def test_main_db_connect_error(monkeypatch):
+    def _raise(**kw):
+        raise psycopg.OperationalError("db down")
+
+    monkeypatch.setattr(result_enricher.psycopg, "connect", _raise)
+    assert result_enricher.main() == 0
+
+
+@pytest.mark.web
+def test_main_db_error_rolls_back(fake_db):
+    def _fail(query, params_list):
+        raise psycopg.Error("update failed")
+
+    fake_db.cursor().executemany = _fail
+    assert result_enricher.main(["--ignore_robots", "--delay", "0"]) == 0
+    assert fake_db.rolled_back
+
+
+# =====================================================================
+# DB integration – require real PostgreSQL (auto-skip if absent)
+# =====================================================================
+
+@pytest.mark.db
+def test_enrichment_fills_only_missing_columns(db_conn):
+    conn, cur = db_conn
+    url = f"https://test.example.com/result/{uuid.uuid4()}"
+    cur.execute(
+        "INSERT INTO applicants (url, gpa, degree, us_or_international) "
+        "VALUES (%s, %s, %s, %s)", (url, 3.2, "Masters", ""))
+
+    batches = list(enrich_batches(cur, [[url]], lambda u: RESULT_HTML,
+                                  RateLimiter(0)))
+    assert batches == [EnrichedBatch(1, 1, 1)]
+    cur.execute("SELECT gpa, gre, degree, us_or_international FROM applicants "
+                "WHERE url = %s", (url,))
+    gpa, gre, degree, origin = cur.fetchone()
+    assert gpa == pytest.approx(3.2)
+    assert gre == 325.0
+    assert (degree, origin) == ("Masters", "International")
+
+
+@pytest.mark.db
+def test_enriched_rows_are_not_fetched_again(db_conn):
+    conn, cur = db_conn
+    url = f"https://test.example.com/result/{uuid.uuid4()}"
+    cur.execute("INSERT INTO applicants (url) VALUES (%s) RETURNING p_id",
+                (url,))
+    p_id = cur.fetchone()[0]
+    assert list(iter_incomplete(conn, from_id=p_id - 1)) == [[url]]
+
+    list(enrich_batches(cur, [[url]], lambda u: "<html></html>",
+                        RateLimiter(0)))
+    cur.execute("SELECT enriched_at IS NOT NULL FROM applicants "
+                "WHERE url = %s", (url,))
+    assert cur.fetchone()[0]
+    assert list(iter_incomplete(conn, from_id=p_id - 1)) == []
@@ -1,8 +1,12 @@
 """Tests for RobotsChecker — robots.txt compliance checker."""
 
+from urllib.error import HTTPError
+
 import pytest
 
-from robots_checker import RobotsChecker
+import robots_checker
+from conftest import FakeHttpResponse
+from robots_checker import CachedRobots, RobotsCache, RobotsChecker
 
 
 @pytest.mark.web
@@ -29,6 +33,7 @@ def test_init_read_exception_warns(monkeypatch, caplog):
     with caplog.at_level("WARNING", logger="robots_checker"):
         checker = RobotsChecker("https://example.com/")
     assert checker.crawl_delay is None
+    assert checker.fetch_error == "connection refused"
     assert "Could not fetch robots.txt" in caplog.text
 
 
@@ -45,6 +50,7 @@ def test_can_fetch_delegates(monkeypatch):
     monkeypatch.setattr(checker.parser, "can_fetch", lambda ua, url: True)
     assert checker.can_fetch("https://example.com/page") is True
 
+    checker = RobotsChecker("https://example.com/")
     monkeypatch.setattr(checker.parser, "can_fetch", lambda ua, url: False)
     assert checker.can_fetch("https://example.com/page") is False
 
@@ -72,4 +78,189 @@ def test_get_crawl_delay_returns_default(monkeypatch):
         lambda self, ua: None,
     )
     checker = RobotsChecker("https://example.com/")
-    assert checker.get_crawl_delay(0.5) == 0.5
\ No newline at end of file
+    assert checker.get_crawl_delay(0.5) == 0.5
+
+# =====================================================================
+# Memoized can_fetch and RobotsCache
+# =====================================================================
+
+_ROBOTS = "User-agent: *\nDisallow: /private\nCrawl-delay: 3\n"
+
+
+class _RobotsSession:
+    """HttpSession stub serving one robots.txt and counting requests."""
+    def __init__(self, body=_ROBOTS, status=200, headers=None):
+        self.response = FakeHttpResponse(body, status, headers)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(url)
+        return self.response
+
+
+class _Clock:
+    """Stand-in for ``robots_checker.time``."""
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(robots_checker, "time", fake)
+    return fake
+
+
+@pytest.mark.web
+def test_can_fetch_memoizes_per_rule_prefix(monkeypatch):
+    checker = RobotsChecker("https://example.com/survey/",
+                            response=CachedRobots(200, _ROBOTS, 0))
+    calls = []
+    real = checker.parser.can_fetch
+    monkeypatch.setattr(checker.parser, "can_fetch",
+                        lambda ua, url: calls.append(url) or real(ua, url))
+    for page in range(1, 6):
+        assert checker.can_fetch(f"https://example.com/survey/?page={page}")
+    assert checker.can_fetch("https://example.com/private/x") is False
+    assert checker.can_fetch("https://example.com/private?y") is False
+    # "/private" is the longest rule: URLs are keyed on 8 characters
+    assert len(calls) == 2
+    assert checker.get_crawl_delay() == 3
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("status, allowed", [(403, False), (404, True),
+                                             (503, False)])
+def test_checker_from_response_statuses(status, allowed):
+    checker = RobotsChecker("https://example.com/",
+                            response=CachedRobots(status, "", 0))
+    assert checker.can_fetch("https://example.com/page") is allowed
+
+
+@pytest.mark.web
+def test_cache_shares_one_checker_per_host_and_agent(clock):
+    cache = RobotsCache()
+    session = _RobotsSession()
+    first = cache.get("https://example.com/survey/", "Bot", session)
+    assert cache.get("https://example.com/other", "Bot", session) is first
+    assert cache.get("https://example.com/", "Other", session) is not first
+    assert session.requests == ["https://example.com/robots.txt"]
+
+
+@pytest.mark.web
+def test_cache_persists_to_disk(clock, tmp_path):
+    RobotsCache(str(tmp_path)).get("https://example.com/", "Bot",
+                                   _RobotsSession())
+    session = _RobotsSession()
+    checker = RobotsCache(str(tmp_path)).get("https://example.com/", "Bot",
+                                             session)
+    assert session.requests == []
+    assert checker.can_fetch("https://example.com/private") is False
+
+
+@pytest.mark.web
+def test_cache_ttl_expires_entries(clock, tmp_path):
+    cache = RobotsCache(str(tmp_path), ttl=60)
+    session = _RobotsSession()
+    cache.get("https://example.com/", "Bot", session)
+    clock.now += 59
+    cache.get("https://example.com/", "Bot", session)
+    assert len(session.requests) == 1
+    clock.now += 1
+    cache.get("https://example.com/", "Bot", session)
+    assert len(session.requests) == 2
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("headers, lifetime", [
+    ({"Cache-Control": "public, max-age=30"}, 30),
+    ({"Cache-Control": "max-age=999999"}, 60),
+    ({"Cache-Control": "no-store"}, 0),
+    ({"Expires": "Thu, 01 Jan 1970 00:00:00 GMT"}, 0),
+    ({"Expires": "not a date"}, 0),
+    ({}, 60),
+])
+def test_cache_respects_http_cache_headers(clock, headers, lifetime):
+    cache = RobotsCache(ttl=60)
+    assert cache._lifetime(headers) == lifetime
+
+
+@pytest.mark.web
+def test_cache_expires_header_in_the_future(clock):
+    clock.now = 0.0
+    cache = RobotsCache(ttl=60)
+    assert cache._lifetime({"Expires": "Thu, 01 Jan 1970 00:00:20 GMT"}) == 20
+
+
+@pytest.mark.web
+def test_cache_does_not_keep_server_errors(clock, tmp_path):
+    cache = RobotsCache(str(tmp_path))
+    session = _RobotsSession("", status=503)
+    checker = cache.get("https://example.com/", "Bot", session)
+    assert checker.can_fetch("https://example.com/") is False
+    assert checker.fetch_error == "robots.txt returned HTTP 503"
+    cache.get("https://example.com/", "Bot", session)
+    assert len(session.requests) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.web
+def test_cache_unreachable_host_disallows(clock, caplog):
+    class _Down:
+        def get(self, url, headers=None):
+            raise OSError("connection refused")
+
+    with caplog.at_level("WARNING", logger="robots_checker"):
+        checker = RobotsCache().get("https://example.com/", "Bot", _Down())
+    assert checker.can_fetch("https://example.com/") is False
+    assert checker.fetch_error == "connection refused"
+    assert "Could not fetch robots.txt" in caplog.text
+
+
+@pytest.mark.web
+def test_cache_downloads_with_urlopen_without_session(clock, monkeypatch):
+    class _Page:
+        status = 200
+        headers = {"Cache-Control": "max-age=10"}
+
+        def read(self):
+            return _ROBOTS.encode("utf-8")
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+    seen = []
+    monkeypatch.setattr(
+        robots_checker, "urlopen",
+        lambda req, timeout: seen.append((req.get_header("User-agent"),
+                                          timeout)) or _Page())
+    cache = RobotsCache(timeout=7.5)
+    assert cache.get("https://example.com/", "Bot").get_crawl_delay() == 3
+    assert seen == [("Bot", 7.5)]
+    assert RobotsCache().timeout == robots_checker.DEFAULT_ROBOTS_TIMEOUT
+
+    def _forbidden(req, timeout):
+        raise HTTPError(req.full_url, 403, "Forbidden", {}, None)
+
+    monkeypatch.setattr(robots_checker, "urlopen", _forbidden)
+    checker = cache.get("https://other.example/", "Bot")
+    assert checker.can_fetch("https://other.example/") is False
+
+
+@pytest.mark.web
+def test_cache_invalidate_forgets_host(clock, tmp_path):
+    cache = RobotsCache(str(tmp_path))
+    session = _RobotsSession()
+    cache.get("https://example.com/", "Bot", session)
+    cache.invalidate("https://example.com/x")
+    cache.invalidate("https://example.com/x")
+    assert list(tmp_path.iterdir()) == []
+    cache.get("https://example.com/", "Bot", session)
+    assert len(session.requests) == 2
+    RobotsCache().invalidate("https://example.com/")
@@ -5,19 +5,26 @@ Only network I/O (``urlopen``) is stubbed; ``fetch_page``, ``parse_survey``,
 real against crafted HTML.
 """
 
+import itertools
 import json
 import sys
+from http.client import IncompleteRead
 
 import pytest
 
-from conftest import FakeResponse
+from applicant_record import ApplicantRecord
+from conftest import FakeHttpResponse, FakeResponse, FakeSession
 
 from scrape import (
-    fetch_page, parse_survey, parse_main_row, parse_detail_row,
-    get_max_pages, scrape_data, main,
+    fetch_page, parse_page, parse_survey, get_max_pages, scrape_data, main,
 )
+from survey_rows import parse_detail_row, parse_main_row
 from bs4 import BeautifulSoup
+import fetch_retry
+import rate_limiter
 import scrape
+from fetch_retry import CrawlReport
+import survey_rows
 
 
 # ---------------------------------------------------------------------------
@@ -180,16 +187,60 @@ def test_parse_detail_row_appends_comments():
     assert any("Very happy" in c for c in result["comments"])
 
 
+# =====================================================================
+# _classify_part tests — compiled classifier vs. the original rules
+# =====================================================================
+
+def _reference_classify(part):
+    """The original prefix/regex/keyword rules the compiled classifier replaced."""
+    import re  # pylint: disable=import-outside-toplevel
+    part_lower = part.lower()
+    if re.match(r'^(fall|spring|summer|winter)\s+\d{4}$', part_lower):
+        return ("term", part)
+    if part_lower in {"international", "american"}:
+        return ("US/International", part_lower.capitalize())
+    if re.match(r'^gpa\s+\d+(\.\d+)?$', part_lower):
+        return ("GPA", part)
+    for prefix, field in [("gre v", "GRE V"), ("gre aw", "GRE AW"),
+                          ("gre q", "GRE Q"), ("gre", "GRE")]:
+        if part_lower.startswith(prefix):
+            return (field, part)
+    if (any(x in part_lower for x in
+            ["accepted", "rejected", "interview", "wait"])
+            and len(part) < 50):
+        return ("_status", part)
+    return None
+
+
+_CLASSIFY_CORPUS = [
+    "Fall 2026", "SPRING 2025", "Summer  2024", "winter 2023", "Fall 26",
+    "Fall 2026 start", "Autumn 2026", "fall\t2026", "Fall 2026\n",
+    "International", "AMERICAN", "American ", "american\n", "Americans",
+    "GPA 3.85", "gpa 4", "GPA 3.", "GPA: 3.5", "GPA 3.5 (unweighted)",
+    "GRE V 160", "GRE AW 4.5", "GRE Q 170", "GRE 320", "GREAT school",
+    "gre", "Greek studies", "GRE Vocab", "G R E",
+    "Accepted on 1 Feb", "Rejected", "Interview invite", "Waitlisted",
+    "awaiting decision", "I was accepted " + "x" * 40, "Accepted" + "!" * 41,
+    "", "Loved the campus", "ÉCOLE", "Ｇpa 3.5", "fall ２０２６",
+]
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("part", _CLASSIFY_CORPUS)
+def test_classify_part_matches_reference_rules(part):
+    assert survey_rows._classify_part(part) == _reference_classify(part)
+
+
 # =====================================================================
 # parse_survey tests
 # =====================================================================
 
 @pytest.mark.web
-def test_parse_survey_returns_list_of_dicts():
+def test_parse_survey_returns_list_of_records():
     results = parse_survey(SAMPLE_HTML)
     assert len(results) == 2
-    assert isinstance(results[0], dict)
-    assert isinstance(results[1], dict)
+    assert isinstance(results[0], ApplicantRecord)
+    assert isinstance(results[1], ApplicantRecord)
 
 
 @pytest.mark.web
@@ -219,6 +270,39 @@ def test_get_max_pages_no_pagination():
     assert get_max_pages(html) == 1
 
 
+# =====================================================================
+# parse_page tests
+# =====================================================================
+
+@pytest.mark.web
+def test_parse_page_returns_rows_and_pagination():
+    page = parse_page(SAMPLE_HTML)
+    assert page.rows == parse_survey(SAMPLE_HTML)
+    assert page.max_page == get_max_pages(SAMPLE_HTML) == 5
+
+
+@pytest.mark.web
+def test_parse_page_without_table_keeps_pagination():
+    page = parse_page('<p>empty</p><a href="?page=9">9</a>')
+    assert page == ([], 9)
+
+
+@pytest.mark.web
+def test_scrape_data_parses_first_page_once(monkeypatch):
+    calls = []
+    real = scrape._parse_document
+
+    def _counting(html, parser):
+        calls.append(parser)
+        return real(html, parser)
+
+    monkeypatch.setattr(scrape, "_parse_document", _counting)
+    monkeypatch.setattr(scrape, "fetch_page", lambda url, **kw: SAMPLE_HTML)
+    results = scrape_data(max_pages=1, delay=0, ignore_robots=True)
+    assert len(results) == 2
+    assert len(calls) == 1
+
+
 # =====================================================================
 # fetch_page test — monkeypatch urlopen at transport level
 # =====================================================================
@@ -226,11 +310,26 @@ def test_get_max_pages_no_pagination():
 @pytest.mark.web
 def test_fetch_page_calls_urlopen_and_decodes(monkeypatch):
     sample = "<html><body>Hello</body></html>"
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(sample))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(sample))
     result = fetch_page("https://example.com")
     assert result == sample
 
 
+@pytest.mark.web
+def test_fetch_page_passes_read_timeout_to_urlopen(monkeypatch):
+    timeouts = []
+
+    def _urlopen(req, timeout=None):
+        timeouts.append(timeout)
+        return FakeResponse("ok")
+
+    monkeypatch.setattr(scrape, "urlopen", _urlopen)
+    fetch_page("https://example.com")
+    fetch_page("https://example.com", timeout=(1.0, 7.0))
+    fetch_page("https://example.com", timeout=4.0)
+    assert timeouts == [scrape.DEFAULT_TIMEOUT[1], 7.0, 4.0]
+
+
 # =====================================================================
 # Edge cases — additional branch coverage
 # =====================================================================
@@ -401,7 +500,7 @@ _TWO_PAGE_HTML_P2 = """<html><body>
 
 @pytest.mark.web
 def test_scrape_data_ignore_robots(monkeypatch):
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(_SIMPLE_HTML))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(_SIMPLE_HTML))
     results = scrape_data(
         base_url="https://example.com/survey/",
         max_pages=1, delay=0, ignore_robots=True,
@@ -413,6 +512,8 @@ def test_scrape_data_ignore_robots(monkeypatch):
 @pytest.mark.web
 def test_scrape_data_robots_disallows(monkeypatch):
     class _FakeRobots:
+        fetch_error = None
+
         def __init__(self, *a, **kw):
             pass
         def can_fetch(self, url):
@@ -432,9 +533,33 @@ def test_scrape_data_robots_disallows(monkeypatch):
     assert results == []
 
 
+@pytest.mark.web
+def test_scrape_data_unreadable_robots_txt_aborts(monkeypatch, caplog):
+    class _FakeRobots:
+        fetch_error = "robots.txt returned HTTP 503"
+
+        def __init__(self, *a, **kw):
+            pass
+
+    class _FakeModule:
+        DEFAULT_USER_AGENT = "FakeAgent"
+        RobotsChecker = _FakeRobots
+
+    monkeypatch.setattr(scrape, "robots_checker", _FakeModule)
+    with caplog.at_level("ERROR", logger="scrape"):
+        results = scrape_data(
+            base_url="https://example.com/survey/",
+            max_pages=1, delay=0, ignore_robots=False,
+        )
+    assert results == []
+    assert "HTTP 503" in caplog.text
+
+
 @pytest.mark.web
 def test_scrape_data_crawl_delay_override(monkeypatch):
     class _FakeRobots:
+        fetch_error = None
+
         def __init__(self, *a, **kw):
             pass
         def can_fetch(self, url):
@@ -447,10 +572,10 @@ def test_scrape_data_crawl_delay_override(monkeypatch):
         RobotsChecker = _FakeRobots
 
     monkeypatch.setattr(scrape, "robots_checker", _FakeModule)
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(_SIMPLE_HTML))
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(_SIMPLE_HTML))
 
     delays = []
-    monkeypatch.setattr(scrape.time, "sleep", lambda d: delays.append(d))
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: delays.append(d))
 
     results = scrape_data(
         base_url="https://example.com/survey/",
@@ -463,14 +588,14 @@ def test_scrape_data_crawl_delay_override(monkeypatch):
 def test_scrape_data_multi_page(monkeypatch):
     pages = {"n": 0}
 
-    def _urlopen(req):
+    def _urlopen(req, timeout=None):
         pages["n"] += 1
         if pages["n"] == 1:
             return FakeResponse(_TWO_PAGE_HTML_P1)
         return FakeResponse(_TWO_PAGE_HTML_P2)
 
     monkeypatch.setattr(scrape, "urlopen", _urlopen)
-    monkeypatch.setattr(scrape.time, "sleep", lambda d: None)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
 
     results = scrape_data(
         base_url="https://example.com/survey/",
@@ -480,17 +605,19 @@ def test_scrape_data_multi_page(monkeypatch):
 
 
 @pytest.mark.web
-def test_scrape_data_page_error_continues(monkeypatch):
+@pytest.mark.parametrize("error", [
+    OSError("Network error on page 2"), IncompleteRead(b"<html>", 4096)])
+def test_scrape_data_page_error_continues(monkeypatch, error):
     pages = {"n": 0}
 
-    def _urlopen(req):
+    def _urlopen(req, timeout=None):
         pages["n"] += 1
         if pages["n"] == 1:
             return FakeResponse(_TWO_PAGE_HTML_P1)
-        raise OSError("Network error on page 2")
+        raise error
 
     monkeypatch.setattr(scrape, "urlopen", _urlopen)
-    monkeypatch.setattr(scrape.time, "sleep", lambda d: None)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
 
     results = scrape_data(
         base_url="https://example.com/survey/",
@@ -505,6 +632,8 @@ def test_scrape_data_per_page_robots_skip(monkeypatch):
     call_count = {"n": 0}
 
     class _FakeRobots:
+        fetch_error = None
+
         def __init__(self, *a, **kw):
             pass
         def can_fetch(self, url):
@@ -520,15 +649,19 @@ def test_scrape_data_per_page_robots_skip(monkeypatch):
         RobotsChecker = _FakeRobots
 
     monkeypatch.setattr(scrape, "robots_checker", _FakeModule)
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(_TWO_PAGE_HTML_P1))
-    monkeypatch.setattr(scrape.time, "sleep", lambda d: None)
+    monkeypatch.setattr(scrape, "urlopen", lambda req, timeout=None: FakeResponse(_TWO_PAGE_HTML_P1))
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
 
+    report = CrawlReport()
     results = scrape_data(
         base_url="https://example.com/survey/",
         max_pages=2, delay=0, ignore_robots=False,
+        records=scrape.CrawlRecords(report=report),
     )
     # Only page 1 results
     assert len(results) == 1
+    assert report.skipped == {
+        "https://example.com/survey/?page=2": "robots.txt"}
 
 
 # =====================================================================
@@ -537,7 +670,7 @@ def test_scrape_data_per_page_robots_skip(monkeypatch):
 
 @pytest.mark.web
 def test_main_stdout_json(monkeypatch, capsys):
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(_SIMPLE_HTML))
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: FakeSession(_SIMPLE_HTML))
     monkeypatch.setattr(
         sys, "argv", ["scrape.py", "--pages", "1", "--ignore_robots"]
     )
@@ -551,7 +684,7 @@ def test_main_stdout_json(monkeypatch, capsys):
 
 @pytest.mark.web
 def test_main_file_output(monkeypatch, tmp_path):
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(_SIMPLE_HTML))
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: FakeSession(_SIMPLE_HTML))
     monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(
         sys, "argv", ["scrape.py", "--pages", "1", "--ignore_robots", "-o", "out.json"]
@@ -568,7 +701,7 @@ def test_main_file_output(monkeypatch, tmp_path):
 
 @pytest.mark.web
 def test_main_invalid_output_filename(monkeypatch, caplog):
-    monkeypatch.setattr(scrape, "urlopen", lambda req: FakeResponse(_SIMPLE_HTML))
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: FakeSession(_SIMPLE_HTML))
     monkeypatch.setattr(
         sys, "argv", ["scrape.py", "--pages", "1", "--ignore_robots", "-o", "/"]
     )
@@ -577,3 +710,788 @@ def test_main_invalid_output_filename(monkeypatch, caplog):
         main()
 
     assert "Invalid output filename" in caplog.text
+
+
+# =====================================================================
+# scrape_data(workers=N) — concurrent fetching
+# =====================================================================
+
+def _page_html(page_num, last_page):
+    """Build a one-row survey page whose result URL encodes *page_num*."""
+    links = "".join(f'<a href="?page={n}">{n}</a>'
+                    for n in range(1, last_page + 1))
+    return f"""<html><body>
+<table><tbody>
+  <tr>
+    <td>School {page_num}</td><td>CS | PhD</td><td>Jan 1, 2026</td>
+    <td>Accepted</td><td><a href="/result/{page_num}">V</a></td>
+  </tr>
+</tbody></table>
+{links}
+</body></html>"""
+
+
+@pytest.mark.web
+def test_scrape_data_workers_returns_page_order(monkeypatch):
+    import threading
+    import time as real_time
+
+    def _urlopen(req, timeout=None):
+        url = req.full_url
+        page_num = int(url.split("page=")[1]) if "page=" in url else 1
+        # Later pages answer first, so completion order != page order
+        real_time.sleep(0.01 * (6 - page_num))
+        return FakeResponse(_page_html(page_num, 5))
+
+    threads = set()
+    real_fetch = scrape.fetch_page
+
+    def _tracking_fetch(url, **kwargs):
+        threads.add(threading.get_ident())
+        return real_fetch(url, **kwargs)
+
+    monkeypatch.setattr(scrape, "urlopen", _urlopen)
+    monkeypatch.setattr(scrape, "fetch_page", _tracking_fetch)
+
+    results = scrape_data(
+        base_url="https://example.com/survey/",
+        max_pages=5, delay=0, ignore_robots=True, workers=4,
+    )
+    assert [r["url"].rsplit("/", 1)[1] for r in results] == [
+        "1", "2", "3", "4", "5"]
+    assert len(threads) > 1
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("error", [
+    OSError("Network error on page 2"), IncompleteRead(b"<html>", 4096)])
+def test_scrape_data_workers_page_error_continues(monkeypatch, error):
+    def _urlopen(req, timeout=None):
+        if "page=2" in req.full_url:
+            raise error
+        page_num = int(req.full_url.split("page=")[1]) if "page=" in req.full_url else 1
+        return FakeResponse(_page_html(page_num, 3))
+
+    monkeypatch.setattr(scrape, "urlopen", _urlopen)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+
+    results = scrape_data(
+        base_url="https://example.com/survey/",
+        max_pages=3, delay=0, ignore_robots=True, workers=2,
+    )
+    assert [r["url"].rsplit("/", 1)[1] for r in results] == ["1", "3"]
+
+
+@pytest.mark.web
+def test_scrape_data_workers_share_rate_limiter(monkeypatch):
+    acquired = []
+
+    class _FakeLimiter:
+        def __init__(self, interval, _schedule=None):
+            self.interval = interval
+
+        def acquire(self):
+            acquired.append(self.interval)
+            return 0.0
+
+    monkeypatch.setattr(scrape, "RateLimiter", _FakeLimiter)
+    monkeypatch.setattr(
+        scrape, "urlopen",
+        lambda req, timeout=None: FakeResponse(_page_html(1, 3)),
+    )
+
+    scrape_data(
+        base_url="https://example.com/survey/",
+        max_pages=3, delay=0.25, ignore_robots=True, workers=3,
+    )
+    # One slot for page 1 plus one per remaining page, all at the same pace
+    assert acquired == [0.25, 0.25, 0.25]
+
+
+@pytest.mark.web
+def test_main_workers_flag(monkeypatch, capsys):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(
+        sys, "argv", ["scrape.py", "--ignore_robots", "--workers", "4"]
+    )
+    main()
+    assert seen["workers"] == 4
+    assert json.loads(capsys.readouterr().out) == []
+
+
+@pytest.mark.web
+def test_main_shares_session_with_scrape_data(monkeypatch, capsys):
+    seen = {}
+    session = FakeSession(_SIMPLE_HTML)
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: session)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--ignore_robots"])
+    main()
+    assert seen["session"] is session
+
+
+@pytest.mark.web
+def test_scrape_data_uses_session(monkeypatch):
+    session = FakeSession(_TWO_PAGE_HTML_P1)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    results = scrape_data(
+        base_url="https://example.com/survey/",
+        max_pages=2, delay=0, ignore_robots=True, session=session,
+    )
+    assert len(results) == 2
+    assert [url for url, _ in session.requests] == [
+        "https://example.com/survey/",
+        "https://example.com/survey/?page=2",
+    ]
+
+
+# =====================================================================
+# main() — page cache and offline replay
+# =====================================================================
+
+@pytest.mark.web
+def test_main_offline_replays_cached_pages(monkeypatch, tmp_path, capsys):
+    import http_session
+    from page_cache import PageCache
+
+    cache = PageCache(str(tmp_path / "pages"))
+    cache.store("https://www.thegradcafe.com/survey/",
+                _TWO_PAGE_HTML_P1.encode("utf-8"), {})
+    monkeypatch.chdir(tmp_path)
+
+    def _no_network(*a, **kw):
+        raise AssertionError("offline mode must not touch the network")
+
+    monkeypatch.setattr(http_session.http.client.HTTPSConnection, "request", _no_network)
+    monkeypatch.setattr(
+        sys, "argv", ["scrape.py", "--pages", "2", "--offline",
+                      "--cache_dir", "pages"]
+    )
+    main()
+    data = json.loads(capsys.readouterr().out)
+    # Page 1 replayed from cache; page 2 was never cached and is skipped
+    assert [row["url"] for row in data] == [
+        "https://www.thegradcafe.com/result/1"]
+
+
+@pytest.mark.web
+def test_main_cache_dir_creates_cached_session(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(
+        sys, "argv", ["scrape.py", "--ignore_robots", "--cache_dir", "c"]
+    )
+    main()
+    assert seen["session"].cache.directory == str(tmp_path / "c")
+    assert seen["session"].offline is False
+
+
+@pytest.mark.web
+def test_main_invalid_cache_dir(monkeypatch, caplog):
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--cache_dir", "/"])
+    with caplog.at_level("ERROR", logger="scrape"):
+        assert main() == []
+    assert "Invalid cache directory" in caplog.text
+
+
+# =====================================================================
+# iter_pages / iter_results — streaming crawl
+# =====================================================================
+
+def _page_urlopen(last_page, fetched):
+    """urlopen stub serving ``_page_html`` pages and recording URLs."""
+    def _urlopen(req, timeout=None):
+        url = req.full_url
+        fetched.append(url)
+        page_num = int(url.split("page=")[1]) if "page=" in url else 1
+        return FakeResponse(_page_html(page_num, last_page))
+    return _urlopen
+
+
+@pytest.mark.web
+def test_iter_pages_yields_each_page_before_fetching_the_next(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(scrape, "urlopen", _page_urlopen(3, fetched))
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+
+    pages = scrape.iter_pages(base_url="https://example.com/survey/",
+                              delay=0, ignore_robots=True)
+    page_num, rows = next(pages)
+    assert page_num == 1
+    assert rows[0]["url"].endswith("/result/1")
+    assert len(fetched) == 1
+
+    assert [num for num, _ in pages] == [2, 3]
+    assert len(fetched) == 3
+
+
+@pytest.mark.web
+def test_iter_results_yields_rows_in_page_order(monkeypatch):
+    monkeypatch.setattr(scrape, "urlopen", _page_urlopen(4, []))
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    rows = scrape.iter_results("https://example.com/survey/", 3, 0,
+                               ignore_robots=True)
+    assert [r["url"].rsplit("/", 1)[1] for r in rows] == ["1", "2", "3"]
+
+
+@pytest.mark.web
+def test_iter_pages_robots_abort_yields_nothing(monkeypatch):
+    monkeypatch.setattr(scrape, "check_robots", lambda *a: None)
+    assert list(scrape.iter_pages(base_url="https://example.com/survey/")) == []
+
+
+@pytest.mark.web
+def test_iter_pages_workers_prefetch_is_bounded(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(scrape, "urlopen", _page_urlopen(20, fetched))
+
+    pages = scrape.iter_pages(base_url="https://example.com/survey/",
+                              delay=0, ignore_robots=True, workers=2)
+    assert [num for num, _ in itertools.islice(pages, 2)] == [1, 2]
+    pages.close()
+    # Page 1, the 2 * workers prefetch window, and one refill
+    assert len(fetched) <= 1 + 2 * scrape._PREFETCH_PER_WORKER + 1
+
+
+# =====================================================================
+# main() — NDJSON and gzip output
+# =====================================================================
+
+def _three_page_session():
+    """FakeSession-like stub serving ``_page_html`` pages 1..3."""
+    class _Session(FakeSession):
+        def get(self, url, headers=None):
+            self.requests.append((url, headers))
+            page_num = int(url.split("page=")[1]) if "page=" in url else 1
+            return FakeHttpResponse(_page_html(page_num, 3))
+    return _Session("")
+
+
+@pytest.mark.web
+def test_main_ndjson_streams_rows_per_page(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "HttpSession",
+                        lambda *a, **kw: _three_page_session())
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    monkeypatch.setattr(sys, "argv", [
+        "scrape.py", "--pages", "3", "--ignore_robots", "--delay", "0",
+        "--format", "ndjson", "-o", "out.ndjson"])
+    assert main() == []
+    lines = (tmp_path / "out.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["url"].rsplit("/", 1)[1] for line in lines] == [
+        "1", "2", "3"]
+
+
+@pytest.mark.web
+def test_main_ndjson_keeps_completed_pages_on_failure(monkeypatch, tmp_path):
+    import gzip
+
+    def _failing_pages(**kwargs):
+        yield 1, [{"url": "u1"}]
+        yield 2, [{"url": "u2"}]
+        raise KeyboardInterrupt
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: FakeSession(""))
+    monkeypatch.setattr(scrape, "iter_pages", _failing_pages)
+    monkeypatch.setattr(sys, "argv", [
+        "scrape.py", "--format", "ndjson", "--compress", "gzip",
+        "-o", "out.ndjson.gz"])
+    with pytest.raises(KeyboardInterrupt):
+        main()
+    with gzip.open(tmp_path / "out.ndjson.gz", "rt", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [{"url": "u1"}, {"url": "u2"}]
+
+
+@pytest.mark.web
+def test_main_json_gzip_output(monkeypatch, tmp_path):
+    import gzip
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: FakeSession(_SIMPLE_HTML))
+    monkeypatch.setattr(sys, "argv", [
+        "scrape.py", "--pages", "1", "--ignore_robots", "--compress", "gzip",
+        "-o", "out.json.gz"])
+    results = main()
+    with gzip.open(tmp_path / "out.json.gz", "rt", encoding="utf-8") as f:
+        assert json.load(f) == results
+    assert len(results) == 1
+
+
+@pytest.mark.web
+def test_main_compress_requires_output(monkeypatch, caplog):
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--compress", "gzip"])
+    with caplog.at_level("ERROR", logger="scrape"):
+        assert main() == []
+    assert "requires --output" in caplog.text
+
+
+# =====================================================================
+# main() — resumable NDJSON crawls
+# =====================================================================
+
+def _ndjson_argv(*extra):
+    return ["scrape.py", "--pages", "3", "--ignore_robots", "--delay", "0",
+            "--format", "ndjson", "-o", "out.ndjson", *extra]
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("compress", ["none", "gzip"])
+def test_main_resume_skips_completed_pages(monkeypatch, tmp_path, compress):
+    import gzip
+
+    class _Interrupted(type(_three_page_session())):
+        def get(self, url, headers=None):
+            if "page=3" in url:
+                raise KeyboardInterrupt
+            return super().get(url, headers)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: _Interrupted(""))
+    monkeypatch.setattr(sys, "argv", _ndjson_argv("--compress", compress))
+    with pytest.raises(KeyboardInterrupt):
+        main()
+    assert (tmp_path / "out.ndjson.checkpoint").exists()
+
+    session = _three_page_session()
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: session)
+    monkeypatch.setattr(sys, "argv",
+                        _ndjson_argv("--compress", compress, "--resume"))
+    assert main() == []
+    assert [url for url, _ in session.requests] == [
+        "https://www.thegradcafe.com/survey/?page=3"]
+    opener = gzip.open if compress == "gzip" else open
+    with opener(tmp_path / "out.ndjson", "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["url"].rsplit("/", 1)[1] for line in f] == [
+            "1", "2", "3"]
+    assert not (tmp_path / "out.ndjson.checkpoint").exists()
+
+
+@pytest.mark.web
+def test_main_keeps_checkpoint_when_pages_failed(monkeypatch, tmp_path,
+                                                 caplog):
+    class _PageTwoDown(type(_three_page_session())):
+        def get(self, url, headers=None):
+            if "page=2" in url:
+                raise OSError("connection reset")
+            return super().get(url, headers)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: _PageTwoDown(""))
+    monkeypatch.setattr(sys, "argv", _ndjson_argv("--retries", "0"))
+    with caplog.at_level("WARNING", logger="scrape"):
+        main()
+    assert "1 page(s) failed" in caplog.text
+    assert "page=2" in caplog.text
+    assert (tmp_path / "out.ndjson.checkpoint").exists()
+
+    session = _three_page_session()
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: session)
+    monkeypatch.setattr(sys, "argv", _ndjson_argv("--resume"))
+    main()
+    assert [url for url, _ in session.requests] == [
+        "https://www.thegradcafe.com/survey/?page=2"]
+    assert not (tmp_path / "out.ndjson.checkpoint").exists()
+
+
+@pytest.mark.web
+def test_main_resume_without_checkpoint_starts_over(monkeypatch, tmp_path,
+                                                    caplog):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    session = _three_page_session()
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: session)
+    monkeypatch.setattr(sys, "argv", _ndjson_argv("--resume"))
+    with caplog.at_level("WARNING", logger="scrape"):
+        main()
+    assert "No usable checkpoint" in caplog.text
+    assert len(session.requests) == 3
+    assert len((tmp_path / "out.ndjson").read_text().splitlines()) == 3
+
+
+@pytest.mark.web
+def test_main_resume_refetches_page_one_when_interrupted_early(
+        monkeypatch, tmp_path):
+    from crawl_output import CrawlCheckpoint
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    (tmp_path / "out.ndjson").write_bytes(b"")
+    CrawlCheckpoint(str(tmp_path / "out.ndjson.checkpoint")).start(2)
+    session = _three_page_session()
+    monkeypatch.setattr(scrape, "HttpSession", lambda *a, **kw: session)
+    monkeypatch.setattr(sys, "argv", _ndjson_argv("--resume"))
+    main()
+    # The page count recorded at crawl start wins over --pages
+    assert len(session.requests) == 2
+
+
+@pytest.mark.web
+def test_main_resume_requires_ndjson_output(monkeypatch, caplog):
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--resume", "-o", "x.json"])
+    with caplog.at_level("ERROR", logger="scrape"):
+        assert main() == []
+    assert "--resume requires" in caplog.text
+
+
+@pytest.mark.web
+def test_main_ndjson_to_stdout_has_no_checkpoint(monkeypatch, tmp_path,
+                                                 capsysbinary):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    monkeypatch.setattr(scrape, "HttpSession",
+                        lambda *a, **kw: _three_page_session())
+    monkeypatch.setattr(sys, "argv", _ndjson_argv()[:-2])
+    main()
+    lines = capsysbinary.readouterr().out.splitlines()
+    assert [json.loads(line)["url"][-1] for line in lines] == ["1", "2", "3"]
+    assert list(tmp_path.iterdir()) == []
+
+
+# =====================================================================
+# Parse worker processes
+# =====================================================================
+
+@pytest.mark.web
+def test_iter_pages_parse_workers_keep_page_order(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Threads stand in for processes so coverage sees the parse stage
+    contexts = []
+
+    def _pool(max_workers, mp_context):
+        contexts.append(mp_context.get_start_method())
+        return ThreadPoolExecutor(max_workers)
+
+    monkeypatch.setattr(scrape, "ProcessPoolExecutor", _pool)
+    fetched = []
+    urlopen = _page_urlopen(6, fetched)
+
+    def _flaky_urlopen(req, timeout=None):
+        if req.full_url.endswith("page=4"):
+            raise OSError("boom")
+        return urlopen(req)
+
+    monkeypatch.setattr(scrape, "urlopen", _flaky_urlopen)
+    pages = list(scrape.iter_pages("https://example.com/survey/", delay=0,
+                                   ignore_robots=True, workers=2,
+                                   parse_workers=3))
+    assert [num for num, _ in pages] == [1, 2, 3, 5, 6]
+    assert [rows[0]["url"][-1] for _, rows in pages] == ["1", "2", "3", "5", "6"]
+    assert contexts == ["spawn"]
+
+
+@pytest.mark.web
+def test_parse_in_processes_runs_in_worker_processes():
+    pages = [(2, _page_html(2, 3)), (3, None), (4, _page_html(4, 4))]
+    parsed = list(scrape._parse_in_processes(pages, "stream", 2))
+    assert parsed[1] == (3, None)
+    assert [num for num, _ in parsed] == [2, 3, 4]
+    assert parsed[2][1] == scrape._parse_rows(_page_html(4, 4), "stream")
+
+
+@pytest.mark.web
+def test_main_parse_workers_flag(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--parse_workers", "4"])
+    main()
+    assert seen["parse_workers"] == 4
+
+
+# =====================================================================
+# Adaptive and deadline-based pacing
+# =====================================================================
+
+class _FakeClock:
+    """Stand-in for ``rate_limiter.time``; sleeping advances the clock."""
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.web
+def test_serial_crawl_absorbs_processing_time_into_delay(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(scrape, "urlopen", _page_urlopen(4, []))
+
+    for _ in scrape.iter_pages("https://example.com/survey/", delay=1.0,
+                               ignore_robots=True):
+        clock.now += 0.3    # parse/store time spent by the consumer
+    # Requests start 1s apart; only the remaining 0.7s is slept
+    assert clock.sleeps == [pytest.approx(0.7)] * 3
+
+@pytest.mark.web
+def test_iter_pages_adaptive_paces_from_responses(monkeypatch, caplog):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(scrape, "urlopen", _page_urlopen(3, []))
+    with caplog.at_level("INFO"):
+        pages = list(scrape.iter_pages("https://example.com/survey/",
+                                       delay=1.0, ignore_robots=True,
+                                       pacing=scrape.CrawlPacing(
+                                           adaptive_min_delay=0.1)))
+    assert len(pages) == 3
+    # Each healthy response shortened the wait before the next page
+    assert clock.sleeps == [pytest.approx(1 / 1.1), pytest.approx(1 / 1.2)]
+    assert "Pacing: status 200" in caplog.text
+    assert "Pacing stats: {'requests': 3" in caplog.text
+
+
+@pytest.mark.web
+def test_adaptive_limiter_never_undercuts_robots_crawl_delay(monkeypatch):
+    class _Robots:
+        def get_crawl_delay(self, default):
+            return 2.0
+
+    opts = scrape.CrawlOptions(
+        pacing=scrape.CrawlPacing(adaptive_min_delay=0.5))
+    limiter = scrape._build_limiter(0.5, _Robots(), opts)
+    assert limiter.min_interval == 2.0
+    assert scrape._build_limiter(0.5, None, opts).min_interval == 0.5
+
+
+@pytest.mark.web
+def test_main_adaptive_flags(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(sys, "argv",
+                        ["scrape.py", "--adaptive", "--min_delay", "1"])
+    main()
+    assert seen["pacing"].adaptive_min_delay == 1.0
+
+
+@pytest.mark.web
+def test_main_rate_lock_shares_schedule(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setenv(rate_limiter.RATE_LOCK_ENV, "/tmp/from-env.lock")
+    monkeypatch.setattr(sys, "argv", ["scrape.py"])
+    main()
+    assert seen["pacing"].schedule.path == "/tmp/from-env.lock"
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--rate_lock", "r.lock"])
+    main()
+    assert seen["pacing"].schedule.path == str(tmp_path / "r.lock")
+    # Like --output, --rate_lock stays in the working directory
+    monkeypatch.setattr(sys, "argv",
+                        ["scrape.py", "--rate_lock", "/etc/shared.lock"])
+    main()
+    assert seen["pacing"].schedule.path == str(tmp_path / "shared.lock")
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--offline"])
+    main()
+    assert seen["pacing"].schedule is None
+
+
+@pytest.mark.web
+def test_main_rejects_invalid_rate_lock(monkeypatch, caplog):
+    monkeypatch.setattr(scrape, "scrape_data", pytest.fail)
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--rate_lock", "locks/"])
+    with caplog.at_level("ERROR", logger="scrape"):
+        assert main() == []
+    assert "Invalid rate lock filename" in caplog.text
+
+
+@pytest.mark.web
+def test_build_limiter_uses_shared_schedule(tmp_path):
+    schedule = rate_limiter.LockFileSchedule(str(tmp_path / "rate.lock"))
+    fixed = scrape._build_limiter(0.5, None, scrape.CrawlOptions(
+        pacing=scrape.CrawlPacing(schedule=schedule)))
+    adaptive = scrape._build_limiter(0.5, None, scrape.CrawlOptions(
+        pacing=scrape.CrawlPacing(adaptive_min_delay=0.25,
+                                  schedule=schedule)))
+    assert fixed.schedule is adaptive.schedule is schedule
+
+
+# =====================================================================
+# Shared robots.txt cache
+# =====================================================================
+
+@pytest.mark.web
+def test_main_reuses_cached_robots_txt_across_runs(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    sessions = []
+
+    def _session(*a, **kw):
+        sessions.append(_three_page_session())
+        return sessions[-1]
+
+    monkeypatch.setattr(scrape, "HttpSession", _session)
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--pages", "1",
+                                      "--delay", "0", "-o", "out.json"])
+    main()
+    main()
+    robots = [[url for url, _ in s.requests if url.endswith("/robots.txt")]
+              for s in sessions]
+    assert robots == [["https://www.thegradcafe.com/robots.txt"], []]
+    assert len(list((tmp_path / ".robots_cache").iterdir())) == 1
+
+
+@pytest.mark.web
+def test_main_robots_ttl_zero_disables_cache(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--robots_ttl", "0"])
+    main()
+    assert seen["robots_cache"] is None
+
+
+@pytest.mark.web
+def test_main_invalid_robots_cache_dir(monkeypatch, caplog):
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--robots_cache_dir", "x/"])
+    with caplog.at_level("ERROR", logger="scrape"):
+        assert main() == []
+    assert "Invalid robots cache directory" in caplog.text
+
+
+# =====================================================================
+# Retries, timeouts and the crawl report
+# =====================================================================
+
+@pytest.mark.web
+def test_iter_pages_retries_transient_errors_and_reports(monkeypatch):
+    fetched = []
+    serve = _page_urlopen(3, fetched)
+    failures = {"page=2": 1, "page=3": 5}
+
+    def _flaky_urlopen(req, timeout=None):
+        for marker, left in failures.items():
+            if req.full_url.endswith(marker) and left:
+                failures[marker] -= 1
+                raise TimeoutError("read timed out")
+        return serve(req)
+
+    sleeps = []
+    monkeypatch.setattr(scrape, "urlopen", _flaky_urlopen)
+    monkeypatch.setattr(rate_limiter.time, "sleep", sleeps.append)
+    monkeypatch.setattr(fetch_retry.random, "uniform", lambda low, high: high)
+    report = CrawlReport()
+    pages = list(scrape.iter_pages(
+        base_url="https://example.com/survey/", delay=0, ignore_robots=True,
+        pacing=scrape.CrawlPacing(
+            retry=fetch_retry.RetryPolicy(attempts=3, base_delay=0.5)),
+        records=scrape.CrawlRecords(report=report)))
+    assert [num for num, _ in pages] == [1, 2]
+    assert sleeps == [0.5, 0.5, 1.0]
+    assert report.as_dict() == {
+        "fetched": 2, "retries": 3,
+        "retried": {"https://example.com/survey/?page=2": 1,
+                    "https://example.com/survey/?page=3": 2},
+        "failed": {"https://example.com/survey/?page=3": "read timed out"},
+        "skipped": {}}
+
+
+@pytest.mark.web
+def test_main_timeout_and_retry_flags(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(sys, "argv", [
+        "scrape.py", "--timeout", "9", "--connect_timeout", "2",
+        "--retries", "4"])
+    main()
+    assert seen["session"].timeout == (2.0, 9.0)
+    assert seen["pacing"].retry.attempts == 5
+
+
+# =====================================================================
+# main() — page archive
+# =====================================================================
+
+@pytest.mark.web
+def test_main_archive_dir_keeps_fetched_pages(monkeypatch, tmp_path, capsys):
+    from page_archive import PageArchive
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "HttpSession",
+                        lambda *a, **kw: _three_page_session())
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda d: None)
+    monkeypatch.setattr(sys, "argv", [
+        "scrape.py", "--pages", "2", "--ignore_robots", "--delay", "0",
+        "--archive_dir", "archive"])
+    main()
+    archive = PageArchive(str(tmp_path / "archive"))
+    assert [e.url for e in archive.entries()] == [
+        "https://www.thegradcafe.com/survey/",
+        "https://www.thegradcafe.com/survey/?page=2"]
+    assert "/result/2" in archive.load(
+        "https://www.thegradcafe.com/survey/?page=2")
+
+
+@pytest.mark.web
+def test_main_invalid_archive_dir(monkeypatch, caplog):
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--archive_dir", "/"])
+    with caplog.at_level("ERROR", logger="scrape"):
+        assert main() == []
+    assert "Invalid archive directory" in caplog.text
+
+
+@pytest.mark.web
+def test_main_robots_cache_uses_the_read_timeout(monkeypatch, tmp_path):
+    seen = {}
+
+    def _fake_scrape(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "scrape_data", _fake_scrape)
+    monkeypatch.setattr(sys, "argv", ["scrape.py", "--timeout", "12"])
+    main()
+    assert seen["robots_cache"].timeout == 12.0
@@ -0,0 +1,73 @@
+"""Tests for url_filter — the Bloom filter of stored result URLs."""
+
+import pytest
+
+from url_filter import UrlFilter
+
+
+class _PagedCursor:
+    """Serves queued fetchall pages and records the query parameters."""
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.executed = []
+
+    def execute(self, query, params):
+        self.executed.append(params)
+
+    def fetchall(self):
+        return self.pages.pop(0) if self.pages else []
+
+
+class _Conn:
+    def __init__(self, cur):
+        self._cur = cur
+
+    def cursor(self):
+        return self._cur
+
+
+@pytest.mark.web
+def test_added_urls_are_always_found():
+    urls = [f"https://www.thegradcafe.com/result/{n}" for n in range(2000)]
+    url_filter = UrlFilter(capacity=2000)
+    for url in urls:
+        url_filter.add(url)
+    assert all(url in url_filter for url in urls)
+
+
+@pytest.mark.web
+def test_false_positive_rate_stays_near_target():
+    url_filter = UrlFilter(capacity=5000, error_rate=0.01)
+    for n in range(5000):
+        url_filter.add(f"https://www.thegradcafe.com/result/{n}")
+    misses = sum(f"https://www.thegradcafe.com/result/new-{n}" in url_filter
+                 for n in range(5000))
+    assert misses < 5000 * 0.03
+    assert (url_filter.size, url_filter.hashes) == (47926, 7)
+
+
+@pytest.mark.web
+def test_empty_filter_contains_nothing():
+    url_filter = UrlFilter(capacity=0)
+    assert "https://www.thegradcafe.com/result/1" not in url_filter
+    assert url_filter.size == 10
+
+
+@pytest.mark.web
+def test_warm_pages_by_p_id_once():
+    cur = _PagedCursor([[(4, "u4"), (9, "u9")], [(12, "u12")]])
+    url_filter = UrlFilter(capacity=10)
+    assert url_filter.warm(_Conn(cur), batch_size=2) == 3
+    assert cur.executed == [(0, 2), (9, 2), (12, 2)]
+    assert all(url in url_filter for url in ("u4", "u9", "u12"))
+    assert url_filter.warmed
+
+    assert url_filter.warm(_Conn(cur)) == 0
+    assert len(cur.executed) == 3
+
+
+@pytest.mark.web
+def test_warm_caps_batch_size():
+    cur = _PagedCursor([])
+    UrlFilter().warm(_Conn(cur), batch_size=50_000)
+    assert cur.executed == [(0, 1000)]